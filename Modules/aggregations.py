@@ -0,0 +1,212 @@
+# Modules/aggregations.py
+
+import numpy as np
+import pandas as pd
+
+from Modules.dataset import COLUMNAS_FECHA
+from Modules.trazas import tramo
+
+# Agregados que usa cada informe (gráficos y hojas de resumen del Excel)
+AGREGADOS_POR_INFORME = {
+    "Informe de Altas": [
+        ('Por letra', ('conteo', 'letra')),
+        ('Por operador', ('conteo', 'Operador')),
+        ('Por hora', ('horas',)),
+        ('Por área', ('conteo', 'Descripcion')),
+    ],
+    "Informe por Categoria": [
+        ('Por categoría', ('suma', 'Categoria', 'Conteo')),
+        ('Por tipo', ('conteo', 'Tipo')),
+    ],
+    "Novedades de Beneficios": [
+        ('Por mes', ('periodo',)),
+    ],
+    # Solo con todos los operadores (columna NombreOperador)
+    "Informe de Operadores": [
+        ('Por operador', ('conteo', 'NombreOperador')),
+    ],
+}
+
+# Agregados que se pueden actualizar sumando los de las filas nuevas
+_ACUMULABLES = {'conteo', 'suma', 'horas'}
+
+# Nombre de la barra que junta las categorías que quedan fuera del top N
+ETIQUETA_OTROS = 'Otros'
+
+
+def _ordenar(serie):
+    return serie.sort_values(ascending=False, kind='mergesort')
+
+
+def _conteo(df, columna):
+    serie = df[columna]
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Una pasada sobre los códigos de la categoría
+        codigos = serie.cat.codes.to_numpy()
+        cuentas = np.bincount(codigos[codigos >= 0], minlength=len(serie.cat.categories))
+        resultado = pd.Series(cuentas, index=pd.Index(serie.cat.categories, name=columna), name='count')
+        return _ordenar(resultado[resultado > 0])
+    return serie.value_counts()
+
+
+def _suma(df, clave, valor):
+    serie = df[clave]
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        validos = codigos >= 0
+        valores = df[valor].to_numpy()[validos]
+        sumas = np.bincount(codigos[validos], weights=valores, minlength=len(serie.cat.categories))
+        presentes = np.bincount(codigos[validos], minlength=len(serie.cat.categories)) > 0
+        if np.issubdtype(valores.dtype, np.integer):
+            sumas = sumas.astype(np.int64)
+        resultado = pd.Series(sumas, index=pd.Index(serie.cat.categories, name=clave), name=valor)
+        return _ordenar(resultado[presentes])
+    return _ordenar(df.groupby(clave)[valor].sum())
+
+
+def _horas(df, horas=None):
+    if horas is None:
+        fechas = df['fech_alta']
+        if not pd.api.types.is_datetime64_any_dtype(fechas):
+            fechas = pd.to_datetime(fechas, format=COLUMNAS_FECHA['fech_alta'], errors='coerce')
+        horas = fechas.dt.hour.dropna().astype('int8')
+    cuentas = np.bincount(horas.to_numpy(), minlength=24)
+    resultado = pd.Series(cuentas, index=pd.RangeIndex(len(cuentas), name='hora_alta'), name='count')
+    return resultado[resultado > 0]
+
+
+def _periodo(df):
+    return df.groupby(['Anio', 'Mes']).size().reset_index(name='Cantidad')
+
+
+def calcular(df, clave, horas=None):
+    """
+    Calcula un agregado sobre df. clave es una tupla:
+    ('conteo', columna), ('suma', columna, columna_valor), ('horas',) o ('periodo',).
+    """
+    tipo = clave[0]
+    if tipo == 'conteo':
+        return _conteo(df, clave[1])
+    if tipo == 'suma':
+        return _suma(df, clave[1], clave[2])
+    if tipo == 'horas':
+        return _horas(df, horas)
+    if tipo == 'periodo':
+        return _periodo(df)
+    raise ValueError(f"Agregado desconocido: {clave}")
+
+
+class AggregationCache:
+    """
+    Agregados de un ReportDataset, calculados una vez por versión y
+    compartidos por todos los gráficos y por la exportación a Excel.
+    Si el dataset cambia de versión, la caché se descarta.
+    """
+
+    def __init__(self, dataset=None):
+        self.dataset = dataset
+        self.version = dataset.version if dataset is not None else None
+        self._memo = {}
+
+    def _get(self, clave):
+        if clave not in self._memo:
+            if self.dataset is None:
+                raise KeyError(clave[1] if len(clave) > 1 else clave[0])
+            with tramo('agregados', agregado=' '.join(clave)):
+                horas = self.dataset.horas if clave[0] == 'horas' else None
+                self._memo[clave] = calcular(self.dataset.df, clave, horas)
+        return self._memo[clave]
+
+    def conteo(self, columna):
+        """
+        Cantidad de filas por valor de la columna, de mayor a menor.
+        """
+        return self._get(('conteo', columna))
+
+    def suma_por(self, columna, columna_valor):
+        """
+        Suma de columna_valor por cada valor de columna, de mayor a menor.
+        """
+        return self._get(('suma', columna, columna_valor))
+
+    def horas(self):
+        """
+        Cantidad de altas por hora del día, ordenada por hora.
+        """
+        return self._get(('horas',))
+
+    def por_periodo(self):
+        """
+        Cantidad de filas por (Anio, Mes), con la columna 'Cantidad'.
+        """
+        return self._get(('periodo',))
+
+    def vista(self, clave, top_n=0, inicio=0, ventana=None):
+        """
+        Parte a graficar de un conteo o suma (clave como en calcular), que ya
+        está ordenado de mayor a menor: con top_n, las primeras top_n
+        categorías más una fila ETIQUETA_OTROS con la suma del resto; con
+        ventana, solo las categorías [inicio, inicio + ventana). El costo es
+        proporcional a lo que se devuelve, no a la cantidad de categorías.
+        """
+        serie = self._get(clave)
+        if top_n and len(serie) > top_n:
+            cabeza = serie.iloc[:top_n]
+            otros = self._total(clave) - cabeza.sum()
+            indice = pd.Index([str(c) for c in cabeza.index] + [ETIQUETA_OTROS], name=serie.index.name)
+            serie = pd.Series(np.append(cabeza.to_numpy(), otros), index=indice, name=serie.name)
+        if ventana:
+            serie = serie.iloc[inicio:inicio + ventana]
+        return serie
+
+    def cantidad(self, clave, top_n=0):
+        """
+        Cantidad de categorías que tendría vista(clave, top_n) sin ventana.
+        """
+        total = len(self._get(clave))
+        return top_n + 1 if top_n and total > top_n else total
+
+    def _total(self, clave):
+        clave_total = ('total',) + clave
+        if clave_total not in self._memo:
+            self._memo[clave_total] = self._get(clave).sum()
+        return self._memo[clave_total]
+
+    def precalcular(self, informe_tipo):
+        """
+        Calcula de una vez todos los agregados que usa el informe.
+        """
+        for _, clave in AGREGADOS_POR_INFORME.get(informe_tipo, []):
+            try:
+                self._get(clave)
+            except KeyError:
+                pass
+
+    def resumenes(self, informe_tipo):
+        """
+        {nombre_de_hoja: DataFrame} con los agregados del informe, para el Excel.
+        """
+        hojas = {}
+        for nombre, clave in AGREGADOS_POR_INFORME.get(informe_tipo, []):
+            try:
+                agregado = self._get(clave)
+            except KeyError:
+                continue
+            hojas[nombre] = agregado if isinstance(agregado, pd.DataFrame) else agregado.reset_index()
+        return hojas
+
+    def extender(self, dataset_nuevo, filas_nuevas):
+        """
+        Caché para dataset_nuevo (el actual más filas_nuevas): los conteos,
+        sumas y horas ya calculados se actualizan sumando solo los de las
+        filas nuevas; el resto se recalculará cuando se pida.
+        """
+        nueva = AggregationCache(dataset_nuevo)
+        # Copia: un gráfico en otro hilo puede estar agregando entradas
+        for clave, valor in list(self._memo.items()):
+            if clave[0] not in _ACUMULABLES:
+                continue
+            delta = calcular(filas_nuevas, clave)
+            combinado = valor.add(delta, fill_value=0).astype(valor.dtype)
+            nueva._memo[clave] = combinado.sort_index() if clave[0] == 'horas' else _ordenar(combinado)
+        return nueva
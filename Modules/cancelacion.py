@@ -0,0 +1,98 @@
+# Modules/cancelacion.py
+
+import contextlib
+import contextvars
+import threading
+
+
+class ConsultaCancelada(Exception):
+    """
+    Corta una consulta cuyo resultado ya no interesa: la lanza el callback
+    on_batch de un Worker cancelado, o la consulta misma si su sentencia
+    se canceló en el servidor.
+    """
+
+
+class TiempoAgotado(Exception):
+    """
+    El servidor no terminó la sentencia dentro del tiempo límite del
+    procedimiento (ver TIEMPOS_LIMITE en database_utils).
+    """
+
+
+class Cancelacion:
+    """
+    Pedido de cancelación de un trabajo, compartido por todos los hilos en
+    los que corre (viaja con el contexto, igual que la corrida de trazas).
+    Mientras una sentencia se ejecuta, su cursor queda registrado y
+    cancelar() la corta en el servidor con cursor.cancel(), en lugar de
+    esperar a que termine para descartar el resultado.
+    """
+
+    def __init__(self):
+        self.cancelada = False
+        self._cursores = set()
+        self._lock = threading.Lock()
+
+    def cancelar(self):
+        with self._lock:
+            self.cancelada = True
+            # Con el lock tomado: el cursor no se puede cerrar mientras se cancela
+            for cursor in self._cursores:
+                try:
+                    cursor.cancel()
+                except Exception as e:
+                    print(f"No se pudo cancelar la sentencia en curso: {e}")
+
+    def verificar(self):
+        """
+        Lanza ConsultaCancelada si se pidió la cancelación.
+        """
+        if self.cancelada:
+            raise ConsultaCancelada()
+
+    @contextlib.contextmanager
+    def sentencia(self, cursor):
+        """
+        Registra cursor mientras dura el bloque, para poder cancelarlo
+        desde otro hilo. Si ya estaba cancelada, ni siquiera empieza.
+        """
+        with self._lock:
+            self.verificar()
+            self._cursores.add(cursor)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._cursores.discard(cursor)
+
+
+# Cancelación del trabajo que corre en este contexto (el Worker la establece
+# en el suyo y ejecutar_en_paralelo copia el contexto a sus hilos)
+_cancelacion_actual = contextvars.ContextVar('cancelacion_actual', default=None)
+
+
+def actual():
+    return _cancelacion_actual.get()
+
+
+def establecer(cancelacion):
+    _cancelacion_actual.set(cancelacion)
+
+
+@contextlib.contextmanager
+def sentencia(cursor):
+    """
+    Registra cursor en la cancelación del contexto actual, si hay una.
+    """
+    cancelacion = _cancelacion_actual.get()
+    if cancelacion is None:
+        yield
+        return
+    with cancelacion.sentencia(cursor):
+        yield
+
+
+def cancelada():
+    cancelacion = _cancelacion_actual.get()
+    return cancelacion is not None and cancelacion.cancelada
@@ -0,0 +1,252 @@
+# Modules/connection_pool.py
+
+import threading
+import time
+from contextlib import contextmanager
+
+import pyodbc
+
+from Modules.trazas import tramo
+
+# Controladores ODBC en orden de preferencia
+DRIVERS = [
+    'ODBC Driver 17 for SQL Server',
+    'SQL Server Native Client 11.0',
+    'SQL Server Native Client 10.0',
+    'SQL Server',
+]
+
+SERVER = 'sql01'
+DATABASE = 'Gestion'
+
+
+def build_connection_string(driver):
+    """
+    Arma la cadena de conexión a sql01 para el controlador indicado.
+    """
+    return f'DRIVER={{{driver}}};SERVER={SERVER};DATABASE={DATABASE};Trusted_Connection=yes;'
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones pyodbc a sql01.
+
+    La lista de controladores se recorre una sola vez: el primero que conecta
+    queda memorizado y se usa para todas las conexiones siguientes. Las
+    conexiones devueltas quedan "tibias" en el pool, se verifican con un
+    SELECT 1 si estuvieron quietas un rato y se cierran si superan max_idle.
+    """
+
+    def __init__(self, drivers=None, max_size=4, max_idle=300, health_check_after=30, acquire_timeout=60):
+        self.drivers = list(drivers or DRIVERS)
+        self.max_size = max_size                      # conexiones abiertas como máximo (en uso + libres)
+        self.max_idle = max_idle                      # segundos antes de cerrar una conexión libre
+        self.health_check_after = health_check_after  # segundos de inactividad antes de verificarla
+        self.acquire_timeout = acquire_timeout
+
+        self._driver = None
+        self._idle = []        # lista de (conexion, momento_de_devolucion)
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+    @property
+    def driver(self):
+        """
+        Controlador memorizado, o None si todavía no se conectó nunca.
+        """
+        return self._driver
+
+    # ------------------------------------------------------------------
+    # Apertura de conexiones
+    # ------------------------------------------------------------------
+    def _candidate_drivers(self):
+        """
+        Filtra la lista de controladores con los que están instalados,
+        para no pagar un login fallido por cada controlador ausente.
+        """
+        try:
+            instalados = set(pyodbc.drivers())
+        except Exception:
+            return self.drivers
+        candidatos = [d for d in self.drivers if d in instalados]
+        return candidatos or self.drivers
+
+    def _open_connection(self):
+        """
+        Abre una conexión nueva. Si ya hay un controlador memorizado lo usa
+        directamente; si no, prueba la lista y recuerda el que funcionó.
+        """
+        if self._driver is not None:
+            try:
+                return pyodbc.connect(build_connection_string(self._driver))
+            except pyodbc.Error:
+                # Puede haber cambiado la instalación: se vuelve a probar la lista
+                print(f"Falló la conexión con el controlador memorizado {self._driver}; se vuelve a probar la lista.")
+                self._driver = None
+
+        ultimo_error = None
+        for driver in self._candidate_drivers():
+            try:
+                print(f"Intentando conectar usando el controlador: {driver}")
+                conn = pyodbc.connect(build_connection_string(driver))
+                print(f"Conexión establecida con {driver}.")
+                self._driver = driver
+                return conn
+            except Exception as e:
+                print(f"Error al conectar usando el controlador {driver}: {e}")
+                ultimo_error = e
+
+        raise ConnectionError(f"No se pudo conectar a {SERVER} con ningún controlador: {ultimo_error}")
+
+    @staticmethod
+    def _is_alive(conn):
+        """
+        Verifica que la conexión siga respondiendo.
+        """
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    # ------------------------------------------------------------------
+    # Préstamo y devolución
+    # ------------------------------------------------------------------
+    def _evict_expired(self, ahora):
+        """
+        Cierra las conexiones libres que superaron max_idle.
+        Debe llamarse con el lock tomado.
+        """
+        vigentes = []
+        for conn, devuelta in self._idle:
+            if ahora - devuelta > self.max_idle:
+                self._close_quietly(conn)
+            else:
+                vigentes.append((conn, devuelta))
+        self._idle = vigentes
+
+    def acquire(self):
+        """
+        Presta una conexión del pool, abriendo una nueva si hace falta.
+        Bloquea hasta acquire_timeout segundos si el pool está completo.
+        """
+        limite = time.monotonic() + self.acquire_timeout
+        while True:
+            with self._cond:
+                ahora = time.monotonic()
+                self._evict_expired(ahora)
+
+                if self._idle:
+                    # La más recientemente usada es la que tiene más chances de seguir viva
+                    conn, devuelta = self._idle.pop()
+                    self._in_use += 1
+                    verificar = ahora - devuelta > self.health_check_after
+                elif self._in_use < self.max_size:
+                    conn = None
+                    self._in_use += 1
+                    verificar = False
+                else:
+                    restante = limite - ahora
+                    if restante <= 0:
+                        raise TimeoutError("No hay conexiones disponibles en el pool.")
+                    self._cond.wait(restante)
+                    continue
+
+            # La red se toca fuera del lock
+            if conn is not None and verificar and not self._is_alive(conn):
+                self._close_quietly(conn)
+                conn = None
+
+            if conn is None:
+                try:
+                    conn = self._open_connection()
+                except Exception:
+                    with self._cond:
+                        self._in_use -= 1
+                        self._cond.notify()
+                    raise
+            return conn
+
+    def release(self, conn, discard=False):
+        """
+        Devuelve una conexión al pool. Si discard es True (o no se puede
+        deshacer la transacción pendiente) la conexión se cierra.
+        """
+        if not discard:
+            try:
+                # Igual que al cerrar: nada de lo ejecutado queda en una transacción abierta
+                conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if discard or len(self._idle) >= self.max_size:
+                self._close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager que presta una conexión y la devuelve al salir.
+        Si el bloque lanza una excepción, la conexión se descarta.
+        """
+        with tramo('conexion'):
+            conn = self.acquire()
+        ok = False
+        try:
+            yield conn
+            ok = True
+        finally:
+            self.release(conn, discard=not ok)
+
+    def ampliar(self, max_size):
+        """
+        Sube el máximo de conexiones a max_size si era menor (nunca lo
+        baja: puede haber conexiones prestadas). Las conexiones se siguen
+        abriendo recién cuando se piden.
+        """
+        with self._cond:
+            if max_size > self.max_size:
+                self.max_size = max_size
+                self._cond.notify_all()
+
+    def close_all(self):
+        """
+        Cierra todas las conexiones libres (por ejemplo, al salir de la aplicación).
+        """
+        with self._cond:
+            for conn, _ in self._idle:
+                self._close_quietly(conn)
+            self._idle = []
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(max_size=None):
+    """
+    Devuelve el pool compartido por todas las funciones de database_utils.
+    Con max_size, el pool admite al menos esa cantidad de conexiones a la
+    vez (ver ConnectionPool.ampliar), para quien consulta con más hilos.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        if max_size is not None:
+            _pool.ampliar(max_size)
+        return _pool
@@ -1,49 +1,174 @@
 # Modules/database_utils.py
 
-import pyodbc
 import pandas as pd
 
-def fetch_data_from_database(fecha_inicio, fecha_fin, procedure_name):
+from Modules.cancelacion import ConsultaCancelada, TiempoAgotado, cancelada, sentencia
+from Modules.connection_pool import get_pool
+from Modules.result_cache import cached_call
+from Modules.range_cache import PROCEDIMIENTOS_PARTICIONADOS, fetch_por_dias
+from Modules.trazas import medir_dataframe, tramo
+
+# Filas que se traen por cada fetchmany
+BATCH_SIZE = 5000
+
+# Segundos que puede tardar una sentencia en el servidor antes de que el
+# controlador la cancele (0 = sin límite). En los informes particionados
+# cada partición tiene su propio límite.
+TIEMPO_LIMITE = 300
+TIEMPOS_LIMITE = {
+    'Will_ObtenerDatosParaInforme2024V3': 300,
+    'Will_ObtenerDatosParaInforme2024V4': 120,
+    'Will_novedades_altasv1': 120,
+    'Will_ObtenerMovimientos_por_operador': 120,
+    'v_personal_jub': 30,
+}
+# SQLSTATE con que el controlador ODBC avisa que se agotó el tiempo
+_TIEMPO_AGOTADO_SQLSTATE = ('HYT00', 'HYT01')
+
+
+def tiempo_limite(nombre):
+    """
+    Tiempo límite (segundos) del procedimiento o la vista nombre.
+    """
+    return TIEMPOS_LIMITE.get(nombre, TIEMPO_LIMITE)
+
+
+def _error_de_sentencia(e, limite):
+    """
+    Traduce el error del controlador de una sentencia cancelada o que
+    superó el tiempo límite; cualquier otro error se devuelve igual.
     """
-    Conecta a la base de datos y ejecuta un procedimiento almacenado con las fechas proporcionadas.
-    Retorna un DataFrame con los resultados o un DataFrame vacío en caso de error.
+    if cancelada():
+        return ConsultaCancelada()
+    if e.args and e.args[0] in _TIEMPO_AGOTADO_SQLSTATE:
+        return TiempoAgotado(f"El servidor no respondió en el tiempo límite de {limite} s")
+    return e
+
+
+def _ejecutar_consulta(query, params=(), on_batch=None, batch_size=BATCH_SIZE, limite=TIEMPO_LIMITE):
     """
-    drivers = [
-        'ODBC Driver 17 for SQL Server',
-        'SQL Server Native Client 11.0',
-        'SQL Server Native Client 10.0',
-        'SQL Server',
-    ]
+    Ejecuta una consulta con una conexión del pool compartido y
+    devuelve el resultado como DataFrame.
 
-    for driver in drivers:
+    Las filas se leen con fetchmany en lotes de batch_size y se vuelcan en
+    listas por columna, así nunca existe la lista completa de filas pyodbc.
+    Si se pasa on_batch, se llama con un DataFrame por cada lote leído
+    (si on_batch lanza una excepción, la lectura se interrumpe).
+    La sentencia se corta en el servidor si tarda más de `limite` segundos
+    (TiempoAgotado) o si se cancela el trabajo que la pidió (ConsultaCancelada).
+    """
+    with get_pool().connection() as conn:
+        # El límite se aplica a los cursores creados después de fijarlo
+        conn.timeout = limite or 0
+        cursor = conn.cursor()
         try:
-            print(f"Intentando conectar usando el controlador: {driver}")
-            conn = pyodbc.connect(
-                f'DRIVER={{{driver}}};SERVER=sql01;DATABASE=Gestion;Trusted_Connection=yes;'
-            )
-            cursor = conn.cursor()
-            
-            print(f"Conexión establecida con {driver}. Ejecutando procedimiento: {procedure_name}")
-            # Ejecutar el procedimiento almacenado y obtener resultados
-            cursor.execute(
-                f"EXEC {procedure_name} @FechaInicio = ?, @FechaFin = ?",
-                (fecha_inicio, fecha_fin)
-            )
-            rows = cursor.fetchall()
-            columns = [column[0] for column in cursor.description]
-            df = pd.DataFrame.from_records(rows, columns=columns)
-            
-            cursor.close()
-            conn.close()
-            
-            return df
+            with sentencia(cursor):
+                with tramo('ejecucion'):
+                    cursor.execute(query, params)
+                columns = [column[0] for column in cursor.description]
+                buffers = [[] for _ in columns]
+                with tramo('lectura') as t:
+                    filas = 0
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if cancelada():
+                            raise ConsultaCancelada()
+                        if not rows:
+                            break
+                        filas += len(rows)
+                        for buffer, valores in zip(buffers, zip(*rows)):
+                            buffer.extend(valores)
+                        if on_batch is not None:
+                            on_batch(pd.DataFrame.from_records(rows, columns=columns))
+                        del rows
+                    t.anotar(filas=filas, lotes=-(-filas // batch_size))
+        except (ConsultaCancelada, TiempoAgotado):
+            raise
         except Exception as e:
-            print(f"Error al conectar o ejecutar consulta usando el controlador {driver}: {e}")
-            continue
+            error = _error_de_sentencia(e, limite)
+            if error is e:
+                raise
+            raise error from e
+        finally:
+            cursor.close()
+    with tramo('dataframe') as t:
+        df = pd.DataFrame(dict(zip(columns, buffers)), columns=columns)
+        medir_dataframe(t, df)
+    return df
+
+
+def _entregar_desde_cache(df, desde_cache, on_batch):
+    # Un resultado de la caché llega entero, como un único lote
+    if desde_cache and on_batch is not None and len(df):
+        on_batch(df)
+    return df
+
+
+def _registrar_lotes(on_batch):
+    """
+    Envuelve on_batch para saber si ya se entregó algún lote. Devuelve
+    (on_batch envuelto, entregado()). Desde el primer lote un error ya no
+    se puede reemplazar por un DataFrame vacío: la tabla muestra esas filas.
+    """
+    if on_batch is None:
+        return None, lambda: False
+    lotes = []
 
-    # Si no se pudo conectar o hubo un error, devolver un DataFrame vacío.
-    print("Error: No se pudo conectar a la base de datos o ejecutar el procedimiento almacenado.")
-    return pd.DataFrame()
+    def entregar(lote):
+        lotes.append(len(lote))
+        on_batch(lote)
+    return entregar, lambda: bool(lotes)
+
+
+def fetch_data_from_database(fecha_inicio, fecha_fin, procedure_name, on_batch=None, force_refresh=False,
+                             particion='month', max_workers=1):
+    """
+    Ejecuta un procedimiento almacenado con las fechas proporcionadas.
+    Retorna un DataFrame con los resultados o un DataFrame vacío en caso de
+    error, salvo que ya se hayan entregado lotes: entonces el error se lanza.
+    Con on_batch se reciben además los lotes a medida que llegan.
+    El resultado se guarda en la caché local; force_refresh la ignora.
+    Los procedimientos de PROCEDIMIENTOS_PARTICIONADOS se consultan por
+    partes según `particion` ('month', 'week', un número de días o None) y
+    se guardan por partes (por día si traen columna de fecha), así solo se
+    consultan al servidor las partes que faltan; con max_workers > 1 esas
+    partes se consultan en paralelo usando conexiones del pool.
+    """
+    on_batch, entregado = _registrar_lotes(on_batch)
+
+    def consultar(inicio=fecha_inicio, fin=fecha_fin, lotes=on_batch):
+        print(f"Ejecutando procedimiento: {procedure_name} ({inicio} a {fin})")
+        return _ejecutar_consulta(
+            f"EXEC {procedure_name} @FechaInicio = ?, @FechaFin = ?",
+            (inicio, fin),
+            on_batch=lotes,
+            limite=tiempo_limite(procedure_name)
+        )
+
+    try:
+        with tramo('fetch_data_from_database', procedimiento=procedure_name) as t:
+            if procedure_name in PROCEDIMIENTOS_PARTICIONADOS:
+                df = fetch_por_dias(
+                    procedure_name, fecha_inicio, fecha_fin, consultar,
+                    on_batch=on_batch, force_refresh=force_refresh,
+                    particion=particion, max_workers=max_workers
+                )
+            else:
+                df, desde_cache = cached_call(
+                    procedure_name, (fecha_inicio, fecha_fin), fecha_fin, consultar, force_refresh
+                )
+                t.anotar(desde_cache=desde_cache)
+                df = _entregar_desde_cache(df, desde_cache, on_batch)
+            medir_dataframe(t, df)
+            return df
+    except (ConsultaCancelada, TiempoAgotado):
+        raise
+    except Exception as e:
+        if entregado():
+            raise
+        # Si no se pudo conectar o hubo un error, devolver un DataFrame vacío.
+        print(f"Error: No se pudo conectar a la base de datos o ejecutar el procedimiento {procedure_name}: {e}")
+        return pd.DataFrame()
 
 
 def fetch_operators_list():
@@ -51,80 +176,67 @@ def fetch_operators_list():
     Retorna un DataFrame con (Codigo, descripcion) de la vista v_personal_jub,
     ordenado por la columna 'descripcion'.
     """
-    drivers = [
-        'ODBC Driver 17 for SQL Server',
-        'SQL Server Native Client 11.0',
-        'SQL Server Native Client 10.0',
-        'SQL Server',
-    ]
-    
-    for driver in drivers:
-        try:
-            conn = pyodbc.connect(
-                f'DRIVER={{{driver}}};SERVER=sql01;DATABASE=Gestion;Trusted_Connection=yes;'
-            )
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "SELECT Codigo, descripcion FROM v_personal_jub ORDER BY descripcion"
+    try:
+        with tramo('fetch_operators_list') as t:
+            df = _ejecutar_consulta(
+                "SELECT Codigo, descripcion FROM v_personal_jub ORDER BY descripcion",
+                limite=tiempo_limite('v_personal_jub')
             )
-            rows = cursor.fetchall()
-            columns = [col[0] for col in cursor.description]
-            
-            df = pd.DataFrame.from_records(rows, columns=columns)
-
-            cursor.close()
-            conn.close()
+            medir_dataframe(t, df)
             return df
-        except Exception as e:
-            print(f"Error usando controlador {driver} para fetch_operators_list: {e}")
-            continue
-    
-    print("No fue posible obtener la lista de operadores.")
-    return pd.DataFrame()
+    except Exception as e:
+        print(f"No fue posible obtener la lista de operadores: {e}")
+        return pd.DataFrame()
 
 
-def fetch_data_operadores(fecha_inicio, fecha_fin, codigo_operador, letra):
+def consultar_movimientos_operador(fecha_inicio, fecha_fin, codigo_operador, letra, on_batch=None,
+                                   force_refresh=False):
     """
-    Ejecuta el procedimiento Will_ObtenerMovimientos_por_operador 
+    Ejecuta Will_ObtenerMovimientos_por_operador (con caché local) como
+    fetch_data_operadores, pero lanza los errores en lugar de devolver un
+    DataFrame vacío, para que quien la llama pueda reintentar o informar
+    qué operador falló.
+    """
+    query = """
+        EXEC Will_ObtenerMovimientos_por_operador
+             @FechaInicio = ?,
+             @FechaFin = ?,
+             @CodigoOperador = ?,
+             @Letra = ?
+    """
+    params = (fecha_inicio, fecha_fin, codigo_operador, letra)
+    with tramo('fetch_data_operadores', procedimiento="Will_ObtenerMovimientos_por_operador") as t:
+        df, desde_cache = cached_call(
+            "Will_ObtenerMovimientos_por_operador", params, fecha_fin,
+            lambda: _ejecutar_consulta(query, params, on_batch=on_batch,
+                                       limite=tiempo_limite("Will_ObtenerMovimientos_por_operador")),
+            force_refresh
+        )
+        t.anotar(desde_cache=desde_cache)
+        df = _entregar_desde_cache(df, desde_cache, on_batch)
+        medir_dataframe(t, df)
+        return df
+
+
+def fetch_data_operadores(fecha_inicio, fecha_fin, codigo_operador, letra, on_batch=None, force_refresh=False):
+    """
+    Ejecuta el procedimiento Will_ObtenerMovimientos_por_operador
     enviando 4 parámetros:
       @FechaInicio, @FechaFin, @CodigoOperador, @Letra
-    Devuelve un DataFrame con los resultados.
-    """
-    drivers = [
-        'ODBC Driver 17 for SQL Server',
-        'SQL Server Native Client 11.0',
-        'SQL Server Native Client 10.0',
-        'SQL Server',
-    ]
-    
-    for driver in drivers:
-        try:
-            conn = pyodbc.connect(
-                f'DRIVER={{{driver}}};SERVER=sql01;DATABASE=Gestion;Trusted_Connection=yes;'
-            )
-            cursor = conn.cursor()
-            
-            query = """
-                EXEC Will_ObtenerMovimientos_por_operador 
-                     @FechaInicio = ?, 
-                     @FechaFin = ?, 
-                     @CodigoOperador = ?, 
-                     @Letra = ?
-            """
-            cursor.execute(query, (fecha_inicio, fecha_fin, codigo_operador, letra))
-            rows = cursor.fetchall()
-            columns = [col[0] for col in cursor.description]
-            
-            df = pd.DataFrame.from_records(rows, columns=columns)
-            
-            cursor.close()
-            conn.close()
-            
-            return df
-        except Exception as e:
-            print(f"Error al obtener datos de operadores con {driver}: {e}")
-            continue
-    
-    # Si no se pudo conectar, devolver un DataFrame vacío
-    return pd.DataFrame()
+    Devuelve un DataFrame con los resultados, o uno vacío en caso de error
+    si todavía no se había entregado ningún lote (si no, el error se lanza).
+    Con on_batch se reciben además los lotes a medida que llegan.
+    El resultado se guarda en la caché local; force_refresh la ignora.
+    """
+    on_batch, entregado = _registrar_lotes(on_batch)
+    try:
+        return consultar_movimientos_operador(fecha_inicio, fecha_fin, codigo_operador, letra,
+                                              on_batch=on_batch, force_refresh=force_refresh)
+    except (ConsultaCancelada, TiempoAgotado):
+        raise
+    except Exception as e:
+        if entregado():
+            raise
+        # Si no se pudo conectar, devolver un DataFrame vacío
+        print(f"Error al obtener datos de operadores: {e}")
+        return pd.DataFrame()
@@ -0,0 +1,183 @@
+# Modules/dataset.py
+
+import hashlib
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# Columnas de pocos valores distintos que se guardan como categorías
+COLUMNAS_CATEGORICAS = ['letra', 'Operador', 'Descripcion', 'Categoria', 'Tipo', 'NombreOperador']
+# Columnas de fecha y el formato con el que las devuelve el servidor
+COLUMNAS_FECHA = {'fech_alta': '%d-%m-%Y %H:%M'}
+
+_versiones = itertools.count(1)
+
+
+def _es_texto(serie):
+    return pd.api.types.infer_dtype(serie, skipna=True) == 'string'
+
+
+def huellas_de_filas(df):
+    """
+    Hash de cada fila de df (arreglo uint64), vectorizado con pandas:
+    dos filas con los mismos valores tienen la misma huella.
+    """
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def huella(df):
+    """
+    Huella de todo df (columnas y filas en orden), para saber sin mirarlo
+    celda por celda si una consulta devolvió lo mismo que la anterior.
+    """
+    filas = hashlib.blake2b(huellas_de_filas(df).tobytes(), digest_size=16).hexdigest()
+    return tuple(str(c) for c in df.columns), len(df), filas
+
+
+def normalizar(df):
+    """
+    Devuelve una copia tipada del DataFrame crudo del servidor:
+    texto sin espacios sobrantes, fechas parseadas con su formato,
+    columnas de pocos valores como categorías y números reducidos
+    al tipo más chico que los contiene.
+    """
+    columnas = {}
+    for columna in df.columns:
+        serie = df[columna]
+
+        if (serie.dtype == object or pd.api.types.is_string_dtype(serie)) and _es_texto(serie):
+            serie = serie.str.strip()
+
+        if columna in COLUMNAS_FECHA and not pd.api.types.is_datetime64_any_dtype(serie):
+            fechas = pd.to_datetime(serie, format=COLUMNAS_FECHA[columna], errors='coerce')
+            # Solo se reemplaza si no se pierde ningún valor
+            if fechas.notna().sum() == serie.notna().sum():
+                serie = fechas
+
+        if columna in COLUMNAS_CATEGORICAS:
+            serie = serie.astype('category')
+        elif pd.api.types.is_integer_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+            serie = pd.to_numeric(serie, downcast='integer')
+        elif pd.api.types.is_float_dtype(serie):
+            serie = pd.to_numeric(serie, downcast='float')
+        elif serie.dtype == object and pd.api.types.infer_dtype(serie, skipna=True) == 'integer':
+            # Enteros que llegaron como objetos (por ejemplo, con nulos)
+            serie = pd.to_numeric(serie, downcast='integer')
+
+        columnas[columna] = serie
+    tipado = pd.DataFrame(columnas, columns=df.columns)
+    # Los metadatos del informe (por ejemplo, los operadores que fallaron) siguen con él
+    tipado.attrs = dict(df.attrs)
+    return tipado
+
+
+class ReportDataset:
+    """
+    Informe ya tipado, construido una sola vez después de la consulta.
+
+    La tabla, los gráficos y la exportación leen de `df` y no lo modifican;
+    cualquier cambio (como agregar filas nuevas) crea otro ReportDataset con
+    una `version` distinta, que sirve para invalidar lo calculado a partir
+    de la versión anterior.
+    """
+
+    def __init__(self, df=None, _normalizado=False):
+        if df is None:
+            df = pd.DataFrame()
+        self.df = df if _normalizado else normalizar(df)
+        self.version = next(_versiones)
+        self._horas = None
+        self._huellas = None
+        # Huella (ver huella()) de una consulta cruda que da este informe: si la
+        # próxima consulta tiene la misma, no hace falta tiparla para compararla
+        self.huella_cruda = None
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def empty(self):
+        return self.df.empty
+
+    @property
+    def horas(self):
+        """
+        Hora del día de fech_alta (Serie de enteros), calculada una vez.
+        """
+        if self._horas is None:
+            fechas = self.df['fech_alta']
+            if not pd.api.types.is_datetime64_any_dtype(fechas):
+                fechas = pd.to_datetime(fechas, format=COLUMNAS_FECHA['fech_alta'], errors='coerce')
+            self._horas = fechas.dt.hour.dropna().astype('int8')
+        return self._horas
+
+    @property
+    def huellas(self):
+        """
+        Huella de cada fila (ver huellas_de_filas), calculada una vez.
+        """
+        if self._huellas is None:
+            self._huellas = huellas_de_filas(self.df)
+        return self._huellas
+
+    def filas_agregadas(self, anterior):
+        """
+        Compara con el informe anterior fila a fila, por sus huellas:
+        devuelve un DataFrame vacío si tiene las mismas filas, las filas que
+        no estaban si solo se agregaron filas, o None si cambió algo más
+        (columnas, filas modificadas o borradas) y hay que mostrarlo entero.
+        """
+        if list(self.df.columns) != list(anterior.df.columns) or len(self) < len(anterior):
+            return None
+        if len(self) == len(anterior) and np.array_equal(self.huellas, anterior.huellas):
+            return self.df.iloc[:0]
+        nuevas = ~np.isin(self.huellas, anterior.huellas)
+        # Todas las filas anteriores tienen que seguir estando, con sus repeticiones
+        if not np.array_equal(np.sort(self.huellas[~nuevas]), np.sort(anterior.huellas)):
+            return None
+        return self.df[nuevas].reset_index(drop=True)
+
+    def memoria(self):
+        """
+        Bytes que ocupa el DataFrame (incluyendo el texto de los objetos).
+        """
+        return int(self.df.memory_usage(deep=True).sum())
+
+    def tipar(self, df_crudo):
+        """
+        Normaliza filas crudas con los mismos tipos que este informe,
+        para poder compararlas o agregarlas.
+        """
+        nuevo = normalizar(df_crudo)
+        for columna in nuevo.columns:
+            if columna not in self.df.columns:
+                continue
+            destino = self.df[columna].dtype
+            if isinstance(destino, pd.CategoricalDtype):
+                categorias = destino.categories.union(nuevo[columna].dropna().unique(), sort=False)
+                nuevo[columna] = nuevo[columna].astype(object).astype(pd.CategoricalDtype(categorias))
+            elif nuevo[columna].dtype != destino:
+                try:
+                    convertida = nuevo[columna].astype(destino)
+                except (TypeError, ValueError):
+                    continue
+                # Solo si no cambia ningún valor (un entero grande no entra en int8);
+                # si no, la concatenación sube el tipo sola
+                if convertida.astype(nuevo[columna].dtype).equals(nuevo[columna]):
+                    nuevo[columna] = convertida
+        return nuevo
+
+    def extender(self, filas_tipadas):
+        """
+        Devuelve un nuevo ReportDataset con las filas agregadas al final.
+        """
+        if filas_tipadas is None or filas_tipadas.empty:
+            return self
+        df = self.df.copy(deep=False)
+        for columna in df.columns:
+            dtype = filas_tipadas[columna].dtype if columna in filas_tipadas.columns else None
+            if isinstance(dtype, pd.CategoricalDtype):
+                # Ampliar las categorías para que la concatenación siga siendo categórica
+                df[columna] = df[columna].cat.set_categories(dtype.categories)
+        return ReportDataset(pd.concat([df, filas_tipadas], ignore_index=True), _normalizado=True)
@@ -0,0 +1,220 @@
+# Modules/exportacion.py
+
+import itertools
+import os
+import re
+
+# Filas que se convierten y escriben por vez: la memoria extra no depende del tamaño del informe
+FILAS_POR_LOTE = 10000
+# Filas por grupo de un archivo Parquet (grupos más chicos leen peor)
+FILAS_POR_GRUPO_PARQUET = 100000
+# Filas de datos que entran en una hoja de Excel (el límite es 1048576 con el encabezado)
+MAX_FILAS_HOJA = 1048575
+# Formato de las celdas de fecha, igual al que devuelve el servidor
+FORMATO_FECHA_EXCEL = 'dd-mm-yyyy hh:mm'
+
+# Caracteres que Excel no admite en el nombre de una hoja
+_CARACTERES_HOJA = re.compile(r'[\[\]:*?/\\]')
+# Largo máximo del nombre de una hoja
+LARGO_NOMBRE_HOJA = 31
+
+# Formatos de exportación por extensión, para el diálogo de guardar
+FORMATOS = {
+    '.xlsx': "Excel Files (*.xlsx)",
+    '.csv': "CSV Files (*.csv)",
+    '.parquet': "Parquet Files (*.parquet)",
+}
+
+
+def _valores(serie):
+    """
+    Valores de la serie como objetos de Python (int, float, str, datetime),
+    con None en lugar de NaN/NaT, para escribir celdas con su tipo.
+    """
+    return serie.astype(object).where(serie.notna(), None).tolist()
+
+
+def _lotes(df, filas=FILAS_POR_LOTE):
+    for inicio in range(0, len(df), filas):
+        yield df.iloc[inicio:inicio + filas]
+
+
+def nombre_de_hoja(texto, usados):
+    """
+    Nombre válido para una hoja de Excel a partir de texto (sin los
+    caracteres prohibidos, hasta 31 caracteres) que no esté en usados
+    (sin distinguir mayúsculas); se agrega a usados.
+    """
+    base = _CARACTERES_HOJA.sub(' ', str(texto)).strip().strip("'")[:LARGO_NOMBRE_HOJA] or 'Hoja'
+    nombre, numero = base, 2
+    while nombre.lower() in usados:
+        sufijo = f" ({numero})"
+        nombre = base[:LARGO_NOMBRE_HOJA - len(sufijo)] + sufijo
+        numero += 1
+    usados.add(nombre.lower())
+    return nombre
+
+
+class LibroExcel:
+    """
+    Libro de Excel que se escribe fila por fila sin armarlo en memoria:
+    cada fila se vuelca al archivo (temporal) en cuanto se agrega.
+    Usa xlsxwriter en modo constant_memory si está instalado, que es más
+    rápido; si no, openpyxl en modo write_only.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        try:
+            import xlsxwriter
+        except ImportError:
+            xlsxwriter = None
+        if xlsxwriter is not None:
+            self._libro = xlsxwriter.Workbook(ruta, {
+                'constant_memory': True,
+                'default_date_format': FORMATO_FECHA_EXCEL,
+                # El texto se escribe tal cual, aunque empiece con "=" o parezca una URL
+                'strings_to_formulas': False,
+                'strings_to_urls': False,
+            })
+            self._openpyxl = False
+        else:
+            from openpyxl import Workbook
+            self._libro = Workbook(write_only=True)
+            self._openpyxl = True
+
+    def hoja(self, nombre):
+        """
+        Agrega una hoja y devuelve una función que escribe una fila
+        (lista de valores) al final de ella.
+        """
+        if self._openpyxl:
+            return self._libro.create_sheet(nombre[:LARGO_NOMBRE_HOJA]).append
+        hoja = self._libro.add_worksheet(nombre[:LARGO_NOMBRE_HOJA])
+        filas = itertools.count()
+        return lambda valores: hoja.write_row(next(filas), 0, valores)
+
+    def cerrar(self):
+        if self._openpyxl:
+            self._libro.save(self.ruta)
+        else:
+            self._libro.close()
+
+
+def _escribir_hoja(libro, nombre, df, avanzar):
+    # Encabezado y filas de df en una hoja nueva, por lotes
+    escribir = libro.hoja(nombre)
+    escribir([str(columna) for columna in df.columns])
+    for lote in _lotes(df):
+        for fila in zip(*(_valores(lote[columna]) for columna in lote.columns)):
+            escribir(fila)
+        avanzar(len(lote))
+
+
+def _escribir_xlsx(ruta, df, hojas, avanzar):
+    libro = LibroExcel(ruta)
+    # Un informe que no entra en una hoja sigue en "Informe 2", "Informe 3"...
+    for numero, parte in enumerate(_lotes(df, MAX_FILAS_HOJA) if len(df) else [df], start=1):
+        _escribir_hoja(libro, 'Informe' if numero == 1 else f'Informe {numero}', parte, avanzar)
+    for nombre, resumen in (hojas or {}).items():
+        _escribir_hoja(libro, nombre, resumen, avanzar)
+    libro.cerrar()
+
+
+def _escribir_libro(ruta, hojas, avanzar):
+    libro = LibroExcel(ruta)
+    for nombre, df in hojas:
+        # Una hoja que no entra en Excel sigue en "nombre (2)"...
+        for numero, parte in enumerate(_lotes(df, MAX_FILAS_HOJA) if len(df) else [df], start=1):
+            sufijo = '' if numero == 1 else f' ({numero})'
+            _escribir_hoja(libro, nombre[:LARGO_NOMBRE_HOJA - len(sufijo)] + sufijo, parte, avanzar)
+    libro.cerrar()
+
+
+def _escribir_csv(ruta, df, hojas, avanzar):
+    # Fechas en ISO, que entienden todas las herramientas
+    with open(ruta, 'w', encoding='utf-8', newline='') as archivo:
+        df.iloc[:0].to_csv(archivo, index=False)
+        for lote in _lotes(df):
+            lote.to_csv(archivo, index=False, header=False, date_format='%Y-%m-%d %H:%M:%S')
+            avanzar(len(lote))
+
+
+def _escribir_parquet(ruta, df, hojas, avanzar):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Para exportar a Parquet hay que instalar pyarrow")
+    # El esquema sale del informe completo, así todos los grupos tienen los mismos tipos
+    esquema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(ruta, esquema) as escritor:
+        for lote in _lotes(df, FILAS_POR_GRUPO_PARQUET):
+            escritor.write_table(pa.Table.from_pandas(lote, schema=esquema, preserve_index=False))
+            avanzar(len(lote))
+
+
+_ESCRITORES = {
+    '.xlsx': _escribir_xlsx,
+    '.csv': _escribir_csv,
+    '.parquet': _escribir_parquet,
+}
+
+
+def exportar(ruta, df, hojas=None, on_progress=None):
+    """
+    Escribe df en ruta con el formato de la extensión (.xlsx, .csv o
+    .parquet), por lotes y con celdas tipadas (fechas como fechas, números
+    como números). hojas ({nombre: DataFrame}) se agregan como hojas
+    aparte solo en Excel.
+
+    on_progress(filas_escritas, total) se llama después de cada lote; si
+    lanza una excepción, la exportación se interrumpe. El archivo se
+    escribe con otro nombre y se renombra al terminar, así un error o una
+    cancelación no dejan un archivo a medias.
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension not in _ESCRITORES:
+        raise ValueError(f"Formato no soportado: {extension or ruta}")
+    escribir = _ESCRITORES[extension]
+
+    total = len(df) + (sum(len(h) for h in hojas.values()) if hojas and extension == '.xlsx' else 0)
+    return _escribir_con_avance(ruta, lambda parcial, avanzar: escribir(parcial, df, hojas, avanzar),
+                                total, on_progress)
+
+
+def exportar_libro(ruta, hojas, total=None, on_progress=None):
+    """
+    Escribe un Excel con una hoja por cada (nombre, DataFrame) de hojas,
+    que puede ser un dict o un iterable que las arma a medida que se
+    escriben (en ese caso total es la cantidad de filas, para el avance).
+    Los nombres ya deben ser válidos (ver nombre_de_hoja). Igual que
+    exportar: por lotes, con on_progress y sin dejar un archivo a medias.
+    """
+    if os.path.splitext(ruta)[1].lower() != '.xlsx':
+        raise ValueError("Un libro con varias hojas solo se puede exportar a Excel (.xlsx)")
+    if isinstance(hojas, dict):
+        total = sum(len(df) for df in hojas.values()) if total is None else total
+        hojas = hojas.items()
+    return _escribir_con_avance(ruta, lambda parcial, avanzar: _escribir_libro(parcial, hojas, avanzar),
+                                total, on_progress)
+
+
+def _escribir_con_avance(ruta, escribir, total, on_progress):
+    # escribir(ruta_parcial, avanzar) escribe el archivo; al terminar se renombra a ruta
+    escritas = 0
+
+    def avanzar(filas):
+        nonlocal escritas
+        escritas += filas
+        if on_progress is not None:
+            on_progress(escritas, total or escritas)
+
+    parcial = f"{ruta}.parcial"
+    try:
+        escribir(parcial, avanzar)
+        os.replace(parcial, ruta)
+    finally:
+        if os.path.exists(parcial):
+            os.remove(parcial)
+    return ruta
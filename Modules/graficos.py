@@ -1,414 +1,809 @@
-def mostrar_graficos(self):
+# Modules/graficos.py
+
+import math
+import os
+import threading
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.artist import Artist, allow_rasterization
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.cm import ScalarMappable
+from matplotlib.collections import PathCollection
+from matplotlib.colors import Normalize
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+from matplotlib.patches import Circle
+from matplotlib.path import Path
+from matplotlib.ticker import FuncFormatter, Locator, MaxNLocator
+
+from Modules.informes import GRAFICOS_POR_CATEGORIA
+from Modules.trazas import tramo
+
+# Comandos del contorno de una barra con bordes redondeados (el mismo que
+# arma BoxStyle.Round de FancyBboxPatch), compartidos por todas las barras
+_CODIGOS_REDONDEADOS = np.array([
+    Path.MOVETO,
+    Path.LINETO,
+    Path.CURVE3, Path.CURVE3,
+    Path.LINETO,
+    Path.CURVE3, Path.CURVE3,
+    Path.LINETO,
+    Path.CURVE3, Path.CURVE3,
+    Path.LINETO,
+    Path.CURVE3, Path.CURVE3,
+    Path.CLOSEPOLY,
+], dtype=Path.code_type)
+
+
+def _contornos_redondeados(x0, y0, ancho, alto, pad):
+    """
+    Vértices (n, 14, 2) de n rectángulos con bordes redondeados, calculados
+    de una vez para todas las barras.
+    """
+    x0 = np.asarray(x0, dtype=float) - pad
+    y0 = np.asarray(y0, dtype=float) - pad
+    x1 = x0 + np.asarray(ancho, dtype=float) + 2 * pad
+    y1 = y0 + np.asarray(alto, dtype=float) + 2 * pad
+    dr = pad
+    xs = np.stack([
+        x0 + dr, x1 - dr, x1, x1, x1, x1, x1 - dr,
+        x0 + dr, x0, x0, x0, x0, x0 + dr, x0 + dr,
+    ], axis=-1)
+    ys = np.stack([
+        y0, y0, y0, y0 + dr, y1 - dr, y1, y1,
+        y1, y1, y1 - dr, y0 + dr, y0, y0, y0,
+    ], axis=-1)
+    return np.stack([xs, ys], axis=-1)
+
+
+def barras_redondeadas(ax, valores, cmap, ancho=0.8, pad=0.3, linewidth=1, edgecolor='white'):
+    """
+    Dibuja una barra con bordes redondeados por cada valor (en x = 0, 1, 2...)
+    como una sola colección, con el color de cada barra tomado de cmap según
+    su valor. Reemplaza a un FancyBboxPatch por barra: el costo de dibujo no
+    depende de la cantidad de barras sino del área que ocupan.
+    """
+    valores = np.asarray(valores, dtype=float)
+    x0 = np.arange(len(valores)) - ancho / 2
+    contornos = _contornos_redondeados(x0, np.zeros(len(valores)), ancho, valores, pad)
+    caminos = [Path(vertices, _CODIGOS_REDONDEADOS) for vertices in contornos]
+
+    norm = Normalize(valores.min(), valores.max()) if len(valores) else Normalize()
+    colores = cmap(0.2 + 0.8 * norm(valores))
+
+    barras = PathCollection(
+        caminos,
+        facecolors=colores,
+        edgecolors=edgecolor,
+        linewidths=linewidth,
+        transform=ax.transData
+    )
+    ax.add_collection(barras, autolim=False)
+    return barras
+
+
+class EtiquetasBarras(Artist):
+    """
+    Los valores de todas las barras de un gráfico dibujados por un solo
+    artista. Las etiquetas que no entran (barras más angostas que el texto)
+    se saltean, así que se dibujan como mucho las que caben en el ancho del eje.
+    """
+
+    def __init__(self, x, y, valores, fontsize=9, color='black'):
+        super().__init__()
+        self._xy = np.column_stack([np.asarray(x, dtype=float), np.asarray(y, dtype=float)])
+        self._valores = np.asarray(valores)
+        self._fuente = FontProperties(size=fontsize)
+        self._color = color
+        self._anchos = {}
+        self.set_in_layout(False)
+        self.set_zorder(3)
+
+    def set_valores(self, y, valores):
         """
-        Muestra gráficos según el tipo de informe y gráfico seleccionados.
+        Cambia en el lugar la altura y el valor de cada etiqueta.
         """
-        if not hasattr(self, 'df') or self.df.empty:
-            self.show_message_box("Error", "Primero debe generar un informe para mostrar gráficos.")
+        self._xy[:, 1] = y
+        self._valores = np.asarray(valores)
+        self.stale = True
+
+    def _medida(self, renderer, texto):
+        # Los textos se repiten mucho (son números): se mide cada uno una vez
+        if texto not in self._anchos:
+            self._anchos[texto] = renderer.get_text_width_height_descent(texto, self._fuente, ismath=False)[0]
+        return self._anchos[texto]
+
+    @allow_rasterization
+    def draw(self, renderer):
+        if not self.get_visible() or not len(self._valores):
+            return
+        posiciones = self.axes.transData.transform(self._xy)
+        limite = self.axes.bbox
+        visibles = np.flatnonzero(
+            (posiciones[:, 0] >= limite.x0) & (posiciones[:, 0] <= limite.x1) & (posiciones[:, 1] >= limite.y0)
+        )
+        if not len(visibles):
             return
-        
-        self.canvas.figure.clear()
-        
-        # Aquí iría el código para generar los gráficos dependiendo del informe
-        self.canvas.draw()
-
-        tipo_grafico = self.combo_tipo_grafico.currentText()
-        informe_tipo = self.informe_selector.currentText()
-        
-        try:
-            if informe_tipo == "Informe de Altas" and tipo_grafico in [
-                "Gráfico de Expedientes", 
-                "Gráfico de Operadores", 
-                "Gráfico de Actividad", 
-                "Gráfico Actividad por Área",
-                "Mostrar Todos"
-            ]:
-                
-                def func(pct, allvalues):
-                    absolute = int(np.round(pct / 100. * np.sum(allvalues)))
-                    return "{:d}\n({:.1f}%)".format(absolute, pct)
-        
-                # Implementación de gráficos para "Informe de Altas"
-                if tipo_grafico == "Gráfico de Expedientes":
-                    ax = self.canvas.figure.add_subplot(111)
-                      # Obtener los datos de conteo de letras
-                    letras_count = self.df['letra'].value_counts()
-
-                      # Colores personalizados para el gráfico
-                    colores = ['#ff9999', '#66b3ff', '#99ff99', '#ffcc99', '#c2c2f0']
-
-                     # Generar el gráfico de pastel con algunas opciones personalizadas
-                    wedges, texts, autotexts = ax.pie(
-                        letras_count.values,
-                        labels=letras_count.index,
-                        autopct=lambda pct: func(pct, letras_count.values), #muestra valores numericos dentro de los circulos
-                    #autopct=('%1.1f%%'),  #porcentaje de secciones
-                        startangle=90,
-                        colors=colores,
-                        wedgeprops={'linewidth':1, 'edgecolor': 'white'},
-                        textprops={'color':'black', 'fontsize':10}
-
-
-                    )
-
-                    ax.set_title('Distribución por Letra de Expediente',  fontsize= 12, fontweight='bold')
-                    for autotext in autotexts:
-                        autotext.set_color('black')
-                        autotext.set_fontsize(10)
-                        autotext.set_fontweight('bold')
-
-                    centro_circulo = plt.Circle((0,0),0.70, fc='white')
-                    ax.add_artist(centro_circulo)
-
-                    ax.axis('equal')
-
-                    self.canvas.figure.tight_layout()
-
-                elif tipo_grafico == "Gráfico de Operadores":
-                    ax = self.canvas.figure.add_subplot(111)
-                    self.df['Operador'] = self.df['Operador'].str.strip()#para eliminar espacios en blanco
-                    operadores_count = self.df['Operador'].value_counts()#datos de conteo
-                    cmap = plt.get_cmap('Pastel2')
-
-                    #normalizar los valores de las barras para obtener colors en diferentes intensidades
-                    norm = plt.Normalize(operadores_count.min(), operadores_count.max())
-
-                    #crear el gráfico de barras con bordes rounded
-                    bars =[]
-                    for i, (Operador, valor) in enumerate(operadores_count.items()):
-                        #crear barra rectangular con bordes redondeados usando fancyBboxPatch
-                        color = cmap(0.2 + 0.8 * norm(valor)) #asignar el color según el valor
-                        bar = FancyBboxPatch(
-                        (i  - 0.4, 0), 0.8, valor,    
-                        boxstyle="round, pad=0.3", #bordes rounded
-                        linewidth=2,
-                        edgecolor='white',
-                        facecolor=color #color basado en el colormap creado
-                    )
-                        
-                        ax.add_patch(bar) #agregar la barra al gráfico
-                        bars.append(bar) #color de relleno basado en el colormap
-
-                    #ajustar para que coincidad con las barras
-                    ax.set_facecolor('#f0f0f0')
-
-                    ax.set_xlim(-0.5, len(operadores_count) -0.5)
-                    ax.set_ylim(0, operadores_count.max() + 2) #margen superior
-
-
-                    ax.set_title('Actuaciones por Operador', fontsize=12, fontweight='bold')
-                    ax.set_xlabel('Operador', fontsize=12)
-                    ax.set_ylabel('Cantidad de Actuaciones', fontsize=12)
-
-                                  
-                    ax.set_xticks(range(len(operadores_count.index)))
-                    ax.set_xticklabels(operadores_count.index, rotation=45, ha='right', fontsize=8)
-
-                    for i, bar in enumerate(bars):
-                            yval = operadores_count.values[i]
-                            ax.text(i, yval + 0.3, int(yval), ha='center', fontsize=10)
-
-
-                    self.canvas.figure.tight_layout()
-                    self.canvas.draw()   
-                    
-                
-                elif tipo_grafico == "Gráfico de Actividad":
-                    ax = self.canvas.figure.add_subplot(111)
-                     # Convertir la columna de fechas a datetime
-                    self.df['fech_alta'] = pd.to_datetime(self.df['fech_alta'], format='%d-%m-%Y %H:%M', errors='coerce', dayfirst=True)
-                    # Eliminar filas con valores nulos
-                    self.df = self.df.dropna(subset=['fech_alta'])# Extraer la hora de la columna 'fech_alta'
-                    self.df['hora_alta'] = self.df['fech_alta'].dt.hour 
-                    horas_count = self.df['hora_alta'].value_counts().sort_index()# Contar la cantidad de ocurrencias por hora y ordenar
-
-                     # Personalización del gráfico de líneas
-                    ax.plot(horas_count.index, horas_count.values, marker='o', linestyle='--', color='blue', markersize=8, markerfacecolor='red')
-
-                     # Personalización del título y etiquetas de los ejes
-                    ax.set_title('Actividad por Hora', fontsize=16, color='darkgreen')
-                    ax.set_xlabel('Hora del Día', fontsize=12, color='darkblue')
-                    ax.set_ylabel('Cantidad de Actuaciones', fontsize=12, color='darkblue')
-
-                    for x, y in zip(horas_count.index, horas_count.values):
-                            if y == horas_count.max():
-                                ax.text(x, y + 2, str(y), fontsize=10, color='black', ha='center', fontweight='bold')  # Desplaza hacia arriba en el máximo
-                            else:
-                                ax.text(x, y - 2, str(y), fontsize=10, color='black', ha='center', fontweight='bold')  # Desplaza hacia abajo en otros puntos
-
-                      # Personalización de los ejes (límites y colores)
-                    ax.set_xlim(horas_count.index.min() - 1, horas_count.index.max() + 1)
-                    ax.set_ylim(0, horas_count.values.max() + 5)
-                    ax.spines['top'].set_visible(False)
-                    ax.spines['right'].set_visible(False)
-                    ax.spines['bottom'].set_color('gray')
-                    ax.spines['left'].set_color('gray')
-
-                    # Personalización de los ticks (marcas) del eje x e y
-                    ax.tick_params(axis='x', colors='purple', labelsize=10)
-                    ax.tick_params(axis='y', colors='purple', labelsize=10)
-                # Mostrar el gráfico actualizado
-                    self.canvas.draw()
-
-                # Gráfico personalizado de "Actividad por Área"
-                elif tipo_grafico == "Gráfico Actividad por Área":
-                    ax = self.canvas.figure.add_subplot(111)
-                    descripcion_count = self.df['Descripcion'].value_counts()
-
-                    cmap = plt.get_cmap('viridis')  # Colormap verde-azul
-                    norm = plt.Normalize(descripcion_count.min(), descripcion_count.max())
-
-                    # Dibujar barras con colores del colormap
-                    bars = []
-                    for i, (descripcion, valor) in enumerate(descripcion_count.items()):
-                        color = cmap(0.2 + 0.8 * norm(valor))
-                        bar = FancyBboxPatch(
-                            (i - 0.4, 0), 0.8, valor,
-                            boxstyle="round,pad=0.3", linewidth=1, edgecolor='white', facecolor=color
-                        )
-                        ax.add_patch(bar)
-                        bars.append(bar)
-
-                    ax.set_facecolor('#f0f0f0')
-                    ax.set_xlim(-0.5, len(descripcion_count) - 0.5)
-                    ax.set_ylim(0, descripcion_count.max() + 2)
-                    ax.set_title('Distribución de Actividad por Descripción', fontsize=12, fontweight='bold')
-                    ax.set_xlabel('Descripción', fontsize=12)
-                    ax.set_ylabel('Cantidad', fontsize=12)
-
-                    ax.set_xticks(range(len(descripcion_count.index)))
-                    ax.set_xticklabels(descripcion_count.index, rotation=45, ha='right', fontsize=8)
-
-                    for i, bar in enumerate(bars):
-                        yval = descripcion_count.values[i]
-                        ax.text(i, yval + 0.3, int(yval), ha='center', fontsize=9)
-
-                    self.canvas.figure.tight_layout()
-                    self.canvas.draw()
-                
-                elif tipo_grafico == "Mostrar Todos":
-                    self.canvas.figure.clear()
-                    axs = self.canvas.figure.subplots(2, 2)
-                    
-                    # Gráfico de Expedientes
-                    letras_count = self.df['letra'].value_counts()
-                    bars = axs[0, 0].bar(letras_count.index, letras_count.values)
-                    axs[0, 0].set_title('Distribución por Tipo de Letra')
-                    for bar in bars:
-                        yval = bar.get_height()
-                        axs[0, 0].text(bar.get_x() + bar.get_width()/2, yval + 1, int(yval), ha='center', fontsize=9)
-                    
-                    # Gráfico de Operadores
-                    operadores_count = self.df['Operador'].value_counts()
-                    bars = axs[0, 1].bar(operadores_count.index, operadores_count.values)
-                    axs[0, 1].set_title('Actuaciones por Operador')
-                    axs[0, 1].set_xlabel('Operador')
-                    axs[0, 1].set_ylabel('Cantidad de Actuaciones')
-                    axs[0, 1].tick_params(axis='x', rotation=45, labelsize=8)
-                    for bar in bars:
-                        yval = bar.get_height()
-                        axs[0, 1].text(bar.get_x() + bar.get_width()/2, yval + 1, int(yval), ha='center', fontsize=9)
-                    
-                    # Gráfico de Actividad por Hora
-                    self.df['hora_alta'] = pd.to_datetime(self.df['fech_alta'], errors='coerce', dayfirst=True).dt.hour
-                    horas_count = self.df['hora_alta'].value_counts().sort_index()
-                    axs[1, 0].plot(horas_count.index, horas_count.values, marker='o')
-                    axs[1, 0].set_title('Actividad por Hora')
-                    axs[1, 0].set_xlabel('Hora del Día')
-                    axs[1, 0].set_ylabel('Cantidad de Actuaciones')
-                    for x, y in zip(horas_count.index, horas_count.values):
-                        axs[1, 0].text(x, y, str(y), fontsize=9, ha='center')
-                    
-                    # Gráfico Actividad por Descripción en anillo
-                    descripcion_count = self.df['Descripcion'].value_counts()
-                    bars = axs[1, 1].bar(descripcion_count.index, descripcion_count.values)
-                    axs[1, 1].set_title('Distribución de Actividad por Descripción')
-                    axs[1, 1].set_xlabel('Descripción')
-                    axs[1, 1].set_ylabel('Cantidad')
-                    axs[1, 1].tick_params(axis='x', rotation=45, labelsize=8)
-                    for bar in bars:
-                        yval = bar.get_height()
-                        axs[1, 1].text(bar.get_x() + bar.get_width()/2, yval + 1, int(yval), ha='center', fontsize=9)
-                    
-                    self.canvas.figure.tight_layout()
-            
-            elif informe_tipo == "Informe por Categoria" and tipo_grafico in [
-                "Gráfico de Barras por Categoría",
-                "Gráfico Circular por Tipo",
-                "Mostrar Todos"
-            ]:
-                # Implementación de gráficos para "Informe por Categoria"
-                if tipo_grafico == "Gráfico de Barras por Categoría":
-                    ax = self.canvas.figure.add_subplot(111)
-                    # Eliminar los espacios en blanco de las etiquetas de categoría
-                    self.df['Categoria'] = self.df['Categoria'].str.strip()
-                    categoria_count = self.df.groupby('Categoria')['Conteo'].sum().sort_values(ascending=False)
-
-                    # Configuración del colormap
-                    cmap = plt.get_cmap('viridis')  # Colormap verde-azul
-                    norm = plt.Normalize(categoria_count.min(), categoria_count.max())
-
-                    #crear el grafico de barra usando FancyBboxpatch
-                    bars = []
-                    for i, (categoria, valor) in enumerate(categoria_count.items()):
-                        color = cmap(0.2 + 0.8 * norm(valor))
-                        bar = FancyBboxPatch(
-                            (i - 0.4, 0), 0.8, valor,
-                            boxstyle="round,pad=0.3", linewidth=1, edgecolor="white", facecolor= color
-                        )
-                        ax.add_patch(bar)
-                        bars.append(bar)
-
-                    #configutacion visual del gráfico
-                    ax.set_facecolor('#f0f0f0')  # Color de fondo claro
-                    ax.set_xlim(-0.5, len(categoria_count) - 0.5)  # Limitar el espacio horizontal
-                    ax.set_ylim(0, categoria_count.max() + 2)  # Ajustar el límite del eje y
-
-                    #configuracion de titulos y etiquetas
-                    ax.set_title('Totales por Categoría', fontsize=16, fontweight='bold')
-                    ax.set_xlabel('Categoría', fontsize=12, labelpad=20)  # Añadir espacio extra debajo del eje x
-                    ax.set_ylabel('Cantidad total en el periodo', fontsize=12)
-
-                    #personalizar de los ticks del eje x
-                    ax.set_xticks(range(len(categoria_count.index)))
-                    ax.set_xticklabels(categoria_count.index, rotation=60, ha='right', fontsize=8, rotation_mode='anchor')
-
-                   
-                    #anadir valores encima de cada barra con un desplazamiento
-                    for i, bar in enumerate(bars):
-                        yval = categoria_count.values[i]
-                        ax.text(i, yval + 0.5, int(yval), ha= 'center', fontsize = 9)
-                        
-                    self.canvas.figure.tight_layout()
-                    plt.subplots_adjust(bottom=0.2)  # Aumentar el espacio inferior
-                    self.canvas.draw()
-                        
-                
-                elif tipo_grafico == "Gráfico Circular por Tipo":
-                    ax = self.canvas.figure.add_subplot(111)
-                    tipo_count = self.df['Tipo'].value_counts()
-                    ax.pie(tipo_count, labels=tipo_count.index, autopct='%1.1f%%')
-                    ax.set_title('Distribución por Tipo')
-                
-                elif tipo_grafico == "Mostrar Todos":
-                    self.canvas.figure.clear()
-                    axs = self.canvas.figure.subplots(1, 2)
-                    
-                    categoria_count = self.df.groupby('Categoria')['Conteo'].sum().sort_values(ascending=False)
-                    bars = axs[0].bar(categoria_count.index, categoria_count.values, width=0.6)
-                    axs[0].set_title('Totales por Categoría', fontsize=14)
-                    axs[0].set_xlabel('Categoría', fontsize=12)
-                    axs[0].set_ylabel('Cantidad total en el periodo', fontsize=12)
-                    axs[0].set_xticks(range(len(categoria_count.index)))
-                    axs[0].set_xticklabels(categoria_count.index, rotation=45, ha='right', fontsize=8)
-                    max_conteo = categoria_count.max()
-                    axs[0].yaxis.set_major_locator(MaxNLocator(integer=True, nbins=10))
-                    axs[0].set_ylim(0, max_conteo + 10)
-                    for bar in bars:
-                        yval = bar.get_height()
-                        axs[0].text(bar.get_x() + bar.get_width()/2, yval + 1, int(yval), ha='center', fontsize=9)
-
-                    tipo_count = self.df['Tipo'].value_counts()
-                    axs[1].pie(tipo_count, labels=tipo_count.index, autopct='%1.1f%%', startangle=90, labeldistance=1.1)
-                    axs[1].set_title('Distribución por Tipo')
-                    
-                    self.canvas.figure.tight_layout()
-
-                    
-
-            elif informe_tipo == "Novedades de Beneficios" and tipo_grafico =="Gráfico de Altas por Mes":
-                ax = self.canvas.figure.add_subplot(111)
-                # Agrupar por Año y Mes y contar las ocurrencias (altas por mes)
-                altas_por_mes = self.df.groupby(['Anio', 'Mes']).size().reset_index(name='Cantidad')
-                # Crear una columna combinada de 'Año-Mes' para el eje X
-                altas_por_mes['Periodo'] = altas_por_mes['Anio'].astype(str) + '-' + altas_por_mes['Mes'].astype(str)
-
-                 
-                # Crear un colormap basado en los valores de 'Cantidad'
-                norm = plt.Normalize(altas_por_mes['Cantidad'].min(), altas_por_mes['Cantidad'].max())
-                cmap = plt.cm.plasma  # Puedes cambiarlo a 'viridis', 'coolwarm', 'Blues', etc.
-
-                # Generar el gráfico de barras con los datos agrupados
-                bars = ax.bar(
-                        altas_por_mes['Periodo'], 
-                        altas_por_mes['Cantidad'], 
-                        color=cmap(norm(altas_por_mes['Cantidad'])), 
-                        edgecolor='black', 
-                        linewidth=1.2  # Líneas de borde más visibles
-                )
-
-                #configuracion de titulos e etiquetas
-                ax.set_title('Cantidad de Altas por Mes', fontsize=16, weight='bold', family='Verdana', color='#333333')
-                ax.set_xlabel('Mes', fontsize=12, family='Verdana', color='#333333')
-                ax.set_ylabel('Cantidad de Altas', fontsize=12, family='Verdana', color='#333333')
-
-
-                for bar in bars:
-                     yval = bar.get_height()
-                     ax.text(bar.get_x() + bar.get_width()/2, yval + 1, int(yval), ha='center', fontsize=9)
-
-                 # Añadir un mapa de colores al gráfico como leyenda
-                sm = plt.cm.ScalarMappable(cmap=cmap, norm=norm)
-                sm.set_array([])
-                cbar = plt.colorbar(sm, ax=ax)
-                cbar.set_label('Cantidad', fontsize=12, family='Verdana')
-
-                
-                    
-                self.canvas.figure.tight_layout()
 
-            self.canvas.draw()
-        
-        except KeyError as e:
-            self.show_message_box("Error", f"Error al generar el gráfico: Columna no encontrada - {str(e)}")
-        except Exception as e:
-            self.show_message_box("Error", f"Error al generar el gráfico: {str(e)}")
-    
+        # Paso entre etiquetas para que no se encimen
+        ancho_texto = self._medida(renderer, str(int(self._valores[visibles].max())))
+        if len(visibles) > 1:
+            separacion = abs(posiciones[visibles[1], 0] - posiciones[visibles[0], 0])
+            paso = max(1, math.ceil(ancho_texto * 1.2 / separacion)) if separacion > 0 else len(visibles)
+            visibles = visibles[::paso]
+
+        if renderer.flipy():
+            # Los backends raster miden y desde arriba
+            posiciones[:, 1] = renderer.get_canvas_width_height()[1] - posiciones[:, 1]
+
+        renderer.open_group('etiquetas', gid=self.get_gid())
+        gc = renderer.new_gc()
+        gc.set_foreground(self._color)
+        gc.set_alpha(self.get_alpha())
+        for i in visibles:
+            texto = str(int(self._valores[i]))
+            x, y = posiciones[i]
+            renderer.draw_text(gc, x - self._medida(renderer, texto) / 2, y, texto, self._fuente, 0, ismath=False)
+        gc.restore()
+        renderer.close_group('etiquetas')
+        self.stale = False
+
+
+def etiquetas_de_barras(ax, valores, desplazamiento=0.3, fontsize=9, color='black'):
+    """
+    Agrega sobre cada barra (en x = 0, 1, 2...) su valor entero, desplazado
+    hacia arriba en unidades de datos.
+    """
+    valores = np.asarray(valores)
+    etiquetas = EtiquetasBarras(np.arange(len(valores)), valores + desplazamiento, valores, fontsize, color)
+    ax.add_artist(etiquetas)
+    return etiquetas
+
+
+class LocalizadorCategorias(Locator):
+    """
+    Marcas en x = 0, 1, 2... para un eje de categorías, salteando las que no
+    entran en el ancho del eje según el tamaño de fuente de las etiquetas.
+    """
+
+    def __init__(self, cantidad, fontsize=8):
+        self.cantidad = cantidad
+        self.fontsize = fontsize
+
+    def __call__(self):
+        if self.cantidad == 0:
+            return []
+        ancho = self.axis.axes.bbox.width if self.axis is not None else 0
+        alto_texto = self.fontsize * 1.5 * (self.axis.figure.dpi / 72 if self.axis is not None else 1)
+        entran = max(1, int(ancho // alto_texto)) if ancho > 0 else self.cantidad
+        paso = max(1, math.ceil(self.cantidad / entran))
+        return list(range(0, self.cantidad, paso))
+
+    def tick_values(self, vmin, vmax):
+        return self()
+
+
+def etiquetas_categorias(ax, nombres, fontsize=8, **props):
+    """
+    Pone los nombres de las categorías como etiquetas del eje x (una por barra)
+    sin crear un texto por categoría cuando son demasiadas para el ancho.
+    props se aplica a las etiquetas (rotation, ha, rotation_mode...).
+    Devuelve la lista de nombres que usa el eje: modificarla en el lugar
+    cambia las etiquetas sin rearmarlo.
+    """
+    nombres = [str(nombre) for nombre in nombres]
+    ax.xaxis.set_major_locator(LocalizadorCategorias(len(nombres), fontsize))
+    ax.xaxis.set_major_formatter(FuncFormatter(
+        lambda x, pos: nombres[int(round(x))] if 0 <= round(x) < len(nombres) else ''
+    ))
+    for etiqueta in ax.get_xticklabels():
+        etiqueta.set(fontsize=fontsize, **props)
+    return nombres
+
+
+# Resultado de actualizar un gráfico con datos nuevos
+REARMAR = 0     # cambiaron las categorías: hay que armarlo de nuevo (y recalcular el layout)
+FONDO = 1       # cambiaron los límites o los nombres de los ejes: se redibuja la figura entera
+DATOS = 2       # solo cambiaron los valores: se redibujan solo los artistas de datos
+
+# Memoria aproximada de cada artista de una figura (textos, transformaciones,
+# trayectos), medida con tracemalloc: entre 4,5 y 5,5 KB según el gráfico
+BYTES_POR_ARTISTA = 5 * 1024
+
+
+def actualizar_barras_redondeadas(barras, valores, cmap, ancho=0.8, pad=0.3):
+    """
+    Cambia en el lugar la altura y el color de las barras creadas con
+    barras_redondeadas (misma cantidad de barras).
+    """
+    valores = np.asarray(valores, dtype=float)
+    x0 = np.arange(len(valores)) - ancho / 2
+    contornos = _contornos_redondeados(x0, np.zeros(len(valores)), ancho, valores, pad)
+    for camino, vertices in zip(barras.get_paths(), contornos):
+        camino.vertices[:] = vertices
+    norm = Normalize(valores.min(), valores.max())
+    barras.set_facecolor(cmap(0.2 + 0.8 * norm(valores)))
+    barras.stale = True
+
+
+def actualizador_barras_redondeadas(ax, barras, etiquetas, nombres, cmap, obtener, desplazamiento, margen):
+    """
+    Actualizador para un gráfico de barras_redondeadas: obtener(agregados)
+    devuelve la serie ordenada que se grafica.
+    """
+    def actualizar(agregados):
+        serie = obtener(agregados)
+        nuevos = [str(nombre) for nombre in serie.index]
+        if len(nuevos) != len(nombres) or set(nuevos) != set(nombres):
+            return REARMAR
+        actualizar_barras_redondeadas(barras, serie.values, cmap)
+        etiquetas.set_valores(serie.values + desplazamiento, serie.values)
+        ax.set_ylim(0, serie.max() + margen)
+        if nuevos == nombres:
+            return DATOS
+        # Mismas categorías en otro orden: solo cambian los nombres del eje
+        nombres[:] = nuevos
+        return FONDO
+    return actualizar
+
+
+def actualizador_barras_simples(ax, barras, textos, indice, obtener, desplazamiento=1):
+    """
+    Actualizador para un ax.bar con un texto por barra sobre las categorías
+    de indice, que conservan el orden en que se graficaron.
+    """
+    indice = list(indice)
+
+    def actualizar(agregados):
+        serie = obtener(agregados)
+        if len(serie) != len(indice) or set(serie.index) != set(indice):
+            return REARMAR
+        for barra, texto, valor in zip(barras, textos, serie.reindex(indice).to_numpy()):
+            barra.set_height(valor)
+            texto.set_position((barra.get_x() + barra.get_width() / 2, valor + desplazamiento))
+            texto.set_text(int(valor))
+        ax.relim()
+        ax.autoscale_view()
+        return DATOS
+    return actualizar
+
+
+def actualizar_torta(wedges, textos, autotextos, valores, nombres, autopct,
+                     startangle=90, labeldistance=1.1, pctdistance=0.6):
+    """
+    Cambia en el lugar los ángulos, etiquetas y porcentajes de un ax.pie
+    con la misma cantidad de porciones (misma geometría que Axes.pie).
+    """
+    valores = np.asarray(valores, dtype=float)
+    fracciones = valores / valores.sum()
+    theta1 = startangle / 360
+    for i, fraccion in enumerate(fracciones):
+        theta2 = theta1 + fraccion
+        wedge = wedges[i]
+        wedge.set_theta1(360. * theta1)
+        wedge.set_theta2(360. * theta2)
+        thetam = np.pi * (theta1 + theta2)
+        cx, cy = wedge.center
+        xt = cx + labeldistance * wedge.r * math.cos(thetam)
+        textos[i].set_position((xt, cy + labeldistance * wedge.r * math.sin(thetam)))
+        textos[i].set_horizontalalignment('left' if xt > 0 else 'right')
+        textos[i].set_text(str(nombres[i]))
+        if autotextos:
+            autotextos[i].set_position((cx + pctdistance * wedge.r * math.cos(thetam),
+                                        cy + pctdistance * wedge.r * math.sin(thetam)))
+            pct = 100. * fraccion
+            autotextos[i].set_text(autopct % pct if isinstance(autopct, str) else autopct(pct))
+        theta1 = theta2
+
+
+def actualizador_torta(wedges, textos, autotextos, obtener, formato_pct, startangle=90, labeldistance=1.1):
+    """
+    Actualizador para un ax.pie: obtener(agregados) devuelve la serie graficada
+    y formato_pct(serie) el autopct (texto de formato o función) para esa serie.
+    """
+    nombres_originales = {textos[i].get_text() for i in range(len(textos))}
+
+    def actualizar(agregados):
+        serie = obtener(agregados)
+        if set(str(nombre) for nombre in serie.index) != nombres_originales:
+            return REARMAR
+        actualizar_torta(wedges, textos, autotextos, serie.values, serie.index, formato_pct(serie),
+                         startangle, labeldistance)
+        return DATOS
+    return actualizar
+
+
+class GraficoVivo:
+    """
+    Figura ya armada que se puede actualizar con datos nuevos sin rearmarla.
+
+    Al armar el gráfico se registran, junto con sus artistas de datos
+    (barras, líneas, porciones, etiquetas), funciones que los modifican en
+    el lugar. En el refresco en tiempo real los ejes, títulos y marcas no se
+    vuelven a crear: si solo cambiaron los valores se restaura el fondo ya
+    dibujado y se redibujan únicamente los artistas de datos; si cambiaron
+    los límites se redibuja la figura; si cambiaron las categorías hay que
+    armarla de nuevo.
+    """
+
+    def __init__(self, figura):
+        self.figura = figura
+        self.canvas = FigureCanvasAgg(figura)
+        # Un mismo gráfico puede actualizarse desde un hilo y exportarse desde otro
+        self.lock = threading.Lock()
+        self._actualizadores = []
+        self._dinamicos = []
+        self._fondo = None
+        # Total de categorías de un gráfico paginado (para el desplazamiento)
+        self.categorias = None
+        # Artistas de la figura, contados en el último dibujo completo
+        self._artistas = 0
+
+    def registrar(self, actualizador, *artistas):
+        """
+        actualizador(agregados) modifica los artistas y devuelve REARMAR, FONDO o DATOS.
+        """
+        self._actualizadores.append(actualizador)
+        self._dinamicos.extend(artistas)
 
+    def bytes_estimados(self):
+        """
+        Memoria aproximada que ocupa el gráfico aparte de su imagen: el
+        búfer de Agg y el fondo guardado (un RGBA del tamaño de la figura
+        cada uno) y los artistas de la figura.
+        """
+        ancho, alto = self.canvas.get_width_height()
+        bufers = 4 * ancho * alto * (1 if self._fondo is None else 2)
+        return bufers + self._artistas * BYTES_POR_ARTISTA
 
+    def _limites(self):
+        return [ax.get_xlim() + ax.get_ylim() for ax in self.figura.axes]
 
-    def exportar_grafico(self):
+    def actualizar(self, agregados):
         """
-        Exporta el gráfico actual a un archivo PNG.
+        Aplica los datos nuevos a los artistas. Devuelve REARMAR si el
+        gráfico no se puede actualizar en el lugar.
         """
-        file_path, _ = QFileDialog.getSaveFileName(self, "Exportar Gráfico", "", "PNG Files (*.png);;All Files (*)")
-        if file_path:
-            try:
-                self.canvas.figure.savefig(file_path)
-                self.show_message_box("Éxito", f"Gráfico exportado en: {file_path}")
-            except Exception as e:
-                self.show_message_box("Error", f"Error al exportar el gráfico: {str(e)}")
-    
-    def toggle_actualizacion_tiempo_real(self, state):
+        if not self._actualizadores:
+            return REARMAR
+        limites = self._limites()
+        estado = DATOS
+        for actualizador in self._actualizadores:
+            resultado = actualizador(agregados)
+            if resultado == REARMAR:
+                return REARMAR
+            estado = min(estado, resultado)
+        if self._limites() != limites:
+            estado = FONDO
+        return estado
+
+    def dibujar(self, solo_datos=False):
         """
-        Activa o desactiva la actualización automática de datos y gráficos.
+        Dibuja la figura y devuelve la imagen RGBA (alto, ancho, 4). Con
+        solo_datos se parte del fondo guardado y se redibujan solo los
+        artistas de datos.
         """
-        if state == Qt.CheckState.Checked:
-            self.timer.start(60000)  # Actualiza cada 60 segundos (1 minuto)
+        if not self._dinamicos:
+            self.canvas.draw()
+            self._artistas = len(self.figura.findobj())
+            return np.asarray(self.canvas.buffer_rgba()).copy()
+
+        if solo_datos and self._fondo is not None:
+            self.canvas.restore_region(self._fondo)
         else:
-            self.timer.stop()
-    
-    def update_grafico_options(self):
-        """
-        Actualiza la lista de gráficos disponibles dependiendo del tipo de informe seleccionado.
-        """
-        informe_tipo = self.informe_selector.currentText()
-        self.combo_tipo_grafico.clear()
-
-        if informe_tipo == "Informe de Altas":
-            self.combo_tipo_grafico.addItems([
-                "Gráfico de Expedientes", 
-                "Gráfico de Operadores", 
-                "Gráfico de Actividad", 
-                "Gráfico Actividad por Área",
-                "Mostrar Todos"
-            ])
-        elif informe_tipo == "Informe por Categoria":
-            self.combo_tipo_grafico.addItems([
-                "Gráfico de Barras por Categoría",
-                "Gráfico Circular por Tipo",
-                "Mostrar Todos"
-            ])
-        elif informe_tipo == "Novedades de Beneficios":
-            self.combo_tipo_grafico.addItems([
-                "Gráfico de Altas por Mes"
-            ])
\ No newline at end of file
+            # Fondo: todo menos los artistas de datos
+            for artista in self._dinamicos:
+                artista.set_visible(False)
+            try:
+                self.canvas.draw()
+            finally:
+                for artista in self._dinamicos:
+                    artista.set_visible(True)
+            self._fondo = self.canvas.copy_from_bbox(self.figura.bbox)
+            self._artistas = len(self.figura.findobj())
+
+        for artista in sorted(self._dinamicos, key=lambda a: a.get_zorder()):
+            self.figura.draw_artist(artista)
+        # Los bordes de los ejes van encima de los datos
+        for ax in self.figura.axes:
+            for spine in ax.spines.values():
+                if spine.get_visible():
+                    self.figura.draw_artist(spine)
+        return np.asarray(self.canvas.buffer_rgba()).copy()
+
+
+def construir_grafico(grafico, informe_tipo, tipo_grafico, agregados, vista=None):
+    """
+    Arma en grafico.figura el gráfico tipo_grafico del informe a partir de
+    sus agregados (AggregationCache) y registra en grafico (GraficoVivo) cómo
+    actualizarlo con datos nuevos. No usa pyplot ni la interfaz, así que
+    puede ejecutarse en cualquier hilo.
+
+    vista ({'top_n', 'inicio', 'ventana'}, ver AggregationCache.vista) limita
+    las categorías de los GRAFICOS_POR_CATEGORIA; en "Mostrar Todos" solo
+    se aplica top_n.
+    """
+    figura = grafico.figura
+    vista = vista or {}
+    top_n = vista.get('top_n', 0)
+    if (informe_tipo, tipo_grafico) in GRAFICOS_POR_CATEGORIA:
+        grafico.categorias = agregados.cantidad(GRAFICOS_POR_CATEGORIA[(informe_tipo, tipo_grafico)], top_n)
+    if informe_tipo == "Informe de Altas" and tipo_grafico in [
+        "Gráfico de Expedientes", 
+        "Gráfico de Operadores", 
+        "Gráfico de Actividad", 
+        "Gráfico Actividad por Área",
+        "Mostrar Todos"
+    ]:
+
+        def func(pct, allvalues):
+            absolute = int(np.round(pct / 100. * np.sum(allvalues)))
+            return "{:d}\n({:.1f}%)".format(absolute, pct)
+
+        # Implementación de gráficos para "Informe de Altas"
+        if tipo_grafico == "Gráfico de Expedientes":
+            ax = figura.add_subplot(111)
+            letras_count = agregados.conteo('letra')
+            colores = ['#ff9999', '#66b3ff', '#99ff99', '#ffcc99', '#c2c2f0']
+            wedges, texts, autotexts = ax.pie(
+                letras_count.values,
+                labels=letras_count.index,
+                autopct=lambda pct: func(pct, letras_count.values),
+                startangle=90,
+                colors=colores,
+                wedgeprops={'linewidth':1, 'edgecolor': 'white'},
+                textprops={'color':'black', 'fontsize':10}
+            )
+            ax.set_title('Distribución por Letra de Expediente',  fontsize= 12, fontweight='bold')
+            for autotext in autotexts:
+                autotext.set_color('black')
+                autotext.set_fontsize(10)
+                autotext.set_fontweight('bold')
+
+            centro_circulo = Circle((0,0),0.70, fc='white')
+            ax.add_artist(centro_circulo)
+            ax.axis('equal')
+            figura.tight_layout()
+            grafico.registrar(
+                actualizador_torta(wedges, texts, autotexts, lambda a: a.conteo('letra'),
+                                   lambda serie: lambda pct: func(pct, serie.values)),
+                *wedges, centro_circulo, *texts, *autotexts
+            )
+
+        elif tipo_grafico == "Gráfico de Operadores":
+            ax = figura.add_subplot(111)
+            operadores_count = agregados.vista(('conteo', 'Operador'), **vista)
+            barras = barras_redondeadas(ax, operadores_count.values, colormaps['Pastel2'], linewidth=2)
+
+            ax.set_facecolor('#f0f0f0')
+            ax.set_xlim(-0.5, len(operadores_count) -0.5)
+            ax.set_ylim(0, operadores_count.max() + 2)
+            ax.set_title('Actuaciones por Operador', fontsize=12, fontweight='bold')
+            ax.set_xlabel('Operador', fontsize=12)
+            ax.set_ylabel('Cantidad de Actuaciones', fontsize=12)
+
+            nombres = etiquetas_categorias(ax, operadores_count.index, fontsize=8, rotation=45, ha='right')
+            etiquetas = etiquetas_de_barras(ax, operadores_count.values, desplazamiento=0.3, fontsize=10)
+
+            figura.tight_layout()
+            grafico.registrar(
+                actualizador_barras_redondeadas(ax, barras, etiquetas, nombres, colormaps['Pastel2'],
+                                                lambda a: a.vista(('conteo', 'Operador'), **vista),
+                                                desplazamiento=0.3, margen=2),
+                barras, etiquetas
+            )
+
+        elif tipo_grafico == "Gráfico de Actividad":
+            ax = figura.add_subplot(111)
+            horas_count = agregados.horas()
+
+            linea, = ax.plot(horas_count.index, horas_count.values, marker='o', linestyle='--', color='blue', markersize=8, markerfacecolor='red')
+            ax.set_title('Actividad por Hora', fontsize=16, color='darkgreen')
+            ax.set_xlabel('Hora del Día', fontsize=12, color='darkblue')
+            ax.set_ylabel('Cantidad de Actuaciones', fontsize=12, color='darkblue')
+
+            textos = []
+            for x, y in zip(horas_count.index, horas_count.values):
+                if y == horas_count.max():
+                    textos.append(ax.text(x, y + 2, str(y), fontsize=10, color='black', ha='center', fontweight='bold'))
+                else:
+                    textos.append(ax.text(x, y - 2, str(y), fontsize=10, color='black', ha='center', fontweight='bold'))
+
+            ax.set_xlim(horas_count.index.min() - 1, horas_count.index.max() + 1)
+            ax.set_ylim(0, horas_count.values.max() + 5)
+            ax.spines['top'].set_visible(False)
+            ax.spines['right'].set_visible(False)
+            ax.spines['bottom'].set_color('gray')
+            ax.spines['left'].set_color('gray')
+            ax.tick_params(axis='x', colors='purple', labelsize=10)
+            ax.tick_params(axis='y', colors='purple', labelsize=10)
+
+            horas_graficadas = list(horas_count.index)
+
+            def actualizar_actividad(agregados):
+                horas = agregados.horas()
+                if list(horas.index) != horas_graficadas:
+                    return REARMAR
+                linea.set_data(horas.index, horas.values)
+                for texto, x, y in zip(textos, horas.index, horas.values):
+                    texto.set_position((x, y + 2 if y == horas.max() else y - 2))
+                    texto.set_text(str(y))
+                ax.set_ylim(0, horas.values.max() + 5)
+                return DATOS
+
+            grafico.registrar(actualizar_actividad, linea, *textos)
+
+        elif tipo_grafico == "Gráfico Actividad por Área":
+            ax = figura.add_subplot(111)
+            descripcion_count = agregados.vista(('conteo', 'Descripcion'), **vista)
+            barras = barras_redondeadas(ax, descripcion_count.values, colormaps['viridis'], linewidth=1)
+
+            ax.set_facecolor('#f0f0f0')
+            ax.set_xlim(-0.5, len(descripcion_count) - 0.5)
+            ax.set_ylim(0, descripcion_count.max() + 2)
+            ax.set_title('Distribución de Actividad por Descripción', fontsize=12, fontweight='bold')
+            ax.set_xlabel('Descripción', fontsize=12)
+            ax.set_ylabel('Cantidad', fontsize=12)
+            nombres = etiquetas_categorias(ax, descripcion_count.index, fontsize=8, rotation=45, ha='right')
+            etiquetas = etiquetas_de_barras(ax, descripcion_count.values, desplazamiento=0.3, fontsize=9)
+
+            figura.tight_layout()
+            grafico.registrar(
+                actualizador_barras_redondeadas(ax, barras, etiquetas, nombres, colormaps['viridis'],
+                                                lambda a: a.vista(('conteo', 'Descripcion'), **vista),
+                                                desplazamiento=0.3, margen=2),
+                barras, etiquetas
+            )
+
+        elif tipo_grafico == "Mostrar Todos":
+            axs = figura.subplots(2, 2)
+
+            # Gráfico de Expedientes
+            letras_count = agregados.conteo('letra')
+            bars = axs[0, 0].bar(letras_count.index, letras_count.values)
+            axs[0, 0].set_title('Distribución por Tipo de Letra')
+            textos = [
+                axs[0, 0].text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1, int(bar.get_height()), ha='center', fontsize=9)
+                for bar in bars
+            ]
+            grafico.registrar(
+                actualizador_barras_simples(axs[0, 0], bars, textos, letras_count.index, lambda a: a.conteo('letra')),
+                *bars, *textos
+            )
+
+            # Gráfico de Operadores
+            operadores_count = agregados.vista(('conteo', 'Operador'), top_n=top_n)
+            bars = axs[0, 1].bar(operadores_count.index, operadores_count.values)
+            axs[0, 1].set_title('Actuaciones por Operador')
+            axs[0, 1].set_xlabel('Operador')
+            axs[0, 1].set_ylabel('Cantidad de Actuaciones')
+            axs[0, 1].tick_params(axis='x', rotation=45, labelsize=8)
+            textos = [
+                axs[0, 1].text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1, int(bar.get_height()), ha='center', fontsize=9)
+                for bar in bars
+            ]
+            grafico.registrar(
+                actualizador_barras_simples(axs[0, 1], bars, textos, operadores_count.index,
+                                            lambda a: a.vista(('conteo', 'Operador'), top_n=top_n)),
+                *bars, *textos
+            )
+
+            # Gráfico de Actividad por Hora
+            horas_count = agregados.horas()
+            linea, = axs[1, 0].plot(horas_count.index, horas_count.values, marker='o')
+            axs[1, 0].set_title('Actividad por Hora')
+            axs[1, 0].set_xlabel('Hora del Día')
+            axs[1, 0].set_ylabel('Cantidad de Actuaciones')
+            textos_horas = [axs[1, 0].text(x, y, str(y), fontsize=9, ha='center')
+                            for x, y in zip(horas_count.index, horas_count.values)]
+            horas_graficadas = list(horas_count.index)
+
+            def actualizar_horas(agregados):
+                horas = agregados.horas()
+                if list(horas.index) != horas_graficadas:
+                    return REARMAR
+                linea.set_data(horas.index, horas.values)
+                for texto, x, y in zip(textos_horas, horas.index, horas.values):
+                    texto.set_position((x, y))
+                    texto.set_text(str(y))
+                axs[1, 0].relim()
+                axs[1, 0].autoscale_view()
+                return DATOS
+
+            grafico.registrar(actualizar_horas, linea, *textos_horas)
+
+            # Gráfico Actividad por Descripción
+            descripcion_count = agregados.vista(('conteo', 'Descripcion'), top_n=top_n)
+            bars = axs[1, 1].bar(descripcion_count.index, descripcion_count.values)
+            axs[1, 1].set_title('Distribución de Actividad por Descripción')
+            axs[1, 1].set_xlabel('Descripción')
+            axs[1, 1].set_ylabel('Cantidad')
+            axs[1, 1].tick_params(axis='x', rotation=45, labelsize=8)
+            textos = [
+                axs[1, 1].text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1, int(bar.get_height()), ha='center', fontsize=9)
+                for bar in bars
+            ]
+            grafico.registrar(
+                actualizador_barras_simples(axs[1, 1], bars, textos, descripcion_count.index,
+                                            lambda a: a.vista(('conteo', 'Descripcion'), top_n=top_n)),
+                *bars, *textos
+            )
+
+            figura.tight_layout()
+
+    elif informe_tipo == "Informe por Categoria" and tipo_grafico in [
+        "Gráfico de Barras por Categoría",
+        "Gráfico Circular por Tipo",
+        "Mostrar Todos"
+    ]:
+        # Implementación de gráficos para "Informe por Categoria"
+        if tipo_grafico == "Gráfico de Barras por Categoría":
+            ax = figura.add_subplot(111)
+            categoria_count = agregados.vista(('suma', 'Categoria', 'Conteo'), **vista)
+            barras = barras_redondeadas(ax, categoria_count.values, colormaps['viridis'], linewidth=1)
+
+            ax.set_facecolor('#f0f0f0')
+            ax.set_xlim(-0.5, len(categoria_count) - 0.5)
+            ax.set_ylim(0, categoria_count.max() + 2)
+            ax.set_title('Totales por Categoría', fontsize=16, fontweight='bold')
+            ax.set_xlabel('Categoría', fontsize=12, labelpad=20)
+            ax.set_ylabel('Cantidad total en el periodo', fontsize=12)
+
+            nombres = etiquetas_categorias(
+                ax, categoria_count.index, fontsize=8, rotation=60, ha='right', rotation_mode='anchor'
+            )
+            etiquetas = etiquetas_de_barras(ax, categoria_count.values, desplazamiento=0.5, fontsize=9)
+
+            figura.tight_layout()
+            figura.subplots_adjust(bottom=0.2)
+            grafico.registrar(
+                actualizador_barras_redondeadas(ax, barras, etiquetas, nombres, colormaps['viridis'],
+                                                lambda a: a.vista(('suma', 'Categoria', 'Conteo'), **vista),
+                                                desplazamiento=0.5, margen=2),
+                barras, etiquetas
+            )
+
+
+        elif tipo_grafico == "Gráfico Circular por Tipo":
+            ax = figura.add_subplot(111)
+            tipo_count = agregados.conteo('Tipo')
+            wedges, texts, autotexts = ax.pie(tipo_count, labels=tipo_count.index, autopct='%1.1f%%')
+            ax.set_title('Distribución por Tipo')
+            grafico.registrar(
+                actualizador_torta(wedges, texts, autotexts, lambda a: a.conteo('Tipo'), lambda serie: '%1.1f%%',
+                                   startangle=0),
+                *wedges, *texts, *autotexts
+            )
+
+        elif tipo_grafico == "Mostrar Todos":
+            axs = figura.subplots(1, 2)
+
+            categoria_count = agregados.vista(('suma', 'Categoria', 'Conteo'), top_n=top_n)
+            bars = axs[0].bar(categoria_count.index, categoria_count.values, width=0.6)
+            axs[0].set_title('Totales por Categoría', fontsize=14)
+            axs[0].set_xlabel('Categoría', fontsize=12)
+            axs[0].set_ylabel('Cantidad total en el periodo', fontsize=12)
+            axs[0].set_xticks(range(len(categoria_count.index)))
+            axs[0].set_xticklabels(categoria_count.index, rotation=45, ha='right', fontsize=8)
+            max_conteo = categoria_count.max()
+            axs[0].yaxis.set_major_locator(MaxNLocator(integer=True, nbins=10))
+            axs[0].set_ylim(0, max_conteo + 10)
+            for bar in bars:
+                yval = bar.get_height()
+                axs[0].text(bar.get_x() + bar.get_width()/2, yval + 1, int(yval), ha='center', fontsize=9)
+
+            tipo_count = agregados.conteo('Tipo')
+            axs[1].pie(tipo_count, labels=tipo_count.index, autopct='%1.1f%%', startangle=90, labeldistance=1.1)
+            axs[1].set_title('Distribución por Tipo')
+
+            figura.tight_layout()
+
+    elif informe_tipo == "Novedades de Beneficios" and tipo_grafico == "Gráfico de Altas por Mes":
+        ax = figura.add_subplot(111)
+        altas_por_mes = agregados.por_periodo().copy()
+        altas_por_mes['Periodo'] = altas_por_mes['Anio'].astype(str) + '-' + altas_por_mes['Mes'].astype(str)
+
+        norm = Normalize(altas_por_mes['Cantidad'].min(), altas_por_mes['Cantidad'].max())
+        cmap = colormaps['plasma']
+
+        bars = ax.bar(
+            altas_por_mes['Periodo'], 
+            altas_por_mes['Cantidad'], 
+            color=cmap(norm(altas_por_mes['Cantidad'])), 
+            edgecolor='black', 
+            linewidth=1.2
+        )
+        ax.set_title('Cantidad de Altas por Mes', fontsize=16, weight='bold', family='Verdana', color='#333333')
+        ax.set_xlabel('Mes', fontsize=12, family='Verdana', color='#333333')
+        ax.set_ylabel('Cantidad de Altas', fontsize=12, family='Verdana', color='#333333')
+
+        for bar in bars:
+             yval = bar.get_height()
+             ax.text(bar.get_x() + bar.get_width()/2, yval + 1, int(yval), ha='center', fontsize=9)
+
+        sm = ScalarMappable(cmap=cmap, norm=norm)
+        sm.set_array([])
+        cbar = figura.colorbar(sm, ax=ax)
+        cbar.set_label('Cantidad', fontsize=12, family='Verdana')
+
+        figura.tight_layout()
+
+    elif informe_tipo == "Informe de Operadores" and tipo_grafico == "Comparación de Operadores":
+        # Solo con todos los operadores: actuaciones de cada uno, de mayor a menor
+        clave = GRAFICOS_POR_CATEGORIA[(informe_tipo, tipo_grafico)]
+        ax = figura.add_subplot(111)
+        operadores_count = agregados.vista(clave, **vista)
+        barras = barras_redondeadas(ax, operadores_count.values, colormaps['Pastel2'], linewidth=2)
+
+        # Promedio de todos los operadores (no solo de los que se ven) como referencia
+        promedio = agregados.vista(clave).mean()
+        linea_promedio = ax.axhline(promedio, color='#c0392b', linestyle='--', linewidth=1.2)
+        texto_promedio = ax.text(1.0, promedio, f' Promedio {promedio:.1f}', color='#c0392b', fontsize=9,
+                                 va='bottom', ha='right', transform=ax.get_yaxis_transform())
+
+        ax.set_facecolor('#f0f0f0')
+        ax.set_xlim(-0.5, len(operadores_count) - 0.5)
+        ax.set_ylim(0, max(operadores_count.max(), promedio) + 2)
+        ax.set_title('Comparación de Actuaciones por Operador', fontsize=12, fontweight='bold')
+        ax.set_xlabel('Operador', fontsize=12)
+        ax.set_ylabel('Cantidad de Actuaciones', fontsize=12)
+
+        nombres = etiquetas_categorias(ax, operadores_count.index, fontsize=8, rotation=45, ha='right')
+        etiquetas = etiquetas_de_barras(ax, operadores_count.values, desplazamiento=0.3, fontsize=10)
+        actualizar_barras = actualizador_barras_redondeadas(
+            ax, barras, etiquetas, nombres, colormaps['Pastel2'],
+            lambda a: a.vista(clave, **vista), desplazamiento=0.3, margen=2
+        )
+
+        def actualizar_comparacion(agregados):
+            estado = actualizar_barras(agregados)
+            if estado != REARMAR:
+                nuevo = agregados.vista(clave).mean()
+                linea_promedio.set_ydata([nuevo, nuevo])
+                texto_promedio.set_y(nuevo)
+                texto_promedio.set_text(f' Promedio {nuevo:.1f}')
+                ax.set_ylim(0, max(ax.get_ylim()[1], nuevo + 2))
+            return estado
+
+        figura.tight_layout()
+        grafico.registrar(actualizar_comparacion, barras, etiquetas, linea_promedio, texto_promedio)
+
+
+def renderizar_grafico(informe_tipo, tipo_grafico, agregados, ancho, alto, dpi=100, anterior=None, vista=None):
+    """
+    Arma el gráfico en una Figure de Agg de ancho x alto píxeles y lo dibuja.
+    Devuelve (grafico, imagen): el GraficoVivo, que se conserva para
+    exportarlo o actualizarlo después, y un arreglo RGBA (alto, ancho, 4).
+
+    anterior es el mismo gráfico (mismo tipo y tamaño) dibujado con datos
+    anteriores: si sus categorías no cambiaron se actualiza en el lugar en
+    vez de armarlo de nuevo. vista se pasa a construir_grafico.
+    """
+    if anterior is not None:
+        with anterior.lock:
+            with tramo('actualizacion_grafico'):
+                estado = anterior.actualizar(agregados)
+            if estado != REARMAR:
+                with tramo('dibujo', pixeles=ancho * alto, solo_datos=estado == DATOS):
+                    return anterior, anterior.dibujar(solo_datos=estado == DATOS)
+
+    with tramo('armado'):
+        grafico = GraficoVivo(Figure(figsize=(ancho / dpi, alto / dpi), dpi=dpi))
+        construir_grafico(grafico, informe_tipo, tipo_grafico, agregados, vista)
+    with grafico.lock, tramo('dibujo', pixeles=ancho * alto):
+        return grafico, grafico.dibujar()
+
+
+def guardar_grafico(ruta, informe_tipo, tipo_grafico, agregados, tamanio=(12, 7), dpi=150, vista=None):
+    """
+    Arma el gráfico y lo guarda en ruta (el formato sale de la extensión:
+    PNG, SVG, PDF...) sin mostrarlo, por ejemplo desde la línea de comandos.
+    tamanio es (ancho, alto) en pulgadas.
+    """
+    with tramo('armado', grafico=tipo_grafico):
+        grafico = GraficoVivo(Figure(figsize=tamanio, dpi=dpi))
+        construir_grafico(grafico, informe_tipo, tipo_grafico, agregados, vista)
+    with tramo('guardado_grafico', grafico=tipo_grafico) as t:
+        grafico.figura.savefig(ruta, dpi=dpi)
+        t.anotar(bytes=os.path.getsize(ruta))
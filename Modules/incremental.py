@@ -0,0 +1,117 @@
+# Modules/incremental.py
+
+import datetime
+
+import pandas as pd
+
+from Modules.dataset import huella
+
+# Informes que admiten refresco incremental: columna de fecha y su formato
+COLUMNAS_MARCA = {
+    "Informe de Altas": ('fech_alta', '%d-%m-%Y %H:%M'),
+}
+
+
+def _fechas(df, columna, formato):
+    return pd.to_datetime(df[columna], format=formato, errors='coerce')
+
+
+class RefrescoIncremental:
+    """
+    Lleva la marca de agua (la fecha más reciente vista) del informe cargado
+    para que la actualización en tiempo real traiga solo las filas nuevas.
+
+    Como la fecha tiene precisión de minutos, también se recuerdan los hashes
+    de las filas que caen justo en la marca: así una fila nueva del mismo
+    minuto no se pierde y una ya vista no se duplica.
+    """
+
+    def __init__(self):
+        self.params = None
+        self.marca = None
+        self._hashes_en_marca = set()
+        self._huella_reciente = None
+
+    def iniciar(self, params, df):
+        """
+        Registra el informe recién generado con sus parámetros
+        (informe_tipo, fecha_inicio, fecha_fin, codigo_operador, letra).
+        """
+        self.params = None
+        self.marca = None
+        self._hashes_en_marca = set()
+        self._huella_reciente = None
+        informe_tipo = params[0]
+        if informe_tipo not in COLUMNAS_MARCA or df is None or df.empty:
+            return
+        columna, formato = COLUMNAS_MARCA[informe_tipo]
+        if columna not in df.columns:
+            return
+        self.params = params
+        self._avanzar(df, _fechas(df, columna, formato))
+
+    def admite(self, params):
+        """
+        True si se puede refrescar incrementalmente: mismo informe y mismos
+        parámetros que la última generación, con un rango que incluye hoy.
+        """
+        if self.params is None or params != self.params:
+            return False
+        fecha_inicio = datetime.date.fromisoformat(params[1])
+        fecha_fin = datetime.date.fromisoformat(params[2])
+        return fecha_inicio <= datetime.date.today() <= fecha_fin
+
+    def desde(self, hoy):
+        """
+        Primer día ('yyyy-mm-dd') que tiene que consultar el refresco: el de
+        la marca de agua, porque una fila de ese día que llegó después del
+        último refresco (por ejemplo, antes de medianoche) también es nueva;
+        hoy si no hay marca, y nunca antes del inicio del informe.
+        """
+        if self.marca is None or pd.isna(self.marca):
+            return hoy
+        return max(min(self.marca.date().isoformat(), hoy), self.params[1])
+
+    def sin_cambios(self, df_reciente):
+        """
+        True si la consulta reciente (cruda) devolvió exactamente lo mismo
+        que la anterior: entonces no hay filas nuevas y no hace falta
+        tiparla ni compararla con la marca.
+        """
+        if df_reciente is None:
+            return False
+        anterior, self._huella_reciente = self._huella_reciente, huella(df_reciente)
+        return self._huella_reciente == anterior
+
+    def filas_nuevas(self, df_reciente):
+        """
+        Devuelve las filas de df_reciente posteriores a la marca de agua
+        (o en la marca pero todavía no vistas) y avanza la marca.
+        """
+        if df_reciente is None or df_reciente.empty:
+            return df_reciente
+        columna, formato = COLUMNAS_MARCA[self.params[0]]
+        fechas = _fechas(df_reciente, columna, formato)
+        if self.marca is None:
+            nuevas = fechas.notna()
+        else:
+            en_marca = fechas == self.marca
+            hashes = pd.util.hash_pandas_object(df_reciente[en_marca], index=False)
+            repetidas = pd.Series(False, index=df_reciente.index)
+            repetidas[en_marca] = hashes.isin(list(self._hashes_en_marca)).to_numpy()
+            nuevas = (fechas > self.marca) | (en_marca & ~repetidas)
+        resultado = df_reciente[nuevas.to_numpy()].reset_index(drop=True)
+        self._avanzar(resultado, fechas[nuevas.to_numpy()].reset_index(drop=True))
+        return resultado
+
+    def _avanzar(self, df, fechas):
+        if fechas.notna().sum() == 0:
+            return
+        maxima = fechas.max()
+        en_marca = (fechas == maxima).to_numpy()
+        hashes = set(pd.util.hash_pandas_object(df[en_marca], index=False))
+        if self.marca is None or maxima > self.marca:
+            self.marca = maxima
+            self._hashes_en_marca = hashes
+        else:
+            self._hashes_en_marca |= hashes
@@ -0,0 +1,294 @@
+# Modules/informes.py
+
+import os
+
+from Modules.parallel import MAX_WORKERS, REINTENTOS, con_reintentos, ejecutar_en_paralelo
+from Modules.trazas import medir_dataframe, tramo
+
+# pandas, pyodbc y matplotlib se importan dentro de las funciones que los usan:
+# este módulo lo importa la ventana al arrancar y debe cargar rápido.
+
+# Procedimiento almacenado de cada informe que se consulta por rango de fechas
+PROCEDIMIENTOS = {
+    "Informe de Altas": "Will_ObtenerDatosParaInforme2024V3",
+    "Informe por Categoria": "Will_ObtenerDatosParaInforme2024V4",
+    "Novedades de Beneficios": "Will_novedades_altasv1",
+}
+
+# Informes disponibles, en el orden en que se muestran
+INFORMES = list(PROCEDIMIENTOS) + ["Informe de Operadores"]
+
+# Gráficos que ofrece cada informe
+GRAFICOS_POR_INFORME = {
+    "Informe de Altas": [
+        "Gráfico de Expedientes",
+        "Gráfico de Operadores",
+        "Gráfico de Actividad",
+        "Gráfico Actividad por Área",
+        "Mostrar Todos",
+    ],
+    "Informe por Categoria": [
+        "Gráfico de Barras por Categoría",
+        "Gráfico Circular por Tipo",
+        "Mostrar Todos",
+    ],
+    "Novedades de Beneficios": [
+        "Gráfico de Altas por Mes",
+    ],
+    "Informe de Operadores": [],
+}
+
+# Código de operador que pide el Informe de Operadores de todos los operadores a la vez
+TODOS_LOS_OPERADORES = "todos"
+# Operadores que se consultan a la vez en el informe de todos los operadores
+# (el pool se amplía a esta cantidad de conexiones): cada consulta es corta y
+# casi todo su tiempo es espera del servidor, así que con unos 80 operadores
+# son 5 tandas en lugar de 20
+MAX_WORKERS_OPERADORES = 16
+# Gráficos del Informe de Operadores con todos los operadores
+GRAFICOS_TODOS_LOS_OPERADORES = ["Comparación de Operadores"]
+# Columnas que se agregan al informe de todos los operadores para distinguirlos
+COLUMNA_CODIGO_OPERADOR = 'CodigoOperador'
+COLUMNA_NOMBRE_OPERADOR = 'NombreOperador'
+# Clave de df.attrs con los operadores cuya consulta falló aun después de
+# los reintentos: [(codigo, nombre, error)]
+OPERADORES_CON_ERROR = 'operadores_con_error'
+
+# Gráficos de barras por categoría que admiten top N y paginado, con el agregado que grafican
+GRAFICOS_POR_CATEGORIA = {
+    ("Informe de Altas", "Gráfico de Operadores"): ('conteo', 'Operador'),
+    ("Informe de Altas", "Gráfico Actividad por Área"): ('conteo', 'Descripcion'),
+    ("Informe por Categoria", "Gráfico de Barras por Categoría"): ('suma', 'Categoria', 'Conteo'),
+    ("Informe de Operadores", "Comparación de Operadores"): ('conteo', COLUMNA_NOMBRE_OPERADOR),
+}
+
+# Categorías por página cuando se pagina el eje x
+VENTANA_CATEGORIAS = 30
+
+
+def obtener_datos(informe_tipo, fecha_inicio, fecha_fin, codigo_operador=None, letra=None,
+                  on_batch=None, force_refresh=False, max_workers=None):
+    """
+    Ejecuta la consulta correspondiente al tipo de informe.
+    No usa la interfaz, así que se puede llamar desde cualquier hilo.
+    Los rangos largos se consultan por meses en paralelo y el informe de
+    todos los operadores, operador por operador, hasta max_workers consultas
+    a la vez (None: MAX_WORKERS o MAX_WORKERS_OPERADORES, según el informe).
+    """
+    from Modules.database_utils import fetch_data_from_database, fetch_data_operadores
+
+    if informe_tipo in PROCEDIMIENTOS:
+        return fetch_data_from_database(fecha_inicio, fecha_fin, PROCEDIMIENTOS[informe_tipo],
+                                        on_batch=on_batch, force_refresh=force_refresh,
+                                        max_workers=max_workers or MAX_WORKERS)
+
+    elif informe_tipo == "Informe de Operadores" and codigo_operador == TODOS_LOS_OPERADORES:
+        return obtener_todos_los_operadores(fecha_inicio, fecha_fin, letra, on_batch=on_batch,
+                                            force_refresh=force_refresh,
+                                            max_workers=max_workers or MAX_WORKERS_OPERADORES)
+
+    elif informe_tipo == "Informe de Operadores":
+        return fetch_data_operadores(fecha_inicio, fecha_fin, codigo_operador, letra,
+                                     on_batch=on_batch, force_refresh=force_refresh)
+
+    return None
+
+
+def obtener_todos_los_operadores(fecha_inicio, fecha_fin, letra=None, operadores=None, on_batch=None,
+                                 force_refresh=False, max_workers=MAX_WORKERS_OPERADORES, reintentos=REINTENTOS):
+    """
+    Informe de Operadores de todos los operadores (o de la lista
+    operadores [(codigo, descripcion)]) en un solo DataFrame, con las
+    columnas CodigoOperador y NombreOperador al principio.
+
+    No hay un procedimiento que devuelva todos los operadores de una vez,
+    así que se llama a Will_ObtenerMovimientos_por_operador por cada uno,
+    hasta max_workers a la vez; el pool de conexiones se amplía a
+    max_workers para que ninguna espere una conexión libre. Cada resultado
+    queda en la caché local como si se hubiera pedido solo. on_batch
+    recibe el resultado de cada operador, en el orden de la lista.
+
+    Cada operador se reintenta por separado; los que fallan igual no
+    cortan el informe, pero quedan en df.attrs[OPERADORES_CON_ERROR]
+    para avisarle al usuario en lugar de faltar sin explicación.
+    """
+    import pandas as pd
+    from Modules.cancelacion import ConsultaCancelada
+    from Modules.connection_pool import get_pool
+    from Modules.database_utils import consultar_movimientos_operador
+    from Modules.operadores import consultar_operadores, leer_copia_local
+
+    if operadores is None:
+        operadores = leer_copia_local() or consultar_operadores() or []
+
+    con_error = []
+    get_pool(max_workers)
+
+    def tarea(codigo, nombre):
+        def consultar():
+            df = consultar_movimientos_operador(fecha_inicio, fecha_fin, codigo, letra,
+                                                force_refresh=force_refresh)
+            if df.empty:
+                return df
+            df.insert(0, COLUMNA_CODIGO_OPERADOR, codigo)
+            df.insert(1, COLUMNA_NOMBRE_OPERADOR, nombre)
+            return df
+
+        def intentar():
+            try:
+                return con_reintentos(consultar, reintentos, descripcion=f"operador {codigo}")
+            except ConsultaCancelada:
+                raise
+            except Exception as e:
+                print(f"Advertencia: no se pudieron obtener los datos del operador {codigo} ({nombre}): {e}")
+                con_error.append((codigo, nombre, str(e) or type(e).__name__))
+                return None
+        return intentar
+
+    partes = []
+
+    def recibido(_, df):
+        if df is None or df.empty:
+            return
+        partes.append(df)
+        if on_batch is not None:
+            on_batch(df)
+
+    # Los reintentos van dentro de cada tarea, para anotar el error del operador que falle igual
+    with tramo('todos_los_operadores', operadores=len(operadores)) as t:
+        ejecutar_en_paralelo(
+            [tarea(codigo, nombre) for codigo, nombre in operadores],
+            max_workers=max_workers, reintentos=0, on_result=recibido
+        )
+        t.anotar(con_datos=len(partes), con_error=len(con_error))
+    df = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+    if con_error:
+        orden = {codigo: i for i, (codigo, _) in enumerate(operadores)}
+        df.attrs[OPERADORES_CON_ERROR] = sorted(con_error, key=lambda error: orden[error[0]])
+    return df
+
+
+def operadores_con_error(df):
+    """
+    Operadores [(codigo, nombre, error)] que faltan en el informe de todos
+    los operadores porque su consulta falló.
+    """
+    return df.attrs.get(OPERADORES_CON_ERROR, []) if df is not None else []
+
+
+def graficos_disponibles(informe_tipo, codigo_operador=None):
+    """
+    Gráficos que ofrece el informe; el Informe de Operadores solo tiene
+    gráfico cuando se piden todos los operadores.
+    """
+    if informe_tipo == "Informe de Operadores" and codigo_operador == TODOS_LOS_OPERADORES:
+        return GRAFICOS_TODOS_LOS_OPERADORES
+    return GRAFICOS_POR_INFORME.get(informe_tipo, [])
+
+
+def cargar_informe(*args, **kwargs):
+    """
+    Consulta el informe (mismos argumentos que obtener_datos) y lo tipa una sola vez.
+    """
+    return _tipar(obtener_datos(*args, **kwargs))
+
+
+def _tipar(df):
+    from Modules.dataset import ReportDataset
+
+    with tramo('tipado') as t:
+        dataset = ReportDataset(df)
+        medir_dataframe(t, dataset.df)
+    return dataset
+
+
+def cargar_cambios(*args, anterior, **kwargs):
+    """
+    Vuelve a cargar un informe (mismos argumentos que cargar_informe) y lo
+    compara con el dataset anterior. Devuelve (dataset, filas), con filas
+    como en ReportDataset.filas_agregadas: vacío si no cambió nada, las
+    filas nuevas, o None si hay que mostrarlo entero.
+
+    Si la consulta cruda es idéntica a la que dio el dataset anterior,
+    devuelve el anterior sin tiparla: es lo que pasa en casi todos los
+    refrescos en tiempo real.
+    """
+    import pandas as pd
+    from Modules.dataset import huella
+
+    df = obtener_datos(*args, **kwargs)
+    if df is None:
+        df = pd.DataFrame()
+    with tramo('comparacion', filas=len(df)):
+        huella_cruda = huella(df)
+    if huella_cruda == anterior.huella_cruda:
+        return anterior, anterior.df.iloc[:0]
+
+    dataset = _tipar(df)
+    dataset.huella_cruda = huella_cruda
+    with tramo('comparacion') as t:
+        filas = dataset.filas_agregadas(anterior)
+        t.anotar(filas=len(dataset), nuevas=None if filas is None else len(filas))
+    if filas is not None and filas.empty:
+        anterior.huella_cruda = huella_cruda
+    return dataset, filas
+
+
+def nombre_sugerido(informe_tipo, fecha_inicio, fecha_fin):
+    """
+    Nombre de archivo (sin extensión) para el informe y el rango de fechas
+    (en formato yyyy-MM-dd), por ejemplo Informe_de_Altas_20250101_al_20250131.
+    """
+    return (f"{informe_tipo.replace(' ', '_')}_{fecha_inicio.replace('-', '')}"
+            f"_al_{fecha_fin.replace('-', '')}")
+
+
+def hojas_por_operador(df, comparacion):
+    """
+    Hojas del Excel del informe de todos los operadores: la comparación
+    (actuaciones por operador), los operadores cuya consulta falló (si
+    hubo) y una hoja por operador con sus filas, en el orden en que
+    llegaron. Las hojas por operador se arman a medida que se escriben,
+    así no se copia el informe entero.
+    """
+    import pandas as pd
+    from Modules.exportacion import nombre_de_hoja
+
+    usados = set()
+    yield nombre_de_hoja("Comparación", usados), comparacion
+    con_error = operadores_con_error(df)
+    if con_error:
+        yield nombre_de_hoja("Operadores con error", usados), pd.DataFrame(
+            con_error, columns=['Codigo', 'Operador', 'Error'])
+    grupos = df.groupby(COLUMNA_CODIGO_OPERADOR, sort=False, observed=True).indices
+    for codigo, filas in grupos.items():
+        parte = df.iloc[filas]
+        yield nombre_de_hoja(f"{codigo} {parte[COLUMNA_NOMBRE_OPERADOR].iloc[0]}", usados), parte
+
+
+def exportar_informe(ruta, df, agregados, informe_tipo, on_progress=None):
+    """
+    Exporta el informe a ruta (.xlsx, .csv o .parquet) con exportacion.exportar.
+    En Excel se agrega una hoja por cada agregado del informe
+    (AggregationCache.resumenes). El informe de todos los operadores va
+    en Excel con una hoja por operador (ver hojas_por_operador).
+    """
+    from Modules.exportacion import exportar, exportar_libro
+
+    por_operador = informe_tipo == "Informe de Operadores" and COLUMNA_CODIGO_OPERADOR in df.columns
+    if por_operador and ruta.lower().endswith('.xlsx'):
+        comparacion = agregados.resumenes(informe_tipo)['Por operador']
+        with tramo('escritura', formato='.xlsx', filas=len(df), hojas=len(comparacion) + 1) as t:
+            filas = len(df) + len(comparacion) + len(operadores_con_error(df))
+            exportar_libro(ruta, hojas_por_operador(df, comparacion), filas, on_progress)
+            t.anotar(bytes=os.path.getsize(ruta))
+        return ruta
+
+    hojas = None
+    if ruta.lower().endswith('.xlsx'):
+        with tramo('resumenes'):
+            hojas = agregados.resumenes(informe_tipo)
+    with tramo('escritura', formato=os.path.splitext(ruta)[1].lower(), filas=len(df)) as t:
+        exportar(ruta, df, hojas, on_progress)
+        t.anotar(bytes=os.path.getsize(ruta))
+    return ruta
@@ -0,0 +1,65 @@
+# Modules/operadores.py
+
+import decimal
+import json
+import os
+
+from Modules.result_cache import directorio_usuario
+
+ARCHIVO_OPERADORES = 'operadores.json'
+
+
+def _ruta():
+    return os.path.join(directorio_usuario(), ARCHIVO_OPERADORES)
+
+
+def _nativo(valor):
+    # Los códigos pueden llegar como Decimal desde pyodbc
+    if isinstance(valor, decimal.Decimal):
+        return int(valor) if valor == valor.to_integral_value() else float(valor)
+    return valor
+
+
+def leer_copia_local():
+    """
+    Lista de operadores [(codigo, descripcion)] guardada en la última
+    consulta, o None si no hay copia. Solo lee un JSON: no usa pandas ni
+    la base, así que se puede llamar al arrancar.
+    """
+    try:
+        with open(_ruta(), encoding='utf-8') as f:
+            return [(codigo, descripcion) for codigo, descripcion in json.load(f)]
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"No se pudo leer la copia local de operadores: {e}")
+        return None
+
+
+def guardar_copia_local(operadores):
+    try:
+        ruta = _ruta()
+        with open(ruta + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump([[codigo, descripcion] for codigo, descripcion in operadores], f, ensure_ascii=False)
+        os.replace(ruta + '.tmp', ruta)
+    except Exception as e:
+        print(f"No se pudo guardar la copia local de operadores: {e}")
+
+
+def consultar_operadores():
+    """
+    Consulta la lista de operadores en v_personal_jub y actualiza la copia
+    local. Devuelve [(codigo, descripcion)] ordenada por descripción, o
+    None si no se pudo consultar (en ese caso la copia no se toca).
+    """
+    from Modules.database_utils import fetch_operators_list
+
+    df_ops = fetch_operators_list()
+    if df_ops.empty:
+        return None
+    operadores = [
+        (_nativo(codigo), descripcion)
+        for codigo, descripcion in zip(df_ops['Codigo'].tolist(), df_ops['descripcion'].tolist())
+    ]
+    guardar_copia_local(operadores)
+    return operadores
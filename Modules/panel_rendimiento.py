@@ -0,0 +1,117 @@
+# Modules/panel_rendimiento.py
+
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtWidgets import (
+    QAbstractItemView, QHBoxLayout, QHeaderView, QLabel, QTableWidget, QTableWidgetItem,
+    QToolButton, QVBoxLayout, QWidget
+)
+
+from Modules import trazas
+
+# Corridas que se listan en el panel (las estadísticas usan todo el historial)
+CORRIDAS_VISIBLES = 10
+
+
+def _ms(segundos):
+    return f"{segundos * 1000:,.0f} ms".replace(',', '.')
+
+
+def _celda(texto, alinear_derecha=False):
+    item = QTableWidgetItem(texto)
+    if alinear_derecha:
+        item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+    return item
+
+
+class PanelRendimiento(QWidget):
+    """
+    Panel plegable con los tiempos de las últimas corridas (informes,
+    gráficos, exportaciones) y la mediana y el percentil 95 de cada etapa,
+    para ver dónde se va el tiempo sin abrir el registro de trazas.
+    Arranca plegado y solo se actualiza mientras está abierto.
+    """
+    # Se emite desde el hilo que terminó la corrida; Qt lo entrega en el de la interfaz
+    _corrida_terminada = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.boton = QToolButton(self)
+        self.boton.setText("Rendimiento")
+        self.boton.setCheckable(True)
+        self.boton.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextBesideIcon)
+        self.boton.setArrowType(Qt.ArrowType.RightArrow)
+        self.boton.setStyleSheet("font-size: 12px; color: #333; border: none;")
+        self.boton.toggled.connect(self._plegar)
+        layout.addWidget(self.boton)
+
+        self.contenido = QWidget(self)
+        tablas = QHBoxLayout(self.contenido)
+        tablas.setContentsMargins(0, 0, 0, 0)
+        self.tabla_corridas = self._tabla(["Hora", "Corrida", "Detalle", "Total", "Filas", "Etapa más lenta"])
+        self.tabla_etapas = self._tabla(["Corrida", "Etapa", "N", "p50", "p95"])
+        for titulo, tabla in (("Últimas corridas", self.tabla_corridas), ("Por etapa", self.tabla_etapas)):
+            columna = QVBoxLayout()
+            etiqueta = QLabel(titulo)
+            etiqueta.setStyleSheet("font-size: 12px; color: #333;")
+            columna.addWidget(etiqueta)
+            columna.addWidget(tabla)
+            tablas.addLayout(columna)
+        self.contenido.hide()
+        layout.addWidget(self.contenido)
+
+        self._corrida_terminada.connect(self.actualizar)
+        trazas.al_terminar(lambda corrida: self._corrida_terminada.emit())
+
+    def _tabla(self, columnas):
+        tabla = QTableWidget(0, len(columnas), self)
+        tabla.setHorizontalHeaderLabels(columnas)
+        tabla.verticalHeader().hide()
+        tabla.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        tabla.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        tabla.horizontalHeader().setStretchLastSection(True)
+        tabla.setMaximumHeight(180)
+        return tabla
+
+    def _plegar(self, abierto):
+        self.boton.setArrowType(Qt.ArrowType.DownArrow if abierto else Qt.ArrowType.RightArrow)
+        self.contenido.setVisible(abierto)
+        if abierto:
+            self.actualizar()
+
+    def actualizar(self):
+        if not self.boton.isChecked():
+            return
+        corridas = trazas.ultimas_corridas()
+
+        self.tabla_corridas.setRowCount(0)
+        for corrida in corridas[:CORRIDAS_VISIBLES]:
+            etapas = corrida.etapas()
+            lenta = max(etapas, key=etapas.get) if etapas else None
+            fila = self.tabla_corridas.rowCount()
+            self.tabla_corridas.insertRow(fila)
+            detalle = corrida.datos.get('informe') or corrida.datos.get('archivo') or ''
+            if corrida.estado != 'ok':
+                detalle = f"{detalle} ({corrida.estado})".strip()
+            filas = corrida.datos.get('filas')
+            valores = [
+                (corrida.fecha.strftime('%H:%M:%S'), False),
+                (corrida.nombre, False),
+                (detalle, False),
+                (_ms(corrida.duracion), True),
+                ('' if filas is None else f"{filas:,}".replace(',', '.'), True),
+                (f"{lenta} ({_ms(etapas[lenta])})" if lenta else '', False),
+            ]
+            for columna, (texto, derecha) in enumerate(valores):
+                self.tabla_corridas.setItem(fila, columna, _celda(texto, derecha))
+
+        self.tabla_etapas.setRowCount(0)
+        for (nombre, etapa), (cantidad, p50, p95) in sorted(trazas.percentiles_por_etapa(corridas).items()):
+            fila = self.tabla_etapas.rowCount()
+            self.tabla_etapas.insertRow(fila)
+            valores = [(nombre, False), (etapa, False), (str(cantidad), True), (_ms(p50), True), (_ms(p95), True)]
+            for columna, (texto, derecha) in enumerate(valores):
+                self.tabla_etapas.setItem(fila, columna, _celda(texto, derecha))
@@ -0,0 +1,71 @@
+# Modules/parallel.py
+
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Modules import trazas
+from Modules.cancelacion import ConsultaCancelada, TiempoAgotado
+
+# Igual al tamaño del pool de conexiones: más hilos solo esperarían una conexión libre
+MAX_WORKERS = 4
+REINTENTOS = 2
+
+
+def con_reintentos(tarea, reintentos=REINTENTOS, espera=1.0, descripcion=""):
+    """
+    Ejecuta tarea() y, si falla, la repite hasta `reintentos` veces más
+    esperando espera, 2*espera, 4*espera... segundos entre intentos.
+    Una consulta cancelada o que agotó su tiempo límite no se repite:
+    otra vez la misma sentencia solo cargaría más al servidor.
+    """
+    for intento in range(reintentos + 1):
+        try:
+            return tarea()
+        except (ConsultaCancelada, TiempoAgotado):
+            raise
+        except Exception as e:
+            if intento == reintentos:
+                raise
+            print(f"Falló {descripcion or 'la tarea'} (intento {intento + 1}): {e}. Reintentando...")
+            time.sleep(espera * (2 ** intento))
+
+
+def ejecutar_en_paralelo(tareas, max_workers=MAX_WORKERS, reintentos=REINTENTOS, on_result=None, descripciones=None):
+    """
+    Ejecuta una lista de funciones sin argumentos en un pool acotado de hilos
+    y devuelve sus resultados en el mismo orden que las tareas.
+
+    Cada tarea se reintenta por separado. on_result(i, resultado) se llama
+    en orden (0, 1, 2...) a medida que se completa cada prefijo de la lista,
+    para poder mostrar resultados parciales sin desordenarlos.
+    Si una tarea falla después de los reintentos, se propaga su excepción.
+    Cada tarea corre con una copia del contexto de quien la envía (así los
+    tramos de trazas llegan a la corrida activa, que puede estar perfilándose).
+    """
+    descripciones = descripciones or [""] * len(tareas)
+    if max_workers <= 1 or len(tareas) <= 1:
+        resultados = []
+        for i, tarea in enumerate(tareas):
+            resultados.append(con_reintentos(tarea, reintentos, descripcion=descripciones[i]))
+            if on_result is not None:
+                on_result(i, resultados[-1])
+        return resultados
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tareas))) as executor:
+        futuros = [
+            executor.submit(contextvars.copy_context().run, trazas.ejecutar,
+                            con_reintentos, tarea, reintentos, 1.0, descripciones[i])
+            for i, tarea in enumerate(tareas)
+        ]
+        resultados = []
+        try:
+            for i, futuro in enumerate(futuros):
+                resultados.append(futuro.result())
+                if on_result is not None:
+                    on_result(i, resultados[-1])
+        except BaseException:
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+        return resultados
@@ -0,0 +1,229 @@
+# Modules/perfilado.py
+
+import contextlib
+import cProfile
+import datetime
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+from Modules import trazas
+
+# Funciones y líneas que se guardan en el resumen JSON
+FUNCIONES_EN_RESUMEN = 40
+ASIGNACIONES_EN_RESUMEN = 30
+# Cuadros de pila que guarda tracemalloc por asignación (más es más lento)
+CUADROS_TRACEMALLOC = 5
+
+# Asignaciones propias del perfilado o de la importación de módulos, que no interesan
+_FILTROS_MEMORIA = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+]
+
+# Hilo que ya está siendo perfilado (cProfile no admite dos perfiladores en un hilo)
+_local = threading.local()
+
+
+def carpeta_perfiles():
+    from Modules.result_cache import directorio_usuario
+
+    carpeta = os.path.join(directorio_usuario(), 'perfiles')
+    os.makedirs(carpeta, exist_ok=True)
+    return carpeta
+
+
+class Perfil:
+    """
+    Perfil de una corrida de trazas: cProfile en cada hilo donde corre
+    (el de la interfaz, el Worker y los hilos de las particiones) y
+    tracemalloc para la memoria. Al terminar la corrida se escriben un
+    .prof (para snakeviz o pstats) y un .json con los tiempos acumulados,
+    las líneas que más memoria asignaron y el resumen de `resumen()`.
+    """
+
+    def __init__(self, corrida, carpeta=None, resumen=None, al_guardar=None):
+        self.corrida = corrida
+        self.carpeta = carpeta or carpeta_perfiles()
+        self.resumen = resumen
+        self.al_guardar = al_guardar
+        self._perfiles = []
+        self._lock = threading.Lock()
+        self._inicio = time.perf_counter()
+        self._detener_tracemalloc = not tracemalloc.is_tracing()
+        if self._detener_tracemalloc:
+            tracemalloc.start(CUADROS_TRACEMALLOC)
+        tracemalloc.reset_peak()
+        self._foto_inicial = tracemalloc.take_snapshot()
+
+    @contextlib.contextmanager
+    def perfilar(self):
+        """
+        Perfila el bloque en el hilo actual y suma el resultado al perfil.
+        """
+        if getattr(_local, 'activo', False):
+            yield
+            return
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:
+            # Python 3.12+: cProfile usa sys.monitoring y el perfilador que
+            # ya está activo (en otro hilo) registra también este
+            yield
+            return
+        _local.activo = True
+        try:
+            yield
+        finally:
+            perfil.disable()
+            _local.activo = False
+            with self._lock:
+                self._perfiles.append(perfil)
+
+    def terminar(self):
+        """
+        Escribe los archivos y devuelve (ruta_prof, ruta_json). Se llama
+        al terminar la corrida, en su hilo.
+        """
+        duracion = time.perf_counter() - self._inicio
+        foto_final = tracemalloc.take_snapshot()
+        actual, pico = tracemalloc.get_traced_memory()
+        if self._detener_tracemalloc:
+            tracemalloc.stop()
+
+        base = os.path.join(
+            self.carpeta,
+            f"perfil_{datetime.datetime.now():%Y%m%d_%H%M%S}_{self.corrida.nombre}_{self.corrida.id}"
+        )
+        ruta_prof, ruta_json = base + '.prof', base + '.json'
+
+        with self._lock:
+            perfiles = list(self._perfiles)
+        estadisticas = None
+        if perfiles:
+            estadisticas = pstats.Stats(perfiles[0])
+            for perfil in perfiles[1:]:
+                estadisticas.add(perfil)
+            estadisticas.dump_stats(ruta_prof)
+
+        datos = {
+            'corrida': self.corrida.nombre,
+            **{clave: valor for clave, valor in self.corrida.datos.items() if clave != 'perfil'},
+            'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+            'duracion_s': round(duracion, 3),
+            'hilos_perfilados': len(perfiles),
+            'cpu': _resumen_cpu(estadisticas),
+            'memoria': _resumen_memoria(self._foto_inicial, foto_final, actual, pico),
+        }
+        if self.resumen is not None:
+            try:
+                datos['aplicacion'] = self.resumen()
+            except Exception as e:
+                datos['aplicacion'] = {'error': str(e)}
+        with open(ruta_json, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False, indent=2, default=str)
+
+        print(f"Perfil guardado en {ruta_json}")
+        rutas = (ruta_prof if perfiles else None, ruta_json)
+        if self.al_guardar is not None:
+            self.al_guardar(*rutas)
+        return rutas
+
+
+def _funcion(clave):
+    archivo, linea, nombre = clave
+    return {'funcion': nombre, 'archivo': archivo, 'linea': linea}
+
+
+def _resumen_cpu(estadisticas):
+    """
+    Funciones con más tiempo acumulado y con más tiempo propio.
+    """
+    if estadisticas is None:
+        return None
+    filas = [
+        {**_funcion(clave), 'llamadas': llamadas, 'propio_s': round(propio, 4), 'acumulado_s': round(acumulado, 4)}
+        for clave, (_, llamadas, propio, acumulado, _) in estadisticas.stats.items()
+    ]
+    return {
+        'llamadas': estadisticas.total_calls,
+        'tiempo_total_s': round(estadisticas.total_tt, 3),
+        'por_acumulado': sorted(filas, key=lambda f: f['acumulado_s'], reverse=True)[:FUNCIONES_EN_RESUMEN],
+        'por_tiempo_propio': sorted(filas, key=lambda f: f['propio_s'], reverse=True)[:FUNCIONES_EN_RESUMEN],
+    }
+
+
+def _resumen_memoria(inicial, final, actual, pico):
+    """
+    Líneas que más memoria dejaron asignada durante la corrida (lo que
+    sigue vivo al terminar), más el total actual y el pico.
+    """
+    inicial, final = inicial.filter_traces(_FILTROS_MEMORIA), final.filter_traces(_FILTROS_MEMORIA)
+    diferencias = final.compare_to(inicial, 'lineno')
+    return {
+        'actual_bytes': actual,
+        'pico_bytes': pico,
+        'por_linea': [
+            {
+                'ubicacion': f"{d.traceback[0].filename}:{d.traceback[0].lineno}",
+                'bytes': d.size,
+                'bytes_nuevos': d.size_diff,
+                'bloques_nuevos': d.count_diff,
+            }
+            for d in diferencias[:ASIGNACIONES_EN_RESUMEN]
+        ],
+    }
+
+
+def resumen_dataframe(df):
+    """
+    Filas, memoria total y por columna (contando los textos) y tipo de
+    cada columna de df.
+    """
+    if df is None:
+        return None
+    por_columna = df.memory_usage(index=False, deep=True)
+    return {
+        'filas': len(df),
+        'bytes': int(por_columna.sum()),
+        'columnas': {
+            str(columna): {'tipo': str(df[columna].dtype), 'bytes': int(por_columna[columna])}
+            for columna in df.columns
+        },
+    }
+
+
+def resumen_qt():
+    """
+    Widgets vivos de la aplicación y, por cada QTableView, las filas y
+    columnas de su modelo (las celdas no existen como objetos: el
+    DataFrameModel las arma al dibujarlas).
+    """
+    from PyQt6.QtWidgets import QApplication, QTableView
+
+    widgets = QApplication.allWidgets()
+    tablas = [
+        {'filas': w.model().rowCount(), 'columnas': w.model().columnCount()}
+        for w in widgets if isinstance(w, QTableView) and w.model() is not None
+    ]
+    return {'widgets': len(widgets), 'tablas': tablas}
+
+
+def perfilar_proxima(carpeta=None, resumen=None, al_guardar=None):
+    """
+    Perfila la próxima corrida de trazas que empiece (generar un informe,
+    dibujar un gráfico, exportar...). resumen() devuelve datos de la
+    aplicación para el JSON y al_guardar(ruta_prof, ruta_json) se llama
+    con los archivos escritos.
+    """
+    trazas.perfilar_proxima(lambda corrida: Perfil(corrida, carpeta, resumen, al_guardar))
+
+
+def cancelar():
+    trazas.perfilar_proxima(None)
@@ -0,0 +1,95 @@
+# Modules/programador.py
+
+import time
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# Segundos entre refrescos en tiempo real, y tope cuando el servidor está lento
+INTERVALO_REFRESCO = 60
+INTERVALO_MAXIMO = 15 * 60
+# Un refresco que tarda más que esto (segundos) cuenta como servidor lento
+REFRESCO_LENTO = 20
+
+
+class ProgramadorRefresco(QObject):
+    """
+    Programa los refrescos en tiempo real sin que se superpongan.
+
+    El próximo refresco se programa recién cuando termina el anterior
+    (cuando su hilo termina, aunque se haya cancelado), así nunca hay dos
+    a la vez ni se acumulan en el servidor. Si un refresco falla, agota su
+    tiempo límite o tarda más de `lento` segundos, el intervalo se duplica
+    hasta `maximo`; con cada refresco rápido vuelve a la mitad, hasta el
+    intervalo normal.
+
+    refrescar(al_terminar) arranca un refresco y devuelve su Worker, o None
+    si no arrancó ninguno (por ejemplo, porque hay un informe generándose).
+    Tiene que conectar al_terminar a la señal ended del Worker antes de
+    arrancarlo: conectarla después perdería el aviso de un refresco que
+    termina enseguida, y no se programaría ninguno más.
+    """
+    # Nuevo intervalo (segundos) cuando cambia por la espera del servidor
+    intervalo_cambiado = pyqtSignal(int)
+
+    def __init__(self, refrescar, intervalo=INTERVALO_REFRESCO, maximo=INTERVALO_MAXIMO,
+                 lento=REFRESCO_LENTO, parent=None):
+        super().__init__(parent)
+        self.refrescar = refrescar
+        self.intervalo = intervalo
+        self.maximo = maximo
+        self.lento = lento
+        self.intervalo_actual = intervalo
+        self.activo = False
+        self._refresco = None
+        self._inicio = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._refrescar)
+
+    @property
+    def en_curso(self):
+        return self._refresco is not None
+
+    def iniciar(self):
+        self.activo = True
+        if self._refresco is None:
+            self._programar()
+
+    def detener(self):
+        """
+        No programa más refrescos; el que esté en curso termina igual.
+        """
+        self.activo = False
+        self._timer.stop()
+
+    def _programar(self):
+        self._timer.start(self.intervalo_actual * 1000)
+
+    def _refrescar(self):
+        if not self.activo:
+            return
+        # Identifica este refresco: un aviso de otro anterior no cuenta
+        refresco = object()
+        self._refresco = refresco
+        self._inicio = time.monotonic()
+        if self.refrescar(lambda estado: self._terminado(refresco, estado)) is None:
+            # No hubo refresco (el informe está ocupado): se prueba en el próximo intervalo
+            self._refresco = None
+            self._programar()
+
+    def _terminado(self, refresco, estado):
+        if refresco is not self._refresco:
+            return
+        self._refresco = None
+        duracion = time.monotonic() - self._inicio
+        anterior = self.intervalo_actual
+        if estado in ('error', 'tiempo_agotado') or duracion > self.lento:
+            self.intervalo_actual = min(self.intervalo_actual * 2, self.maximo)
+        elif estado == 'ok':
+            self.intervalo_actual = max(self.intervalo_actual // 2, self.intervalo)
+        if self.intervalo_actual != anterior:
+            print(f"Refresco en tiempo real ({estado}, {duracion:.1f} s): "
+                  f"próximo en {self.intervalo_actual} s")
+            self.intervalo_cambiado.emit(self.intervalo_actual)
+        if self.activo:
+            self._programar()
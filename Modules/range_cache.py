@@ -0,0 +1,253 @@
+# Modules/range_cache.py
+
+import datetime
+
+import pandas as pd
+
+from Modules.parallel import REINTENTOS, ejecutar_en_paralelo
+from Modules.result_cache import get_cache
+
+# Procedimientos que se consultan por partes (ver particionar_tramo) y se
+# guardan en la caché local por partes.
+#   fecha: (columna, formato) si cada fila trae su fecha: el resultado se
+#          reparte por día y cada día se guarda aparte, así un rango nuevo
+#          solo consulta los días que faltan.
+#          None si las filas no traen fecha: cada parte se guarda con su
+#          rango y se reutiliza cuando otro pedido incluye esa misma parte
+#          (con particion='month', los meses completos).
+# Will_ObtenerDatosParaInforme2024V4 no está: devuelve totales por categoría,
+# que no se pueden juntar entre partes sin sumarlos, así que se consulta y se
+# guarda siempre por el rango entero.
+PROCEDIMIENTOS_PARTICIONADOS = {
+    'Will_ObtenerDatosParaInforme2024V3': {'fecha': ('fech_alta', '%d-%m-%Y %H:%M')},
+    'Will_novedades_altasv1': {'fecha': None},
+}
+
+
+def dias_del_rango(fecha_inicio, fecha_fin):
+    """
+    Lista de fechas (datetime.date) entre fecha_inicio y fecha_fin, ambas incluidas.
+    """
+    inicio = datetime.date.fromisoformat(str(fecha_inicio)[:10])
+    fin = datetime.date.fromisoformat(str(fecha_fin)[:10])
+    return [inicio + datetime.timedelta(days=i) for i in range((fin - inicio).days + 1)]
+
+
+def tramos_contiguos(dias):
+    """
+    Agrupa una lista ordenada de días en tramos consecutivos [(inicio, fin), ...].
+    """
+    tramos = []
+    for dia in dias:
+        if tramos and (dia - tramos[-1][1]).days == 1:
+            tramos[-1][1] = dia
+        else:
+            tramos.append([dia, dia])
+    return [(inicio, fin) for inicio, fin in tramos]
+
+
+def particionar_tramo(inicio, fin, particion='month'):
+    """
+    Divide el tramo [inicio, fin] (datetime.date) en partes consecutivas:
+    'month' corta en cada cambio de mes, 'week' cada 7 días y un entero
+    cada esa cantidad de días. None devuelve el tramo entero.
+    """
+    if particion is None:
+        return [(inicio, fin)]
+    partes = []
+    actual = inicio
+    while actual <= fin:
+        if particion == 'month':
+            siguiente_mes = (actual.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+            corte = siguiente_mes - datetime.timedelta(days=1)
+        else:
+            dias = 7 if particion == 'week' else int(particion)
+            corte = actual + datetime.timedelta(days=dias - 1)
+        corte = min(corte, fin)
+        partes.append((actual, corte))
+        actual = corte + datetime.timedelta(days=1)
+    return partes
+
+
+def _clave_dia(dia):
+    iso = dia.isoformat()
+    return (iso, iso)
+
+
+def _repartir_por_dia(df, columna, formato, dias):
+    """
+    Reparte las filas de un rango en {día: DataFrame}. Devuelve None si
+    alguna fila no tiene una fecha válida dentro del rango, porque en ese
+    caso no se puede guardar por día sin perderla.
+    """
+    if columna not in df.columns:
+        return None
+    fechas = pd.to_datetime(df[columna], format=formato, errors='coerce').dt.date
+    if fechas.isna().any() or not fechas.isin(dias).all():
+        return None
+    grupos = {dia: idx for dia, idx in df.groupby(fechas.to_numpy(), sort=False).indices.items()}
+    vacio = df.iloc[0:0]
+    return {dia: df.iloc[grupos[dia]] if dia in grupos else vacio for dia in dias}
+
+
+def fetch_por_dias(procedure_name, fecha_inicio, fecha_fin, consultar, on_batch=None, force_refresh=False,
+                   particion='month', max_workers=1, reintentos=REINTENTOS):
+    """
+    Devuelve el resultado de procedure_name para el rango pedido, consultando
+    al servidor solo lo que no está en la caché local.
+
+    consultar(inicio, fin, on_batch) ejecuta el procedimiento para un tramo
+    ('yyyy-mm-dd') y devuelve un DataFrame. Lo que viene de la caché y lo
+    consultado se entrega a on_batch en orden cronológico.
+
+    Con columna de fecha la caché es por día y cada tramo de días faltantes
+    se divide según `particion`; sin columna de fecha el rango entero se
+    divide según `particion` y cada parte se guarda con su rango. Con
+    max_workers > 1 las partes se consultan en paralelo con reintentos por
+    parte. Una única consulta secuencial se transmite lote a lote.
+    """
+    spec = PROCEDIMIENTOS_PARTICIONADOS[procedure_name]
+    cache = get_cache()
+    if spec['fecha'] is None:
+        partes = _partes_por_rango(procedure_name, fecha_inicio, fecha_fin, consultar, cache,
+                                   force_refresh, particion)
+    else:
+        partes = _partes_por_dia(procedure_name, spec, fecha_inicio, fecha_fin, consultar, cache,
+                                 force_refresh, particion)
+    return _ejecutar_partes(procedure_name, partes, on_batch, max_workers, reintentos)
+
+
+def _leer_cache(cache, procedure_name, claves, force_refresh):
+    if cache is None or force_refresh:
+        return {}
+    try:
+        return cache.get_many(procedure_name, claves)
+    except Exception as e:
+        print(f"Error al leer la caché local: {e}")
+        return {}
+
+
+def _partes_por_rango(procedure_name, fecha_inicio, fecha_fin, consultar, cache, force_refresh, particion):
+    """
+    Partes del rango según `particion`, cada una guardada en la caché con
+    su rango (inicio, fin): [(desde_servidor, obtener(on_batch))].
+    """
+    dias = dias_del_rango(fecha_inicio, fecha_fin)
+    rangos = particionar_tramo(dias[0], dias[-1], particion)
+    claves = [(inicio.isoformat(), fin.isoformat()) for inicio, fin in rangos]
+    guardados = _leer_cache(cache, procedure_name, claves, force_refresh)
+    print(f"{procedure_name}: {len(guardados)} partes en caché, {len(claves) - len(guardados)} a consultar.")
+
+    partes = []
+    for clave in claves:
+        if clave in guardados:
+            partes.append((False, lambda lotes, df=guardados[clave]: df))
+        else:
+            partes.append((True, lambda lotes, clave=clave: _consultar_rango(
+                procedure_name, clave, consultar, lotes, cache)))
+    return partes
+
+
+def _consultar_rango(procedure_name, clave, consultar, on_batch, cache):
+    """
+    Consulta una parte y la guarda en la caché con su rango.
+    """
+    df = consultar(clave[0], clave[1], on_batch)
+    if cache is not None:
+        try:
+            cache.put(procedure_name, clave, df, clave[1])
+        except Exception as e:
+            print(f"Error al guardar en la caché local: {e}")
+    return df
+
+
+def _partes_por_dia(procedure_name, spec, fecha_inicio, fecha_fin, consultar, cache, force_refresh, particion):
+    """
+    Días guardados en la caché y tramos de días faltantes (divididos según
+    `particion`), en orden cronológico: [(desde_servidor, obtener(on_batch))].
+    """
+    dias = dias_del_rango(fecha_inicio, fecha_fin)
+    por_clave = _leer_cache(cache, procedure_name, [_clave_dia(d) for d in dias], force_refresh)
+    guardados = {datetime.date.fromisoformat(k[0]): v for k, v in por_clave.items()}
+
+    faltantes = [d for d in dias if d not in guardados]
+    print(f"{procedure_name}: {len(dias) - len(faltantes)} días en caché, {len(faltantes)} a consultar.")
+
+    # Segmentos en orden cronológico: ('cache', [días]) o ('servidor', inicio, fin)
+    segmentos = []
+    pendientes = iter(tramos_contiguos(faltantes))
+    proximo = next(pendientes, None)
+    dia_idx = 0
+    while dia_idx < len(dias):
+        dia = dias[dia_idx]
+        if proximo is not None and dia == proximo[0]:
+            segmentos.append(('servidor',) + proximo)
+            dia_idx += (proximo[1] - proximo[0]).days + 1
+            proximo = next(pendientes, None)
+        else:
+            if segmentos and segmentos[-1][0] == 'cache':
+                segmentos[-1][1].append(dia)
+            else:
+                segmentos.append(('cache', [dia]))
+            dia_idx += 1
+
+    partes = []
+    for segmento in segmentos:
+        if segmento[0] == 'cache':
+            pieza = pd.concat([guardados[d] for d in segmento[1]], ignore_index=True)
+            partes.append((False, lambda lotes, pieza=pieza: pieza))
+        else:
+            for inicio, fin in particionar_tramo(segmento[1], segmento[2], particion):
+                partes.append((True, lambda lotes, inicio=inicio, fin=fin: _consultar_tramo(
+                    procedure_name, spec, inicio, fin, consultar, lotes, cache)))
+    return partes
+
+
+def _ejecutar_partes(procedure_name, partes, on_batch, max_workers, reintentos):
+    """
+    Obtiene las partes (en paralelo si hay más de una para consultar) y
+    las junta en orden.
+    """
+    desde_servidor = [servidor for servidor, _ in partes]
+    paralelo = max_workers > 1 and sum(desde_servidor) > 1
+    # En modo secuencial las consultas transmiten sus lotes directamente
+    # (sin reintentos, para no repetir lotes ya mostrados)
+    lotes_internos = None if paralelo else on_batch
+    tareas = [lambda obtener=obtener: obtener(lotes_internos) for _, obtener in partes]
+
+    def entregar_en_orden(i, pieza):
+        if on_batch is not None and len(pieza) and (paralelo or not desde_servidor[i]):
+            on_batch(pieza)
+
+    descripciones = [f"{procedure_name} parte {i + 1}/{len(tareas)}" for i in range(len(tareas))]
+    piezas = ejecutar_en_paralelo(
+        tareas,
+        max_workers=max_workers if paralelo else 1,
+        reintentos=reintentos if paralelo else 0,
+        on_result=entregar_en_orden,
+        descripciones=descripciones
+    )
+
+    piezas = [p for p in piezas if p.shape[1]]
+    if not piezas:
+        return pd.DataFrame()
+    return pd.concat(piezas, ignore_index=True)
+
+
+def _consultar_tramo(procedure_name, spec, inicio, fin, consultar, on_batch, cache):
+    """
+    Consulta un tramo de días faltantes con una sola llamada, lo reparte
+    por la columna de fecha y guarda en la caché cada día por separado.
+    """
+    dias = [inicio + datetime.timedelta(days=i) for i in range((fin - inicio).days + 1)]
+    df = consultar(inicio.isoformat(), fin.isoformat(), on_batch)
+    columna, formato = spec['fecha']
+    por_dia = _repartir_por_dia(df, columna, formato, dias)
+    if por_dia is None:
+        print(f"{procedure_name}: no se pudo repartir el tramo por día; no se guarda en caché.")
+    elif cache is not None:
+        try:
+            cache.put_many(procedure_name, [(_clave_dia(d), por_dia[d], d.isoformat()) for d in dias])
+        except Exception as e:
+            print(f"Error al guardar en la caché local: {e}")
+    return df
@@ -0,0 +1,68 @@
+# Modules/render_cache.py
+
+from collections import OrderedDict
+
+# Memoria máxima para gráficos ya dibujados antes de descartar los menos usados
+MAX_BYTES = 200 * 1024 * 1024
+
+
+class RenderCache:
+    """
+    Caché en memoria de gráficos ya dibujados.
+
+    Cada entrada guarda el gráfico (GraficoVivo) y su imagen RGBA ya
+    dibujada, con la clave (versión del dataset, informe, tipo de gráfico,
+    tamaño en píxeles). Volver a un gráfico ya visto solo muestra la imagen;
+    el gráfico se conserva para exportarlo en otro formato o resolución.
+    Se descarta por LRU al superar max_bytes, contando la imagen y lo que
+    ocupa la figura (GraficoVivo.bytes_estimados).
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __contains__(self, clave):
+        return clave in self._entradas
+
+    @property
+    def bytes(self):
+        return self._bytes
+
+    @staticmethod
+    def _tamanio(grafico, imagen):
+        return memoryview(imagen).nbytes + grafico.bytes_estimados()
+
+    def get(self, clave):
+        """
+        Devuelve (grafico, imagen) o None, y la marca como la más reciente.
+        """
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            return None
+        self._entradas.move_to_end(clave)
+        return entrada[0], entrada[1]
+
+    def put(self, clave, grafico, imagen):
+        tamanio = self._tamanio(grafico, imagen)
+        if tamanio > self.max_bytes:
+            return
+        self.descartar(clave)
+        self._entradas[clave] = (grafico, imagen, tamanio)
+        self._bytes += tamanio
+        while self._bytes > self.max_bytes and len(self._entradas) > 1:
+            _, (_, _, liberado) = self._entradas.popitem(last=False)
+            self._bytes -= liberado
+
+    def descartar(self, clave):
+        entrada = self._entradas.pop(clave, None)
+        if entrada is not None:
+            self._bytes -= entrada[2]
+
+    def clear(self):
+        self._entradas.clear()
+        self._bytes = 0
@@ -0,0 +1,210 @@
+# Modules/result_cache.py
+
+import datetime
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+# Tamaño máximo del archivo de caché antes de descartar lo menos usado
+MAX_BYTES = 500 * 1024 * 1024
+# Segundos que vive un resultado cuyo rango incluye el día de hoy
+TTL_RANGO_ACTUAL = 30
+
+
+def directorio_usuario():
+    """
+    Carpeta local de la aplicación dentro del perfil del usuario.
+    """
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    carpeta = os.path.join(base, 'informes_jub')
+    os.makedirs(carpeta, exist_ok=True)
+    return carpeta
+
+
+def ttl_para(fecha_fin, ttl_actual=TTL_RANGO_ACTUAL):
+    """
+    Política de vencimiento: un rango que terminó antes de hoy ya no cambia
+    (None = no vence); uno que llega a hoy vive solo ttl_actual segundos.
+    """
+    try:
+        fin = datetime.date.fromisoformat(str(fecha_fin)[:10])
+    except ValueError:
+        return ttl_actual
+    if fin < datetime.date.today():
+        return None
+    return ttl_actual
+
+
+class ResultCache:
+    """
+    Caché en disco (SQLite) de los resultados de los procedimientos.
+
+    La clave es el nombre del procedimiento más sus parámetros. Cada entrada
+    guarda el DataFrame serializado, su vencimiento y el último acceso, que
+    se usa para descartar por LRU cuando el archivo supera max_bytes.
+    """
+
+    def __init__(self, path=None, max_bytes=MAX_BYTES, ttl_actual=TTL_RANGO_ACTUAL):
+        self.path = path or os.path.join(directorio_usuario(), 'cache.sqlite3')
+        self.max_bytes = max_bytes
+        self.ttl_actual = ttl_actual
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS resultados (
+                    clave TEXT PRIMARY KEY,
+                    procedimiento TEXT NOT NULL,
+                    creado REAL NOT NULL,
+                    vence REAL,
+                    ultimo_acceso REAL NOT NULL,
+                    tamanio INTEGER NOT NULL,
+                    datos BLOB NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        # Una conexión por operación: sqlite3 no comparte conexiones entre hilos
+        return sqlite3.connect(self.path, timeout=10)
+
+    @staticmethod
+    def make_key(procedure_name, params):
+        return json.dumps([procedure_name, [str(p) for p in params]])
+
+    def get(self, procedure_name, params):
+        """
+        Devuelve el DataFrame guardado, o None si no existe o ya venció.
+        """
+        clave = self.make_key(procedure_name, params)
+        ahora = time.time()
+        with self._lock, self._connect() as db:
+            fila = db.execute(
+                "SELECT vence, datos FROM resultados WHERE clave = ?", (clave,)
+            ).fetchone()
+            if fila is None:
+                return None
+            vence, datos = fila
+            if vence is not None and vence < ahora:
+                db.execute("DELETE FROM resultados WHERE clave = ?", (clave,))
+                return None
+            db.execute("UPDATE resultados SET ultimo_acceso = ? WHERE clave = ?", (ahora, clave))
+        return pickle.loads(datos)
+
+    def get_many(self, procedure_name, params_list):
+        """
+        Versión en bloque de get(): devuelve {params: DataFrame} solo con
+        las entradas vigentes, en una única consulta a la base local.
+        """
+        claves = {self.make_key(procedure_name, params): params for params in params_list}
+        if not claves:
+            return {}
+        ahora = time.time()
+        encontrados = {}
+        with self._lock, self._connect() as db:
+            lista = list(claves)
+            # SQLite limita la cantidad de parámetros por sentencia
+            for i in range(0, len(lista), 500):
+                tramo = lista[i:i + 500]
+                marcas = ','.join('?' * len(tramo))
+                for clave, vence, datos in db.execute(
+                    f"SELECT clave, vence, datos FROM resultados WHERE clave IN ({marcas})", tramo
+                ):
+                    if vence is None or vence >= ahora:
+                        encontrados[claves[clave]] = datos
+            if encontrados:
+                vigentes = [self.make_key(procedure_name, params) for params in encontrados]
+                db.executemany(
+                    "UPDATE resultados SET ultimo_acceso = ? WHERE clave = ?",
+                    [(ahora, clave) for clave in vigentes]
+                )
+        return {params: pickle.loads(datos) for params, datos in encontrados.items()}
+
+    def put(self, procedure_name, params, df, fecha_fin):
+        """
+        Guarda un resultado con el vencimiento que corresponde a su rango.
+        """
+        self.put_many(procedure_name, [(params, df, fecha_fin)])
+
+    def put_many(self, procedure_name, items):
+        """
+        Guarda varios resultados (params, df, fecha_fin) en una sola transacción.
+        """
+        ahora = time.time()
+        filas = []
+        for params, df, fecha_fin in items:
+            datos = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+            ttl = ttl_para(fecha_fin, self.ttl_actual)
+            vence = None if ttl is None else ahora + ttl
+            filas.append((self.make_key(procedure_name, params), procedure_name, ahora, vence, ahora, len(datos), datos))
+        if not filas:
+            return
+        with self._lock, self._connect() as db:
+            db.executemany("INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?, ?, ?, ?)", filas)
+            self._evict(db)
+
+    def _evict(self, db):
+        """
+        Descarta entradas vencidas y, si todavía se supera max_bytes,
+        las menos usadas recientemente.
+        """
+        db.execute("DELETE FROM resultados WHERE vence IS NOT NULL AND vence < ?", (time.time(),))
+        total = db.execute("SELECT COALESCE(SUM(tamanio), 0) FROM resultados").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for clave, tamanio in db.execute(
+            "SELECT clave, tamanio FROM resultados ORDER BY ultimo_acceso"
+        ).fetchall():
+            db.execute("DELETE FROM resultados WHERE clave = ?", (clave,))
+            total -= tamanio
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM resultados")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Devuelve la caché compartida, o None si no se pudo abrir el archivo.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = ResultCache()
+            except Exception as e:
+                print(f"No se pudo abrir la caché local de resultados: {e}")
+                return None
+        return _cache
+
+
+def cached_call(procedure_name, params, fecha_fin, fetcher, force_refresh=False):
+    """
+    Devuelve (df, desde_cache). Busca primero en la caché local y, si no
+    hay un resultado vigente (o force_refresh es True), llama a fetcher()
+    y guarda lo obtenido. Un fallo de la caché nunca impide la consulta.
+    """
+    cache = get_cache()
+    if cache is not None and not force_refresh:
+        try:
+            df = cache.get(procedure_name, params)
+            if df is not None:
+                return df, True
+        except Exception as e:
+            print(f"Error al leer la caché local: {e}")
+
+    df = fetcher()
+
+    if cache is not None:
+        try:
+            cache.put(procedure_name, params, df, fecha_fin)
+        except Exception as e:
+            print(f"Error al guardar en la caché local: {e}")
+    return df, False
@@ -0,0 +1,176 @@
+# Modules/table_model.py
+
+import bisect
+import math
+
+import numpy as np
+import pandas as pd
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+
+def formatear_celda(valor):
+    """
+    Convierte un valor de la tabla en el texto que se muestra.
+    """
+    if valor is None or valor is pd.NaT:
+        return ""
+    if isinstance(valor, float) and math.isnan(valor):
+        return ""
+    if isinstance(valor, np.datetime64):
+        # Las columnas de fecha tipadas llegan como datetime64 de numpy (ver _column_arrays)
+        if np.isnat(valor):
+            return ""
+        valor = pd.Timestamp(valor)
+    if isinstance(valor, pd.Timestamp):
+        return valor.strftime('%d-%m-%Y %H:%M')
+    return str(valor)
+
+
+class DataFrameModel(QAbstractTableModel):
+    """
+    Modelo de tabla que lee directamente de las columnas de un DataFrame.
+
+    No crea un ítem por celda: la vista pide solo las celdas visibles y el
+    texto se arma en ese momento. El ordenamiento se hace sobre los valores
+    tipados de la columna y se guarda como una permutación de filas, sin
+    copiar ni reordenar el DataFrame.
+
+    Mientras un informe se está leyendo por lotes, los datos se guardan como
+    una lista de tramos (uno por lote) que se agregan al final de la tabla.
+    """
+
+    def __init__(self, df=None, parent=None):
+        super().__init__(parent)
+        self._df = pd.DataFrame()
+        self._chunks = []    # por tramo, lista de arreglos por columna
+        self._offsets = []   # primera fila de cada tramo
+        self._rows = 0
+        self._headers = []
+        self._order = None   # permutación de filas cuando la tabla está ordenada
+        self._sort = None    # (columna, orden) del último ordenamiento
+        if df is not None:
+            self.set_dataframe(df)
+
+    def dataframe(self):
+        return self._df
+
+    @staticmethod
+    def _column_arrays(df):
+        return [df.iloc[:, j].to_numpy() for j in range(df.shape[1])]
+
+    def set_dataframe(self, df):
+        """
+        Reemplaza los datos mostrados. Es O(columnas): solo se toman
+        referencias a los arreglos de cada columna.
+        """
+        self.beginResetModel()
+        self._df = df if df is not None else pd.DataFrame()
+        self._chunks = [self._column_arrays(self._df)]
+        self._offsets = [0]
+        self._rows = len(self._df)
+        self._headers = [str(c) for c in self._df.columns]
+        self._order = None
+        self._sort = None
+        self.endResetModel()
+
+    def append_dataframe(self, lote):
+        """
+        Agrega un lote de filas al final de la tabla (lectura progresiva).
+        Si la tabla está ordenada, las filas nuevas quedan al final.
+        """
+        if len(lote) == 0:
+            return
+        if self._rows == 0 or [str(c) for c in lote.columns] != self._headers:
+            # Tabla vacía o con otras columnas: el lote pasa a ser todo el contenido
+            self.set_dataframe(lote)
+            return
+        inicio = self._rows
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(lote) - 1)
+        self._chunks.append(self._column_arrays(lote))
+        self._offsets.append(inicio)
+        self._rows += len(lote)
+        if self._order is not None:
+            self._order = np.concatenate([self._order, np.arange(inicio, self._rows, dtype=np.int64)])
+        self.endInsertRows()
+
+    def consolidate(self, df):
+        """
+        Reemplaza los tramos acumulados por el DataFrame completo, sin
+        reiniciar la vista (se conserva el scroll y el orden elegido).
+        Si el DataFrame no coincide con lo que se mostró, se recarga todo.
+        """
+        if len(df) != self._rows or [str(c) for c in df.columns] != self._headers:
+            self.set_dataframe(df)
+            return
+        self._df = df
+        self._chunks = [self._column_arrays(df)]
+        self._offsets = [0]
+        if self._sort is not None:
+            # Los valores ya tipados pueden ordenarse distinto que el texto crudo
+            self.sort(*self._sort)
+        elif self._rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(self._rows - 1, len(self._headers) - 1))
+
+    # ------------------------------------------------------------------
+    # Interfaz de QAbstractTableModel
+    # ------------------------------------------------------------------
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._headers)
+
+    def _value(self, row, column):
+        if self._order is not None:
+            row = int(self._order[row])
+        if len(self._chunks) == 1:
+            return self._chunks[0][column][row]
+        tramo = bisect.bisect_right(self._offsets, row) - 1
+        return self._chunks[tramo][column][row - self._offsets[tramo]]
+
+    def _column(self, column):
+        if len(self._chunks) == 1:
+            return self._chunks[0][column]
+        return np.concatenate([tramo[column] for tramo in self._chunks])
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return formatear_celda(self._value(index.row(), index.column()))
+        if role == Qt.ItemDataRole.UserRole:
+            # Valor original, sin formatear
+            return self._value(index.row(), index.column())
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self._headers[section] if section < len(self._headers) else None
+        return str(section + 1)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """
+        Ordena por los valores tipados de la columna (números como números,
+        fechas como fechas). Una columna negativa vuelve al orden original.
+        """
+        self.layoutAboutToBeChanged.emit()
+        if column < 0 or column >= len(self._headers):
+            self._order = None
+            self._sort = None
+        else:
+            self._sort = (column, order)
+            serie = pd.Series(self._column(column))
+            ascendente = order == Qt.SortOrder.AscendingOrder
+            try:
+                ordenada = serie.sort_values(ascending=ascendente, kind='mergesort', na_position='last')
+            except TypeError:
+                # Columna con tipos mezclados: se ordena por el texto
+                ordenada = serie.astype(str).sort_values(ascending=ascendente, kind='mergesort')
+            self._order = np.asarray(ordenada.index, dtype=np.int64)
+        self.layoutChanged.emit()
@@ -0,0 +1,291 @@
+# Modules/trazas.py
+
+import collections
+import contextlib
+import contextvars
+import datetime
+import itertools
+import json
+import logging
+import logging.handlers
+import math
+import os
+import threading
+import time
+
+# Registro de corridas: un JSON por línea, rotando al llegar a MAX_BYTES_LOG
+ARCHIVO_TRAZAS = 'trazas.log'
+MAX_BYTES_LOG = 5 * 1024 * 1024
+ARCHIVOS_LOG = 3
+# Corridas que se guardan en memoria para el panel de rendimiento
+CORRIDAS_EN_MEMORIA = 50
+
+# Corrida a la que se agregan los tramos medidos en este contexto. Worker y
+# ejecutar_en_paralelo copian el contexto, así los tramos de otros hilos
+# llegan a la corrida que los originó.
+_corrida_actual = contextvars.ContextVar('corrida_actual', default=None)
+
+_ids = itertools.count(1)
+_lock = threading.Lock()
+_historial = collections.deque(maxlen=CORRIDAS_EN_MEMORIA)
+_oyentes = []
+_logger = None
+# Fábrica del perfil para la próxima corrida (ver Modules/perfilado.py)
+_perfilar_proxima = None
+
+
+class Tramo:
+    """
+    Una etapa medida: nombre, inicio y duración (segundos, perf_counter),
+    hilo y datos como filas o bytes.
+    """
+
+    def __init__(self, etapa, **datos):
+        self.etapa = etapa
+        self.datos = datos
+        self.hilo = threading.current_thread().name
+        self.inicio = time.perf_counter()
+        self.duracion = None
+
+    def anotar(self, **datos):
+        self.datos.update(datos)
+
+
+class Corrida:
+    """
+    Una operación completa (generar un informe, dibujar un gráfico,
+    exportar) con los tramos medidos mientras estuvo activa, en cualquier
+    hilo. Al terminar se escribe en el registro y pasa al historial.
+    """
+
+    def __init__(self, nombre, **datos):
+        self.id = next(_ids)
+        self.nombre = nombre
+        self.datos = datos
+        self.fecha = datetime.datetime.now()
+        self.inicio = time.perf_counter()
+        self.duracion = None
+        self.estado = None
+        self.tramos = []
+        self._lock = threading.Lock()
+        global _perfilar_proxima
+        with _lock:
+            fabrica, _perfilar_proxima = _perfilar_proxima, None
+        self.perfil = fabrica(self) if fabrica is not None else None
+
+    @contextlib.contextmanager
+    def activa(self):
+        """
+        Los tramos medidos dentro del bloque (y en los Worker creados dentro
+        de él) se agregan a esta corrida.
+        """
+        token = _corrida_actual.set(self)
+        try:
+            if self.perfil is not None:
+                with self.perfil.perfilar():
+                    yield self
+            else:
+                yield self
+        finally:
+            _corrida_actual.reset(token)
+
+    def agregar(self, tramo):
+        with self._lock:
+            if self.duracion is None:
+                self.tramos.append(tramo)
+
+    def anotar(self, **datos):
+        self.datos.update(datos)
+
+    def terminar(self, estado='ok', **datos):
+        """
+        Cierra la corrida, la escribe en el registro y avisa a los oyentes.
+        Solo tiene efecto la primera vez.
+        """
+        with self._lock:
+            if self.duracion is not None:
+                return
+            self.duracion = time.perf_counter() - self.inicio
+            self.estado = estado
+            self.datos.update(datos)
+        if self.perfil is not None:
+            try:
+                self.datos['perfil'] = self.perfil.terminar()[1]
+            except Exception as e:
+                print(f"No se pudo guardar el perfil de la corrida {self.nombre}: {e}")
+        _registrar(self)
+
+    def etapas(self):
+        """
+        {etapa: segundos} sumando los tramos de igual nombre (los tramos
+        en paralelo se suman, así que pueden superar la duración total).
+        """
+        totales = {}
+        with self._lock:
+            for tramo in self.tramos:
+                totales[tramo.etapa] = totales.get(tramo.etapa, 0.0) + tramo.duracion
+        return totales
+
+    def como_dict(self):
+        with self._lock:
+            tramos = [
+                {'etapa': t.etapa, 'desde_ms': round((t.inicio - self.inicio) * 1000, 1),
+                 'duracion_ms': round(t.duracion * 1000, 1), 'hilo': t.hilo, **t.datos}
+                for t in self.tramos
+            ]
+        return {
+            'id': self.id,
+            'corrida': self.nombre,
+            'fecha': self.fecha.isoformat(timespec='milliseconds'),
+            'duracion_ms': round((self.duracion or 0.0) * 1000, 1),
+            'estado': self.estado,
+            **self.datos,
+            'tramos': tramos,
+        }
+
+
+def corrida_actual():
+    return _corrida_actual.get()
+
+
+def ejecutar(fn, *args, **kwargs):
+    """
+    Llama a fn en el hilo actual; si la corrida actual se está perfilando,
+    también se perfila este hilo. Worker y ejecutar_en_paralelo corren sus
+    tareas con esta función.
+    """
+    corrida = _corrida_actual.get()
+    if corrida is None or corrida.perfil is None:
+        return fn(*args, **kwargs)
+    with corrida.perfil.perfilar():
+        return fn(*args, **kwargs)
+
+
+def perfilar_proxima(fabrica):
+    """
+    La próxima Corrida que se cree tendrá como perfil fabrica(corrida)
+    (None cancela un pedido anterior).
+    """
+    global _perfilar_proxima
+    with _lock:
+        _perfilar_proxima = fabrica
+
+
+@contextlib.contextmanager
+def tramo(etapa, **datos):
+    """
+    Mide el bloque como una etapa de la corrida actual. Devuelve el Tramo
+    para anotarle datos (t.anotar(filas=...)). Fuera de una corrida no
+    se registra nada.
+    """
+    t = Tramo(etapa, **datos)
+    try:
+        yield t
+    except BaseException as e:
+        t.anotar(error=type(e).__name__)
+        raise
+    finally:
+        t.duracion = time.perf_counter() - t.inicio
+        corrida = _corrida_actual.get()
+        if corrida is not None:
+            corrida.agregar(t)
+
+
+def medir_dataframe(t, df):
+    """
+    Anota en el tramo las filas y la memoria de df (ver memoria_dataframe).
+    """
+    if df is not None:
+        t.anotar(filas=len(df), bytes=memoria_dataframe(df))
+
+
+def memoria_dataframe(df):
+    """
+    Bytes aproximados de df: columnas numéricas, de fecha y categorías
+    exactas; para columnas de objetos solo cuenta los punteros (contar
+    cada texto costaría tanto como leerlo).
+    """
+    try:
+        return int(df.memory_usage(index=False, deep=False).sum())
+    except Exception:
+        return None
+
+
+def _log():
+    global _logger
+    if _logger is None:
+        logger = logging.getLogger('informes.trazas')
+        logger.setLevel(logging.INFO)
+        # El registro es solo de este archivo, no de la consola
+        logger.propagate = False
+        try:
+            from Modules.result_cache import directorio_usuario
+            handler = logging.handlers.RotatingFileHandler(
+                os.path.join(directorio_usuario(), ARCHIVO_TRAZAS),
+                maxBytes=MAX_BYTES_LOG, backupCount=ARCHIVOS_LOG, encoding='utf-8', delay=True
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+        except Exception as e:
+            print(f"No se pudo abrir el registro de trazas: {e}")
+            logger.addHandler(logging.NullHandler())
+        _logger = logger
+    return _logger
+
+
+def _registrar(corrida):
+    try:
+        with _lock:
+            _historial.append(corrida)
+            oyentes = list(_oyentes)
+            _log().info(json.dumps(corrida.como_dict(), ensure_ascii=False, default=str))
+    except Exception as e:
+        print(f"No se pudo registrar la corrida {corrida.nombre}: {e}")
+        return
+    for oyente in oyentes:
+        try:
+            oyente(corrida)
+        except Exception as e:
+            print(f"Error al avisar el fin de la corrida {corrida.nombre}: {e}")
+
+
+def al_terminar(oyente):
+    """
+    Registra oyente(corrida), que se llama (en el hilo que la terminó)
+    cada vez que termina una corrida.
+    """
+    with _lock:
+        _oyentes.append(oyente)
+
+
+def ultimas_corridas(cantidad=CORRIDAS_EN_MEMORIA):
+    """
+    Las últimas corridas terminadas, de la más reciente a la más antigua.
+    """
+    with _lock:
+        return list(reversed(_historial))[:cantidad]
+
+
+def _percentil(valores, p):
+    # Percentil por rango más cercano, sin numpy
+    ordenados = sorted(valores)
+    indice = min(len(ordenados), max(1, math.ceil(p / 100 * len(ordenados)))) - 1
+    return ordenados[indice]
+
+
+def percentiles_por_etapa(corridas=None):
+    """
+    {(corrida, etapa): (cantidad, p50, p95)} en segundos, sobre las
+    corridas del historial (o las dadas). La etapa 'total' es la duración
+    de cada corrida.
+    """
+    corridas = ultimas_corridas() if corridas is None else corridas
+    valores = {}
+    for corrida in corridas:
+        valores.setdefault((corrida.nombre, 'total'), []).append(corrida.duracion)
+        for etapa, segundos in corrida.etapas().items():
+            valores.setdefault((corrida.nombre, etapa), []).append(segundos)
+    return {
+        clave: (len(lista), _percentil(lista, 50), _percentil(lista, 95))
+        for clave, lista in valores.items()
+    }
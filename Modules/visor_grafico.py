@@ -0,0 +1,75 @@
+# Modules/visor_grafico.py
+
+from PyQt6.QtCore import QSize, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QImage, QPainter
+from PyQt6.QtWidgets import QSizePolicy, QWidget
+
+# Milisegundos sin cambios de tamaño antes de pedir el gráfico de nuevo
+ESPERA_REDIMENSION = 200
+
+
+class VisorGrafico(QWidget):
+    """
+    Muestra un gráfico ya rasterizado (arreglo RGBA). No dibuja nada con
+    matplotlib: el gráfico se arma y se dibuja en otro hilo y aquí solo se
+    pinta la imagen, así que la ventana no se bloquea.
+
+    Al cambiar de tamaño, mientras llega el gráfico nuevo se muestra la
+    imagen anterior escalada; `redimensionado` se emite cuando el tamaño
+    deja de cambiar.
+    """
+    redimensionado = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._imagen = None
+        self._pixeles = None
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self._timer_tamanio = QTimer(self)
+        self._timer_tamanio.setSingleShot(True)
+        self._timer_tamanio.timeout.connect(self.redimensionado.emit)
+
+    def sizeHint(self):
+        return QSize(800, 600)
+
+    def tamanio_fisico(self):
+        """
+        (ancho, alto) en píxeles de pantalla, contando el escalado de alta resolución.
+        """
+        ratio = self.devicePixelRatioF()
+        return max(1, int(self.width() * ratio)), max(1, int(self.height() * ratio))
+
+    def dpi(self):
+        # Igual que el canvas de matplotlib para Qt: 100 dpi por unidad de escalado
+        return 100 * self.devicePixelRatioF()
+
+    def set_imagen(self, pixeles):
+        """
+        Muestra un arreglo RGBA (alto, ancho, 4) de uint8.
+        """
+        alto, ancho = pixeles.shape[:2]
+        # QImage no copia el buffer: se guarda una referencia al arreglo
+        self._pixeles = pixeles
+        self._imagen = QImage(pixeles.data, ancho, alto, ancho * 4, QImage.Format.Format_RGBA8888)
+        self._imagen.setDevicePixelRatio(self.devicePixelRatioF())
+        self.update()
+
+    def limpiar(self):
+        self._imagen = None
+        self._pixeles = None
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.GlobalColor.white)
+        if self._imagen is not None:
+            if self._imagen.size() == QSize(*self.tamanio_fisico()):
+                painter.drawImage(0, 0, self._imagen)
+            else:
+                painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+                painter.drawImage(self.rect(), self._imagen)
+        painter.end()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._timer_tamanio.start(ESPERA_REDIMENSION)
@@ -0,0 +1,84 @@
+# Modules/workers.py
+
+import contextvars
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from Modules import cancelacion, trazas
+
+
+class WorkerSignals(QObject):
+    """
+    Señales de un Worker. Se emiten desde el hilo del pool y Qt las
+    entrega en el hilo principal, donde se puede tocar la interfaz.
+    """
+    finished = pyqtSignal(object)   # resultado de la función
+    batch = pyqtSignal(object)      # resultado parcial (lote de filas)
+    progress = pyqtSignal(int, int) # avance (hechos, total)
+    error = pyqtSignal(str)         # mensaje de error
+    ended = pyqtSignal(str)         # el hilo terminó, aunque se haya cancelado: 'ok', 'error',
+                                    # 'tiempo_agotado' o 'cancelado'
+
+
+class Worker(QRunnable):
+    """
+    Ejecuta una función en un hilo de QThreadPool y devuelve el resultado
+    por señales. Si se cancela, el resultado se descarta y solo se emite
+    ended, cuando el hilo termina.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.cancelled = False
+        # El contexto de quien creó el trabajo (por ejemplo, la corrida de trazas activa),
+        # con la cancelación de este trabajo para las consultas que corran en él
+        self._contexto = contextvars.copy_context()
+        self.cancelacion = cancelacion.Cancelacion()
+        self._contexto.run(cancelacion.establecer, self.cancelacion)
+
+    def cancel(self):
+        """
+        Marca el trabajo como cancelado y corta en el servidor las sentencias
+        que estén ejecutándose; el resultado ya no llega a la interfaz.
+        """
+        self.cancelled = True
+        self.cancelacion.cancelar()
+
+    def emit_batch(self, lote):
+        """
+        Callback on_batch para las funciones de database_utils: reenvía cada
+        lote a la interfaz y, si el trabajo se canceló, corta la lectura.
+        """
+        if self.cancelled:
+            self._cortar()
+        self.signals.batch.emit(lote)
+
+    def emit_progress(self, hechos, total):
+        """
+        Callback on_progress: reenvía el avance a la interfaz y, si el
+        trabajo se canceló, corta la tarea.
+        """
+        if self.cancelled:
+            self._cortar()
+        self.signals.progress.emit(hechos, total)
+
+    @staticmethod
+    def _cortar():
+        raise cancelacion.ConsultaCancelada()
+
+    def run(self):
+        estado = 'ok'
+        try:
+            result = self._contexto.run(trazas.ejecutar, self.fn, *self.args, **self.kwargs)
+        except Exception as e:
+            estado = 'tiempo_agotado' if isinstance(e, cancelacion.TiempoAgotado) else 'error'
+            if not self.cancelled:
+                self.signals.error.emit(str(e))
+        else:
+            if not self.cancelled:
+                self.signals.finished.emit(result)
+        self.signals.ended.emit('cancelado' if self.cancelled else estado)
@@ -0,0 +1,115 @@
+"""
+Mide el arranque de la aplicación: cuánto tarda en importarse informes_v4
+y en mostrarse la ventana, en un intérprete nuevo cada vez.
+
+También verifica que antes de mostrar la ventana no se hayan importado
+los módulos pesados (pandas, numpy, matplotlib, pyodbc), que deben
+cargarse recién al usarse. Termina con código 1 si alguno se importó o si
+el arranque superó el límite, para detectar regresiones.
+
+    python benchmarks/arranque.py
+    python benchmarks/arranque.py --repeticiones 10 --limite 1500 --detalle
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que no deben importarse antes de mostrar la ventana
+MODULOS_PESADOS = ['pandas', 'numpy', 'matplotlib', 'pyodbc']
+# Milisegundos máximos desde el primer import hasta la ventana dibujada
+LIMITE_MS = 1500
+REPETICIONES = 5
+
+# Se ejecuta en un proceso nuevo: importa la aplicación, crea la ventana,
+# la dibuja una vez (sin entrar al bucle de eventos) e informa los tiempos
+_MEDICION = r'''
+import json, sys, time
+inicio = time.perf_counter()
+import informes_v4
+importado = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv)
+ventana = informes_v4.InformeApp()
+ventana.show()
+ventana.repaint()
+dibujado = time.perf_counter()
+print(json.dumps({
+    'import_ms': (importado - inicio) * 1000,
+    'ventana_ms': (dibujado - importado) * 1000,
+    'pesados': [m for m in %r if m in sys.modules],
+}))
+''' % (MODULOS_PESADOS,)
+
+
+def _entorno():
+    entorno = dict(os.environ)
+    # Sin pantalla (servidor de integración) la ventana se dibuja fuera de pantalla
+    entorno.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    return entorno
+
+
+def medir_una_vez():
+    salida = subprocess.run(
+        [sys.executable, '-c', _MEDICION], cwd=RAIZ, env=_entorno(),
+        capture_output=True, text=True, check=True
+    ).stdout
+    # La última línea es el resultado; lo anterior son mensajes de Qt o de la app
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def imports_mas_lentos(cantidad=15):
+    """
+    [(microsegundos acumulados, módulo)] de los imports más lentos de
+    informes_v4, según python -X importtime.
+    """
+    salida = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import informes_v4'],
+        cwd=RAIZ, env=_entorno(), capture_output=True, text=True, check=True
+    ).stderr
+    tiempos = []
+    for linea in salida.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, modulo = [parte.strip() for parte in linea[len('import time:'):].split('|')]
+        tiempos.append((int(acumulado), modulo.strip()))
+    return sorted(tiempos, reverse=True)[:cantidad]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el tiempo de arranque de informes_v4.")
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES)
+    parser.add_argument('--limite', type=float, default=LIMITE_MS,
+                        help="milisegundos máximos hasta mostrar la ventana (mediana)")
+    parser.add_argument('--detalle', action='store_true', help="mostrar los imports más lentos")
+    args = parser.parse_args(argv)
+
+    mediciones = [medir_una_vez() for _ in range(args.repeticiones)]
+    importar = statistics.median(m['import_ms'] for m in mediciones)
+    ventana = statistics.median(m['ventana_ms'] for m in mediciones)
+    pesados = sorted({modulo for m in mediciones for modulo in m['pesados']})
+
+    print(f"Import de informes_v4: {importar:.0f} ms (mediana de {args.repeticiones})")
+    print(f"Ventana creada y dibujada: {ventana:.0f} ms")
+    print(f"Total hasta la ventana: {importar + ventana:.0f} ms (límite {args.limite:.0f} ms)")
+    if args.detalle:
+        print("Imports más lentos (acumulado):")
+        for microsegundos, modulo in imports_mas_lentos():
+            print(f"  {microsegundos / 1000:8.1f} ms  {modulo}")
+
+    fallas = []
+    if pesados:
+        fallas.append(f"se importaron antes de mostrar la ventana: {', '.join(pesados)}")
+    if importar + ventana > args.limite:
+        fallas.append("el arranque superó el límite")
+    for falla in fallas:
+        print(f"ERROR: {falla}")
+    return 1 if fallas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""
+Fuente de datos falsa para medir la aplicación sin sql01 ni red.
+
+Reemplaza el módulo pyodbc por uno en memoria que atiende los mismos
+procedimientos (Will_*) y la vista v_personal_jub con datos sintéticos
+con la forma de los reales: textos con espacios de relleno como las
+columnas char de SQL Server, fechas como texto 'dd-mm-yyyy hh:mm',
+operadores y áreas con actividad desigual y más movimiento entre semana.
+
+Los datos se generan una vez por columnas (numpy) y cada fetchmany arma
+solo las tuplas de su lote, como haría el controlador. Las consultas
+respetan el rango de fechas pedido, así el particionado por meses o
+días de la aplicación funciona igual que contra el servidor.
+
+    fuente = FuenteFalsa(filas=100000)
+    instalar(fuente)          # antes de importar Modules.connection_pool
+"""
+import datetime
+import re
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+
+INICIO = datetime.date(2024, 1, 1)
+FIN = datetime.date(2024, 12, 31)
+
+_APELLIDOS = ['GOMEZ', 'FERNANDEZ', 'GONZALEZ', 'RODRIGUEZ', 'LOPEZ', 'MARTINEZ', 'DIAZ', 'PEREZ',
+              'SANCHEZ', 'ROMERO', 'SOSA', 'BENITEZ', 'RAMIREZ', 'ACOSTA', 'MEDINA', 'ALVAREZ',
+              'TORRES', 'RUIZ', 'FLORES', 'AGUIRRE']
+_NOMBRES = ['MARIA', 'JUAN', 'CARLOS', 'ANA', 'JOSE', 'LAURA', 'JORGE', 'SILVIA', 'LUIS', 'MARTA',
+            'DIEGO', 'CLAUDIA', 'RAUL', 'NORMA', 'PABLO']
+_TIPOS_CATEGORIA = ['ORDINARIA', 'INVALIDEZ', 'PENSION', 'REAJUSTE', 'RECONOCIMIENTO', 'TRANSFERENCIA']
+_TIPOS_NOVEDAD = ['ALTA', 'BAJA', 'MODIFICACION', 'SUSPENSION', 'REHABILITACION']
+
+
+class Error(Exception):
+    pass
+
+
+def _pesos_zipf(cantidad, exponente=0.8):
+    pesos = 1.0 / np.arange(1, cantidad + 1) ** exponente
+    return pesos / pesos.sum()
+
+
+def _textos(valores, ancho=None):
+    # Arreglo de objetos str (como los devuelve pyodbc), con relleno de columna char
+    if ancho is not None:
+        valores = [v.ljust(ancho) for v in valores]
+    arreglo = np.empty(len(valores), dtype=object)
+    arreglo[:] = valores
+    return arreglo
+
+
+def _enteros(valores):
+    # Enteros de Python, no de numpy
+    return np.asarray(valores).astype(object)
+
+
+class Tabla:
+    """
+    Resultado de un procedimiento: columnas (nombre -> arreglo) ordenadas
+    por fecha y la fecha (datetime64[D]) de cada fila para filtrar por rango.
+    """
+
+    def __init__(self, columnas, fechas):
+        self.columnas = columnas
+        self.fechas = fechas
+        self._dias = fechas.astype('datetime64[D]').astype(np.int64)
+
+    def rango(self, inicio, fin):
+        desde = np.datetime64(str(inicio)[:10], 'D').astype(np.int64)
+        hasta = np.datetime64(str(fin)[:10], 'D').astype(np.int64)
+        i = int(np.searchsorted(self._dias, desde, side='left'))
+        j = int(np.searchsorted(self._dias, hasta, side='right'))
+        return {nombre: arreglo[i:j] for nombre, arreglo in self.columnas.items()}
+
+
+class FuenteFalsa:
+    """
+    Datos sintéticos de todos los informes con `filas` filas cada uno,
+    repartidas entre inicio y fin. latencia son los segundos que tarda cada
+    consulta en el "servidor"; durante ese tiempo la sentencia se puede
+    cancelar (cursor.cancel) o agotar el tiempo límite de la conexión,
+    con los mismos SQLSTATE que el controlador ODBC (HY008 y HYT00).
+    """
+
+    def __init__(self, filas, inicio=INICIO, fin=FIN, operadores=300, areas=150, latencia=0.0, semilla=0):
+        self.filas = filas
+        self.inicio = inicio
+        self.fin = fin
+        self.latencia = latencia
+        self._rng = np.random.default_rng(semilla)
+        self._lock = threading.RLock()
+        self.estadisticas = {'conexiones': 0, 'consultas': 0, 'filas': 0, 'ejecucion': 0.0}
+
+        self.operadores = [
+            (1000 + i, f"{_APELLIDOS[i % len(_APELLIDOS)]} {_NOMBRES[(i // len(_APELLIDOS)) % len(_NOMBRES)]} {i:03d}")
+            for i in range(operadores)
+        ]
+        self.areas = [f"AREA {i:03d} - {_APELLIDOS[i % len(_APELLIDOS)].title()}" for i in range(areas)]
+
+        # Cada tabla se genera la primera vez que se pide (ver tabla())
+        self._generadores = {
+            'Will_ObtenerDatosParaInforme2024V3': self._altas,
+            'Will_ObtenerDatosParaInforme2024V4': self._categorias,
+            'Will_novedades_altasv1': self._novedades,
+            # Los movimientos de un operador tienen la misma forma que las altas
+            'Will_ObtenerMovimientos_por_operador': lambda: self.tabla('Will_ObtenerDatosParaInforme2024V3'),
+            'v_personal_jub': self._personal,
+        }
+        self._tablas = {}
+
+    def tabla(self, nombre):
+        """
+        Tabla del procedimiento (o vista) nombre, generada una sola vez.
+        Conviene pedirla antes de medir para no contar la generación.
+        """
+        with self._lock:
+            if nombre not in self._tablas:
+                if nombre not in self._generadores:
+                    raise Error(f"Procedimiento desconocido: {nombre}")
+                self._tablas[nombre] = self._generadores[nombre]()
+            return self._tablas[nombre]
+
+    # ------------------------------------------------------------------
+    # Generación
+    # ------------------------------------------------------------------
+    def _dias(self, n):
+        dias = np.arange(np.datetime64(self.inicio, 'D'), np.datetime64(self.fin, 'D') + 1)
+        # Lunes a viernes tienen diez veces más movimiento que el fin de semana
+        pesos = np.where(((dias.astype(np.int64) + 3) % 7) < 5, 1.0, 0.1)
+        return np.sort(self._rng.choice(dias, n, p=pesos / pesos.sum()))
+
+    def _personal(self):
+        return Tabla(
+            {'Codigo': _enteros([c for c, _ in self.operadores]),
+             'descripcion': _textos(sorted(d for _, d in self.operadores))},
+            np.full(len(self.operadores), np.datetime64(self.inicio, 'D'))
+        )
+
+    def _altas(self):
+        rng, n = self._rng, self.filas
+        dias = self._dias(n)
+        minutos = rng.integers(7 * 60, 19 * 60, n).astype('timedelta64[m]')
+        momentos = dias.astype('datetime64[m]') + minutos
+        # Se formatea cada momento distinto una sola vez
+        unicos, posiciones = np.unique(momentos, return_inverse=True)
+        textos = [datetime.datetime.fromisoformat(str(m)).strftime('%d-%m-%Y %H:%M') for m in unicos]
+        nombres = [d for _, d in self.operadores]
+        return Tabla({
+            'letra': _textos(['E', 'K', 'V'])[rng.choice(3, n, p=[0.5, 0.3, 0.2])],
+            'Operador': _textos(nombres, 40)[rng.choice(len(nombres), n, p=_pesos_zipf(len(nombres)))],
+            'fech_alta': _textos(textos)[posiciones],
+            'Descripcion': _textos(self.areas, 60)[rng.choice(len(self.areas), n, p=_pesos_zipf(len(self.areas)))],
+            'expediente': _enteros(rng.integers(1, 999999, n)),
+        }, dias)
+
+    def _categorias(self):
+        rng, n = self._rng, self.filas
+        dias = self._dias(n)
+        categorias = [f"CATEGORIA {i:02d}" for i in range(40)]
+        return Tabla({
+            'Categoria': _textos(categorias, 30)[rng.choice(len(categorias), n, p=_pesos_zipf(len(categorias)))],
+            'Conteo': _enteros(rng.integers(1, 50, n)),
+            'Tipo': _textos(_TIPOS_CATEGORIA)[rng.integers(0, len(_TIPOS_CATEGORIA), n)],
+        }, dias)
+
+    def _novedades(self):
+        rng, n = self._rng, self.filas
+        dias = self._dias(n)
+        return Tabla({
+            'Anio': _enteros(dias.astype('datetime64[Y]').astype(np.int64) + 1970),
+            'Mes': _enteros(dias.astype('datetime64[M]').astype(np.int64) % 12 + 1),
+            'Beneficio': _enteros(rng.integers(100000, 999999, n)),
+            'Novedad': _textos(_TIPOS_NOVEDAD, 20)[rng.integers(0, len(_TIPOS_NOVEDAD), n)],
+        }, dias)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def consultar(self, query, params):
+        """
+        Columnas del resultado de query (EXEC de un procedimiento, la vista
+        de operadores o el SELECT 1 de verificación del pool).
+        """
+        if 'SELECT 1' in query:
+            return {'x': _enteros([1])}
+        if 'v_personal_jub' in query:
+            return dict(self.tabla('v_personal_jub').columnas)
+        procedimiento = re.search(r'EXEC\s+(\w+)', query)
+        if procedimiento is None:
+            raise Error(f"Consulta desconocida: {query.strip()[:60]}")
+        return self.tabla(procedimiento.group(1)).rango(params[0], params[1])
+
+    def anotar(self, **valores):
+        with self._lock:
+            for clave, valor in valores.items():
+                self.estadisticas[clave] += valor
+
+    def reiniciar_estadisticas(self):
+        with self._lock:
+            for clave in self.estadisticas:
+                self.estadisticas[clave] = 0
+
+
+class Cursor:
+    def __init__(self, fuente, timeout=0):
+        self._fuente = fuente
+        self._timeout = timeout
+        self._cancelado = threading.Event()
+        self._columnas = []
+        self._posicion = 0
+        self._total = 0
+        self.description = None
+
+    def execute(self, query, params=()):
+        inicio = time.perf_counter()
+        resultado = self._fuente.consultar(query, params)
+        if self._fuente.latencia:
+            espera = self._fuente.latencia
+            if self._timeout:
+                espera = min(espera, self._timeout)
+            if self._cancelado.wait(espera):
+                raise Error('HY008', "Operation canceled")
+            if espera < self._fuente.latencia:
+                raise Error('HYT00', "Query timeout expired")
+        self.description = [(nombre, None, None, None, None, None, True) for nombre in resultado]
+        self._columnas = list(resultado.values())
+        self._posicion = 0
+        self._total = len(self._columnas[0]) if self._columnas else 0
+        self._fuente.anotar(consultas=1, filas=self._total, ejecucion=time.perf_counter() - inicio)
+        return self
+
+    def fetchmany(self, cantidad):
+        desde, hasta = self._posicion, min(self._posicion + cantidad, self._total)
+        self._posicion = hasta
+        return list(zip(*(columna[desde:hasta] for columna in self._columnas)))
+
+    def fetchone(self):
+        filas = self.fetchmany(1)
+        return filas[0] if filas else None
+
+    def fetchall(self):
+        return self.fetchmany(self._total - self._posicion)
+
+    def cancel(self):
+        self._cancelado.set()
+        self._posicion = self._total
+
+    def close(self):
+        self._columnas = []
+
+
+class Conexion:
+    timeout = 0
+
+    def __init__(self):
+        _fuente_actual.anotar(conexiones=1)
+
+    def cursor(self):
+        # La fuente instalada en este momento (el pool puede reusar conexiones)
+        return Cursor(_fuente_actual, self.timeout)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+_fuente_actual = None
+
+
+def modulo_pyodbc():
+    """
+    Módulo con la parte de la interfaz de pyodbc que usa la aplicación.
+    """
+    modulo = types.ModuleType('pyodbc')
+    modulo.Error = Error
+    modulo.drivers = lambda: ['ODBC Driver 17 for SQL Server', 'SQL Server']
+    modulo.connect = lambda cadena, **kwargs: Conexion()
+    modulo.fuente_falsa = True
+    return modulo
+
+
+def instalar(fuente):
+    """
+    Hace que las consultas lean de fuente. La primera vez reemplaza pyodbc,
+    así que hay que llamarla antes de importar Modules.connection_pool (o
+    cualquier módulo que lo importe); después solo cambia la fuente.
+    """
+    global _fuente_actual
+    _fuente_actual = fuente
+    if not getattr(sys.modules.get('pyodbc'), 'fuente_falsa', False):
+        sys.modules['pyodbc'] = modulo_pyodbc()
@@ -0,0 +1,236 @@
+"""
+Mide cada etapa de los informes con datos sintéticos (benchmarks/fuente_falsa.py),
+sin sql01 ni red: conexión, ejecución y lectura de la consulta, consulta
+completa como la hace la aplicación (particionada y con caché), tipado del
+DataFrame, carga de la tabla, agregados, cada gráfico de mostrar_graficos y
+la exportación a Excel y CSV.
+
+Los resultados (segundos por etapa) se guardan en un JSON (por defecto
+%LOCALAPPDATA%\informes_jub\benchmarks\resultados.json, fuera del
+repositorio); con --base se comparan con una corrida anterior y se marcan
+las etapas más lentas que el umbral.
+
+    python benchmarks/suite.py
+    python benchmarks/suite.py --tamanios 1000,100000,1000000 --informes "Informe de Altas"
+    python benchmarks/suite.py --salida nueva.json --base benchmarks/base.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import fuente_falsa  # noqa: E402  (está en esta misma carpeta)
+
+TAMANIOS = [1000, 10000, 100000]
+# Una etapa más lenta que la base por encima de este factor se marca como regresión
+UMBRAL = 1.25
+# Etapas más rápidas que esto no se comparan (el ruido es mayor que la medición)
+MINIMO_COMPARABLE = 0.005
+# Tamaño del visor de gráficos y filas visibles de la tabla
+TAMANIO_GRAFICO = (800, 600)
+FILAS_VISIBLES = 40
+# Operador y letra para el Informe de Operadores
+OPERADOR = 1000
+LETRA = 'T'
+
+
+def _cronometro():
+    inicio = time.perf_counter()
+    return lambda: time.perf_counter() - inicio
+
+
+def medir_informe(informe, filas, carpeta, excel=True):
+    """
+    Genera los datos de informe con `filas` filas y devuelve
+    {etapa: segundos}. carpeta es donde se escriben los archivos exportados.
+    """
+    from Modules.aggregations import AggregationCache
+    from Modules.connection_pool import ConnectionPool, get_pool
+    from Modules.database_utils import _ejecutar_consulta
+    from Modules.dataset import ReportDataset
+    from Modules.graficos import renderizar_grafico
+    from Modules.informes import GRAFICOS_POR_INFORME, PROCEDIMIENTOS, exportar_informe, obtener_datos
+    from Modules.table_model import DataFrameModel
+    from PyQt6.QtCore import QModelIndex, Qt
+
+    fuente = fuente_falsa.FuenteFalsa(filas)
+    procedimiento = PROCEDIMIENTOS.get(informe, 'Will_ObtenerMovimientos_por_operador')
+    # Los datos se generan antes de medir
+    fuente.tabla(procedimiento)
+    fuente_falsa.instalar(fuente)
+    get_pool().close_all()
+    inicio, fin = fuente.inicio.isoformat(), fuente.fin.isoformat()
+    tiempos = {}
+
+    # Conexión nueva (elección de controlador incluida)
+    pool = ConnectionPool()
+    reloj = _cronometro()
+    conexion = pool.acquire()
+    tiempos['conexion'] = reloj()
+    pool.release(conexion)
+    pool.close_all()
+
+    # Una sola consulta por todo el rango: ejecución en el "servidor" y lectura por lotes
+    if informe in PROCEDIMIENTOS:
+        consulta = f"EXEC {procedimiento} @FechaInicio = ?, @FechaFin = ?"
+        parametros = (inicio, fin)
+    else:
+        consulta = f"EXEC {procedimiento} @FechaInicio = ?, @FechaFin = ?, @CodigoOperador = ?, @Letra = ?"
+        parametros = (inicio, fin, OPERADOR, LETRA)
+    fuente.reiniciar_estadisticas()
+    reloj = _cronometro()
+    _ejecutar_consulta(consulta, parametros)
+    total = reloj()
+    tiempos['ejecucion'] = fuente.estadisticas['ejecucion']
+    tiempos['lectura'] = total - fuente.estadisticas['ejecucion']
+
+    # Consulta como la hace la aplicación: particiones en paralelo y caché local
+    reloj = _cronometro()
+    df = obtener_datos(informe, inicio, fin, OPERADOR, LETRA, force_refresh=True)
+    tiempos['consulta'] = reloj()
+    # Segunda vez: todo sale de la caché local
+    reloj = _cronometro()
+    obtener_datos(informe, inicio, fin, OPERADOR, LETRA)
+    tiempos['consulta_desde_cache'] = reloj()
+
+    reloj = _cronometro()
+    dataset = ReportDataset(df)
+    tiempos['tipado'] = reloj()
+
+    # Tabla: cargar el DataFrame, pedir las celdas visibles y ordenar por una columna
+    modelo = DataFrameModel()
+    reloj = _cronometro()
+    modelo.set_dataframe(dataset.df)
+    for fila in range(min(FILAS_VISIBLES, modelo.rowCount())):
+        for columna in range(modelo.columnCount()):
+            modelo.data(modelo.index(fila, columna, QModelIndex()), Qt.ItemDataRole.DisplayRole)
+    tiempos['tabla'] = reloj()
+    reloj = _cronometro()
+    modelo.sort(0, Qt.SortOrder.AscendingOrder)
+    tiempos['tabla_orden'] = reloj()
+
+    agregados = AggregationCache(dataset)
+    reloj = _cronometro()
+    agregados.precalcular(informe)
+    tiempos['agregados'] = reloj()
+
+    for tipo_grafico in GRAFICOS_POR_INFORME.get(informe, []):
+        reloj = _cronometro()
+        renderizar_grafico(informe, tipo_grafico, agregados, *TAMANIO_GRAFICO)
+        tiempos[f'grafico: {tipo_grafico}'] = reloj()
+
+    nombre = informe.replace(' ', '_')
+    if excel:
+        reloj = _cronometro()
+        exportar_informe(os.path.join(carpeta, f'{nombre}.xlsx'), dataset.df, agregados, informe)
+        tiempos['exportacion_excel'] = reloj()
+    reloj = _cronometro()
+    exportar_informe(os.path.join(carpeta, f'{nombre}.csv'), dataset.df, agregados, informe)
+    tiempos['exportacion_csv'] = reloj()
+    return tiempos
+
+
+def _aplanar(resultados):
+    # {informe: {filas: {etapa: s}}} -> {"informe | filas | etapa": s}
+    return {
+        f"{informe} | {filas} | {etapa}": segundos
+        for informe, por_tamanio in resultados.items()
+        for filas, etapas in por_tamanio.items()
+        for etapa, segundos in etapas.items()
+    }
+
+
+def comparar(actual, base, umbral=UMBRAL):
+    """
+    Imprime las etapas presentes en ambas corridas con su cambio y
+    devuelve la lista de regresiones (más lentas que base * umbral).
+    """
+    actual, base = _aplanar(actual['resultados']), _aplanar(base['resultados'])
+    regresiones = []
+    print(f"\n{'Etapa':70} {'Base':>9} {'Actual':>9} {'Cambio':>8}")
+    for clave in sorted(actual.keys() & base.keys()):
+        antes, ahora = base[clave], actual[clave]
+        if max(antes, ahora) < MINIMO_COMPARABLE:
+            continue
+        factor = ahora / antes if antes else float('inf')
+        marca = ''
+        if factor > umbral:
+            regresiones.append(clave)
+            marca = '  <-- más lento'
+        print(f"{clave:70} {antes:9.3f} {ahora:9.3f} {factor:7.2f}x{marca}")
+    return regresiones
+
+
+def salida_por_defecto():
+    """
+    Archivo de resultados en la carpeta local de la aplicación (la del
+    usuario, antes de que la corrida apunte LOCALAPPDATA a una temporal).
+    """
+    from Modules.result_cache import directorio_usuario
+
+    carpeta = os.path.join(directorio_usuario(), 'benchmarks')
+    os.makedirs(carpeta, exist_ok=True)
+    return os.path.join(carpeta, 'resultados.json')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide los informes con datos sintéticos, sin servidor.")
+    parser.add_argument('--tamanios', default=','.join(map(str, TAMANIOS)),
+                        help="filas de cada informe, separadas por comas (por ejemplo 1000,100000,5000000)")
+    parser.add_argument('--informes', help="informes a medir, separados por comas (por defecto todos)")
+    parser.add_argument('--sin-excel', action='store_true', help="no medir la exportación a Excel (la más lenta)")
+    parser.add_argument('--salida', help="archivo JSON donde se guardan los resultados "
+                                         "(por defecto en la carpeta local de la aplicación)")
+    parser.add_argument('--base', help="JSON de una corrida anterior para comparar")
+    parser.add_argument('--umbral', type=float, default=UMBRAL)
+    args = parser.parse_args(argv)
+    if args.salida is None:
+        args.salida = salida_por_defecto()
+
+    tamanios = [int(float(t)) for t in args.tamanios.split(',')]
+    with tempfile.TemporaryDirectory() as carpeta:
+        # La caché local de resultados va a una carpeta temporal, no a la del usuario
+        os.environ['LOCALAPPDATA'] = carpeta
+        fuente_falsa.instalar(fuente_falsa.FuenteFalsa(0))
+        from Modules.informes import INFORMES
+        informes = [i.strip() for i in args.informes.split(',')] if args.informes else INFORMES
+
+        resultados = {}
+        for informe in informes:
+            for filas in tamanios:
+                print(f"{informe}, {filas} filas...", flush=True)
+                tiempos = medir_informe(informe, filas, carpeta, excel=not args.sin_excel)
+                resultados.setdefault(informe, {})[str(filas)] = tiempos
+                for etapa, segundos in tiempos.items():
+                    print(f"    {etapa:45} {segundos:9.3f} s")
+
+    corrida = {
+        'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'procesador': platform.processor(),
+        'resultados': resultados,
+    }
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(corrida, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados guardados en {args.salida}")
+
+    if args.base:
+        with open(args.base, encoding='utf-8') as f:
+            base = json.load(f)
+        regresiones = comparar(corrida, base, args.umbral)
+        if regresiones:
+            print(f"\n{len(regresiones)} etapas más lentas que la base (umbral {args.umbral:.2f}x)")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
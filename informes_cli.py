@@ -0,0 +1,290 @@
+"""
+Genera informes sin interfaz gráfica, para ejecutarlos desde el
+Programador de tareas (por ejemplo, de noche, fuera del horario de oficina).
+
+Un informe:
+    python informes_cli.py informe "Informe de Altas" --desde ayer --hasta ayer --salida C:/Informes
+
+Varios informes a la vez, desde un archivo de trabajos (JSON):
+    python informes_cli.py lote trabajos.json
+
+    {
+        "salida": "C:/Informes",
+        "paralelo": 2,
+        "trabajos": [
+            {"informe": "Informe de Altas", "desde": "ayer", "hasta": "ayer"},
+            {"informe": "Informe por Categoria", "desde": "hoy-7", "hasta": "ayer", "top_n": 20},
+            {"informe": "Informe de Operadores", "desde": "2025-01-01", "hasta": "2025-01-31",
+             "operador": 123, "letra": "T", "salida": "operadores"},
+            {"informe": "Informe de Operadores", "desde": "hoy-30", "hasta": "ayer", "operador": "todos"}
+        ]
+    }
+
+Las fechas pueden ser yyyy-mm-dd, "hoy", "ayer" u "hoy-N" (N días antes de hoy).
+Por cada informe se escribe el Excel y un PNG por gráfico en la carpeta de salida.
+"""
+import argparse
+import datetime
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+
+from Modules import trazas
+from Modules.aggregations import AggregationCache
+from Modules.connection_pool import get_pool
+from Modules.graficos import guardar_grafico
+from Modules.informes import (
+    INFORMES, MAX_WORKERS_OPERADORES, TODOS_LOS_OPERADORES, cargar_informe, exportar_informe, graficos_disponibles, nombre_sugerido,
+    operadores_con_error
+)
+from Modules.parallel import MAX_WORKERS, ejecutar_en_paralelo
+
+# Tamaño (pulgadas) y resolución de los PNG de los gráficos
+TAMANIO_GRAFICO = (12, 7)
+DPI_GRAFICOS = 150
+# Informes que se generan a la vez en el modo lote
+PARALELO = 2
+# Letras de expediente del Informe de Operadores (T = todas)
+LETRAS = ['T', 'E', 'K', 'V']
+LETRA = 'T'
+
+_FECHA_RELATIVA = re.compile(r'^hoy\s*-\s*(\d+)$')
+
+
+def fecha(texto):
+    """
+    Convierte yyyy-mm-dd, 'hoy', 'ayer' u 'hoy-N' en una fecha yyyy-mm-dd.
+    """
+    texto = str(texto).strip().lower()
+    hoy = datetime.date.today()
+    if texto == 'hoy':
+        return hoy.isoformat()
+    if texto == 'ayer':
+        return (hoy - datetime.timedelta(days=1)).isoformat()
+    relativa = _FECHA_RELATIVA.match(texto)
+    if relativa:
+        return (hoy - datetime.timedelta(days=int(relativa.group(1)))).isoformat()
+    try:
+        return datetime.date.fromisoformat(texto).isoformat()
+    except ValueError:
+        raise ValueError(f"Fecha no válida: {texto!r} (use yyyy-mm-dd, hoy, ayer u hoy-N)")
+
+
+def operador(texto):
+    """
+    Código de operador, o 'todos' para el informe de todos los operadores
+    (una hoja por operador y el gráfico de comparación).
+    """
+    texto = str(texto).strip().lower()
+    if texto == TODOS_LOS_OPERADORES:
+        return TODOS_LOS_OPERADORES
+    try:
+        return int(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Operador no válido: {texto!r} (use un código o '{TODOS_LOS_OPERADORES}')")
+
+
+def letra(texto):
+    """
+    Letra de expediente (una de LETRAS, sin distinguir mayúsculas).
+    """
+    texto = str(texto).strip().upper()
+    if texto not in LETRAS:
+        raise argparse.ArgumentTypeError(f"Letra no válida: {texto!r} (use {', '.join(LETRAS)})")
+    return texto
+
+
+def _nombre_archivo(texto):
+    # "Gráfico de Operadores" -> "Grafico_de_Operadores"
+    sin_acentos = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^A-Za-z0-9]+', '_', sin_acentos).strip('_')
+
+
+def generar(informe, desde, hasta, salida, operador=None, letra=LETRA, graficos=True, top_n=0,
+            forzar=False, max_workers=None, dpi=DPI_GRAFICOS):
+    """
+    Consulta un informe y escribe en salida el Excel y, si graficos es
+    True, un PNG por cada gráfico del informe. Devuelve la lista de
+    archivos escritos (vacía si el informe no tiene datos). max_workers
+    es la cantidad de consultas a la vez (None: la de obtener_datos).
+    """
+    if informe not in INFORMES:
+        raise ValueError(f"Informe desconocido: {informe!r}")
+    desde, hasta = fecha(desde), fecha(hasta)
+    if informe == "Informe de Operadores" and operador is None:
+        raise ValueError("El Informe de Operadores necesita un operador")
+
+    inicio = time.perf_counter()
+    # Los tiempos por etapa quedan en el registro de trazas, igual que en la ventana
+    corrida = trazas.Corrida('cli', informe=informe, desde=desde, hasta=hasta)
+    try:
+        with corrida.activa():
+            escritos, filas = _generar(informe, desde, hasta, salida, operador, letra,
+                                       graficos, top_n, forzar, max_workers, dpi)
+    except Exception as e:
+        corrida.terminar('error', error=str(e))
+        raise
+    corrida.terminar(filas=filas, archivos=len(escritos))
+    if escritos:
+        print(f"{informe} ({desde} a {hasta}): {filas} registros, "
+              f"{len(escritos)} archivos en {time.perf_counter() - inicio:.1f} s")
+    return escritos
+
+
+def _generar(informe, desde, hasta, salida, operador, letra, graficos, top_n, forzar, max_workers, dpi):
+    dataset = cargar_informe(informe, desde, hasta, operador, letra,
+                             force_refresh=forzar, max_workers=max_workers)
+    for codigo, nombre, error in operadores_con_error(dataset.df):
+        print(f"{informe}: falta el operador {codigo} ({nombre}), su consulta falló: {error}")
+    if dataset.empty:
+        print(f"{informe} ({desde} a {hasta}): sin datos")
+        return [], 0
+
+    os.makedirs(salida, exist_ok=True)
+    base = nombre_sugerido(informe, desde, hasta)
+    if operador is not None and informe == "Informe de Operadores":
+        base += f"_{operador}_{letra or LETRA}"
+    agregados = AggregationCache(dataset)
+    agregados.precalcular(informe)
+
+    escritos = []
+    ruta_excel = os.path.join(salida, base + ".xlsx")
+    exportar_informe(ruta_excel, dataset.df, agregados, informe)
+    escritos.append(ruta_excel)
+
+    if graficos:
+        vista = {'top_n': top_n} if top_n else None
+        for tipo_grafico in graficos_disponibles(informe, operador):
+            ruta = os.path.join(salida, f"{base}_{_nombre_archivo(tipo_grafico)}.png")
+            try:
+                guardar_grafico(ruta, informe, tipo_grafico, agregados, TAMANIO_GRAFICO, dpi, vista)
+            except KeyError as e:
+                print(f"{informe}: no se pudo generar {tipo_grafico} (columna no encontrada - {e})")
+                continue
+            escritos.append(ruta)
+    return escritos, len(dataset)
+
+
+def leer_trabajos(ruta):
+    """
+    Lee un archivo de trabajos y devuelve (trabajos, paralelo). Cada
+    trabajo se valida y normaliza como los argumentos del modo informe
+    (fechas, operador y letra, que por defecto es T), así un archivo con
+    errores falla antes de consultar nada.
+    """
+    with open(ruta, encoding='utf-8') as f:
+        contenido = json.load(f)
+    if isinstance(contenido, list):
+        contenido = {'trabajos': contenido}
+    # Las rutas relativas se toman desde el archivo; las de cada trabajo, desde la salida común
+    carpeta = os.path.dirname(os.path.abspath(ruta))
+    salida_comun = os.path.join(carpeta, contenido.get('salida', '.'))
+
+    trabajos = []
+    for i, trabajo in enumerate(contenido.get('trabajos', []), start=1):
+        if 'informe' not in trabajo or 'desde' not in trabajo:
+            raise ValueError(f"Trabajo {i}: faltan 'informe' o 'desde'")
+        trabajo = dict(trabajo)
+        trabajo.setdefault('hasta', trabajo['desde'])
+        try:
+            _normalizar_trabajo(trabajo)
+        except (ValueError, argparse.ArgumentTypeError) as e:
+            raise ValueError(f"Trabajo {i}: {e}") from e
+        trabajo['salida'] = os.path.normpath(os.path.join(salida_comun, trabajo.get('salida', '.')))
+        trabajos.append(trabajo)
+    return trabajos, contenido.get('paralelo', PARALELO)
+
+
+def _normalizar_trabajo(trabajo):
+    if trabajo['informe'] not in INFORMES:
+        raise ValueError(f"Informe desconocido: {trabajo['informe']!r}")
+    trabajo['desde'], trabajo['hasta'] = fecha(trabajo['desde']), fecha(trabajo['hasta'])
+    if trabajo.get('operador') is not None:
+        trabajo['operador'] = operador(trabajo['operador'])
+    elif trabajo['informe'] == "Informe de Operadores":
+        raise ValueError("El Informe de Operadores necesita un operador")
+    trabajo['letra'] = letra(trabajo.get('letra') or LETRA)
+
+
+def ejecutar_lote(trabajos, paralelo=PARALELO, forzar=False, dpi=DPI_GRAFICOS, max_workers=None):
+    """
+    Genera todos los trabajos, hasta `paralelo` a la vez. Un trabajo que
+    falla no detiene a los demás. Devuelve la cantidad de trabajos fallidos.
+    """
+    paralelo = max(1, min(paralelo, len(trabajos) or 1))
+    # Cada informe consulta con su ancho completo; el pool se amplía para que
+    # los `paralelo` informes a la vez no tengan que esperar conexiones
+    anchos = [MAX_WORKERS_OPERADORES if t.get('operador') == TODOS_LOS_OPERADORES else MAX_WORKERS
+              for t in trabajos]
+    get_pool(paralelo * (max_workers or max(anchos, default=MAX_WORKERS)))
+
+    def tarea(trabajo):
+        def ejecutar():
+            try:
+                generar(trabajo['informe'], trabajo['desde'], trabajo['hasta'], trabajo['salida'],
+                        operador=trabajo.get('operador'), letra=trabajo.get('letra', LETRA),
+                        graficos=trabajo.get('graficos', True), top_n=trabajo.get('top_n', 0),
+                        forzar=trabajo.get('forzar', forzar), max_workers=max_workers, dpi=dpi)
+                return None
+            except Exception as e:
+                print(f"Error en {trabajo['informe']} ({trabajo['desde']} a {trabajo['hasta']}): {e}")
+                return e
+        return ejecutar
+
+    errores = ejecutar_en_paralelo([tarea(t) for t in trabajos], max_workers=paralelo, reintentos=0)
+    fallidos = sum(error is not None for error in errores)
+    print(f"Lote terminado: {len(trabajos) - fallidos} de {len(trabajos)} informes generados")
+    return fallidos
+
+
+def _argumentos(argv=None):
+    parser = argparse.ArgumentParser(description="Genera informes sin abrir la interfaz gráfica.")
+    parser.add_argument('--forzar', action='store_true', help="ignorar la caché local y consultar al servidor")
+    parser.add_argument('--dpi', type=int, default=DPI_GRAFICOS, help="resolución de los gráficos")
+    parser.add_argument('--consultas', type=int,
+                        help=f"consultas a la vez por informe (por defecto {MAX_WORKERS}, "
+                             f"o {MAX_WORKERS_OPERADORES} con todos los operadores)")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    uno = comandos.add_parser('informe', help="genera un informe")
+    uno.add_argument('informe', choices=INFORMES)
+    uno.add_argument('--desde', required=True, help="yyyy-mm-dd, hoy, ayer u hoy-N")
+    uno.add_argument('--hasta', help="igual que --desde (por defecto, la misma fecha)")
+    uno.add_argument('--operador', type=operador,
+                     help=f"código de operador, o '{TODOS_LOS_OPERADORES}' para todos (Informe de Operadores)")
+    uno.add_argument('--letra', default=LETRA, choices=LETRAS,
+                     help="letra del expediente (Informe de Operadores; T = todas)")
+    uno.add_argument('--salida', default='.', help="carpeta donde se escriben los archivos")
+    uno.add_argument('--sin-graficos', action='store_true', help="solo el Excel")
+    uno.add_argument('--top', type=int, default=0,
+                     help="en los gráficos por categoría, mostrar las N mayores y agrupar el resto")
+
+    lote = comandos.add_parser('lote', help="genera los informes de un archivo de trabajos (JSON)")
+    lote.add_argument('archivo')
+    lote.add_argument('--paralelo', type=int, help=f"informes a la vez (por defecto {PARALELO})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _argumentos(argv)
+    try:
+        if args.comando == 'informe':
+            generar(args.informe, args.desde, args.hasta or args.desde, args.salida,
+                    operador=args.operador, letra=args.letra, graficos=not args.sin_graficos,
+                    top_n=args.top, forzar=args.forzar, max_workers=args.consultas, dpi=args.dpi)
+            return 0
+        trabajos, paralelo = leer_trabajos(args.archivo)
+        fallidos = ejecutar_lote(trabajos, args.paralelo or paralelo, args.forzar, args.dpi, args.consultas)
+        return 1 if fallidos else 0
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        get_pool().close_all()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
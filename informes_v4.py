@@ -1,26 +1,33 @@
 import sys
 import os
-import pandas as pd
+import argparse
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, 
-    QDateEdit, QMessageBox, QTabWidget, QTableWidget, QTableWidgetItem, QFileDialog, QComboBox, QCheckBox
+    QDateEdit, QMessageBox, QTabWidget, QTableView, QFileDialog, QComboBox, QCheckBox,
+    QProgressBar, QSpinBox, QScrollBar, QMenu
 )
-from PyQt6.QtGui import QIcon, QCursor
-from PyQt6.QtCore import QDate, Qt, QTimer
+from PyQt6.QtGui import QCursor, QDesktopServices, QIcon, QKeySequence, QShortcut, QStandardItem, QStandardItemModel
+from PyQt6.QtCore import QDate, Qt, QTimer, QThreadPool, QUrl, pyqtSignal
 from Modules.styles import apply_styles
-# Importamos las nuevas funciones de database_utils
-from Modules.database_utils import (
-    fetch_data_from_database,
-    fetch_data_operadores,
-    fetch_operators_list
+# Al arrancar solo se importa Qt y módulos livianos: pandas, pyodbc y
+# matplotlib se importan la primera vez que se usan (consulta, tabla, gráfico)
+from Modules.informes import (
+    GRAFICOS_POR_CATEGORIA, TODOS_LOS_OPERADORES, VENTANA_CATEGORIAS,
+    cargar_cambios, cargar_informe, exportar_informe, graficos_disponibles, nombre_sugerido, obtener_datos,
+    operadores_con_error
 )
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-from matplotlib.ticker import MaxNLocator
-import matplotlib.pyplot as plt
-import numpy as np
+from Modules.exportacion import FORMATOS
+from Modules.operadores import consultar_operadores, leer_copia_local
+from Modules.workers import Worker
+from Modules import perfilado, trazas
+from Modules.panel_rendimiento import PanelRendimiento
+from Modules.programador import ProgramadorRefresco
+from Modules.render_cache import RenderCache
+from Modules.visor_grafico import VisorGrafico
 from PyQt6 import QtCore
-from matplotlib.patches import FancyBboxPatch
+
+# Resolución de los PNG exportados (SVG y PDF son vectoriales)
+DPI_EXPORTACION = 300
 
 def get_resource_path(file_name, folder='Source'):
     """
@@ -34,8 +41,41 @@ def get_resource_path(file_name, folder='Source'):
         return os.path.join(os.path.dirname(os.path.abspath(__file__)), folder, file_name)
 
 class InformeApp(QWidget):
+    # Rutas (.prof, .json) de un perfil recién guardado; puede llegar desde otro hilo
+    perfil_guardado = pyqtSignal(object, str)
+
     def __init__(self):
         super().__init__()
+        # Trabajo de consulta en curso (se ejecuta fuera del hilo de la interfaz)
+        # y los parámetros que consulta
+        self._worker = None
+        self._parametros_en_curso = None
+        self._worker_exportacion = None
+        self._worker_operadores = None
+        # Lista de operadores mostrada en el combo [(codigo, descripcion)]
+        self._operadores = None
+        self._graficar_al_terminar = False
+        self._filas_cargadas = 0
+        # Marca de agua para el refresco incremental en tiempo real
+        # (se crea con el primer informe)
+        self._refresco = None
+        # Parámetros del informe cargado, para comparar con él los refrescos
+        self._parametros_cargados = None
+        # Agregados del informe cargado, compartidos por gráficos y exportación
+        self._agregados = None
+        # Gráficos ya dibujados para el dataset actual
+        self._graficos = RenderCache()
+        self._graficos_version = None
+        self._worker_grafico = None
+        # (informe, tipo de gráfico) mostrado, y el gráfico dibujado con su clave
+        # (para exportarlo o actualizarlo en el lugar con datos nuevos)
+        self._grafico_pedido = None
+        self._grafico_actual = None
+        self._clave_actual = None
+        # Corridas de trazas en curso (informe, gráfico y exportación), ver Modules/trazas.py
+        self._corrida = None
+        self._corrida_grafico = None
+        self._corrida_exportacion = None
         self.initUI()
         
     def initUI(self):
@@ -94,6 +134,8 @@ class InformeApp(QWidget):
 
         self.operator_combo = QComboBox(self)
         self.operator_combo.setStyleSheet("font-size: 12px; padding: 2px; margin: 0px;")
+        # Con "Todos los operadores" cambian los gráficos disponibles
+        self.operator_combo.currentIndexChanged.connect(self.update_grafico_options)
         top_layout.addWidget(self.operator_combo)
 
         # 5) NUEVO: Label y ComboBox para Letra
@@ -121,9 +163,16 @@ class InformeApp(QWidget):
         self.btn_generar.setIcon(QIcon(get_resource_path('generar.png')))
         self.btn_generar.setIconSize(QtCore.QSize(50, 50))
         self.btn_generar.setToolTip('Generar Informe')
-        self.btn_generar.clicked.connect(self.generar_informe)
+        # Sin lambda, clicked pasaría su argumento `checked` como al_terminar
+        self.btn_generar.clicked.connect(lambda: self.generar_informe())
         top_layout.addWidget(self.btn_generar)
 
+        # 6b) Ignorar la caché local y volver a consultar al servidor
+        self.checkbox_forzar = QCheckBox("Forzar actualización")
+        self.checkbox_forzar.setStyleSheet("font-size: 12px; color: #ffff;")
+        self.checkbox_forzar.setToolTip('Consultar al servidor aunque el informe esté en la caché local')
+        top_layout.addWidget(self.checkbox_forzar)
+
         # 7) Botón Guardar en Excel
         self.btn_guardar = QPushButton(self)
         self.btn_guardar.setIcon(QIcon(get_resource_path('toexcel2.png')))
@@ -162,14 +211,44 @@ class InformeApp(QWidget):
         # Configuración de layout para la pestaña de informes
         self.informe_layout = QVBoxLayout(self.tab_informes)
         
-        # Tabla para mostrar el informe
-        self.informe_table = QTableWidget(self)
+        # Tabla para mostrar el informe (vista sobre un modelo que lee del DataFrame;
+        # el modelo se crea con el primer informe, ver _modelo_tabla)
+        self.table_model = None
+        self.informe_table = QTableView(self)
+        self.informe_table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.informe_table.setSortingEnabled(True)
         self.informe_layout.addWidget(self.informe_table)
 
+        # Barra inferior: total de registros, progreso y cancelación
+        self.estado_layout = QHBoxLayout()
+
         # Añadir el label para mostrar el total de registros
         self.total_registros_label = QLabel("Total de registros: 0")
         self.total_registros_label.setStyleSheet("font-size: 12px; color: #333;")
-        self.informe_layout.addWidget(self.total_registros_label)
+        self.estado_layout.addWidget(self.total_registros_label)
+        self.estado_layout.addStretch()
+
+        # Indicador de progreso (modo ocupado) mientras corre la consulta
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.hide()
+        self.estado_layout.addWidget(self.progress_bar)
+
+        # Avance de la exportación, que corre en segundo plano
+        self.progress_exportacion = QProgressBar(self)
+        self.progress_exportacion.setFormat("Exportando %p%")
+        self.progress_exportacion.setMaximumWidth(200)
+        self.progress_exportacion.hide()
+        self.estado_layout.addWidget(self.progress_exportacion)
+
+        self.btn_cancelar = QPushButton("Cancelar", self)
+        self.btn_cancelar.setToolTip('Cancelar la generación del informe')
+        self.btn_cancelar.clicked.connect(self.cancelar_informe)
+        self.btn_cancelar.hide()
+        self.estado_layout.addWidget(self.btn_cancelar)
+
+        self.informe_layout.addLayout(self.estado_layout)
         
         # Configuración de layout para la pestaña de gráficos
         self.graficos_layout = QVBoxLayout(self.tab_graficos)
@@ -184,145 +263,516 @@ class InformeApp(QWidget):
         self.checkbox_actualizar.setStyleSheet("font-size: 12px; color: #333;")
         self.checkbox_actualizar.stateChanged.connect(self.toggle_actualizacion_tiempo_real)
         self.filter_layout.addWidget(self.checkbox_actualizar)
+
+        # Top N: las categorías fuera de las primeras N se juntan en "Otros"
+        self.spin_top_n = QSpinBox()
+        self.spin_top_n.setRange(0, 500)
+        self.spin_top_n.setPrefix("Top ")
+        self.spin_top_n.setSpecialValueText("Todas las categorías")
+        self.spin_top_n.setToolTip('Agrupa en "Otros" las categorías que quedan fuera de las primeras N')
+        self.spin_top_n.setStyleSheet("font-size: 12px; color: #333;")
+        self.spin_top_n.valueChanged.connect(self._vista_cambiada)
+        self.filter_layout.addWidget(self.spin_top_n)
+
+        self.checkbox_paginar = QCheckBox("Paginar categorías")
+        self.checkbox_paginar.setStyleSheet("font-size: 12px; color: #333;")
+        self.checkbox_paginar.stateChanged.connect(self._vista_cambiada)
+        self.filter_layout.addWidget(self.checkbox_paginar)
         
         self.graficos_layout.addLayout(self.filter_layout)
         
         # Área de gráficos usando Matplotlib
-        self.canvas = FigureCanvas(Figure(figsize=(8, 6)))
-        self.graficos_layout.addWidget(self.canvas)
+        self.visor_grafico = VisorGrafico(self)
+        self.visor_grafico.redimensionado.connect(self._redibujar_grafico)
+        self.graficos_layout.addWidget(self.visor_grafico)
+
+        # Desplazamiento por las páginas de categorías (solo con "Paginar categorías")
+        self.scroll_categorias = QScrollBar(Qt.Orientation.Horizontal)
+        self.scroll_categorias.valueChanged.connect(self._pagina_cambiada)
+        self.scroll_categorias.hide()
+        self.graficos_layout.addWidget(self.scroll_categorias)
 
         # Agregar las pestañas al layout principal
         main_layout.addWidget(self.tabs)
+
+        # Tiempos por etapa de las últimas corridas (plegado al inicio)
+        self.panel_rendimiento = PanelRendimiento(self)
+        main_layout.addWidget(self.panel_rendimiento)
         
         self.setLayout(main_layout)
         
-        # Timer para actualización en tiempo real
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.actualizar_informacion)
+        # Actualización en tiempo real: un refresco a la vez, más espaciados si el servidor está lento
+        self.programador = ProgramadorRefresco(self.actualizar_informacion, parent=self)
+        self.programador.intervalo_cambiado.connect(self._intervalo_refresco_cambiado)
 
-        # Por último, cargamos la lista de operadores (aunque estén ocultos inicialmente)
-        self.load_operators_list()
+        # Si cambian los parámetros, la consulta en curso ya no sirve: se cancela en el servidor
+        for senial in (self.informe_selector.currentIndexChanged, self.fecha_inicio_input.dateChanged,
+                       self.fecha_fin_input.dateChanged, self.operator_combo.currentIndexChanged,
+                       self.letra_combo.currentIndexChanged):
+            senial.connect(self._parametros_cambiados)
+
+        # Menú oculto de desarrollo (perfilado): Ctrl+Shift+P
+        self.atajo_desarrollo = QShortcut(QKeySequence("Ctrl+Shift+P"), self)
+        self.atajo_desarrollo.activated.connect(self.menu_desarrollo)
+        self.perfil_guardado.connect(self._perfil_guardado)
+
+        # Por último, cargamos la lista de operadores (aunque estén ocultos inicialmente),
+        # después de mostrar la ventana: la consulta corre en segundo plano
+        QTimer.singleShot(0, self.load_operators_list)
 
     def load_operators_list(self):
         """
-        Carga la lista de operadores desde la vista v_personal_jub
-        y la asigna al combo de operadores.
+        Carga la lista de operadores de la vista v_personal_jub en el combo.
+        Primero se muestra la copia local de la última consulta (al instante)
+        y en segundo plano se consulta la base; si la lista cambió, se
+        reemplaza. Si el servidor no responde, queda la copia local.
         """
-        df_ops = fetch_operators_list()
-        if df_ops.empty:
+        copia = leer_copia_local()
+        if copia:
+            self._mostrar_operadores(copia)
+
+        worker = Worker(consultar_operadores)
+        worker.signals.finished.connect(self._operadores_consultados)
+        worker.signals.error.connect(lambda msg: print(f"No se pudo consultar la lista de operadores: {msg}"))
+        self._worker_operadores = worker
+        QThreadPool.globalInstance().start(worker)
+
+    def _operadores_consultados(self, operadores):
+        self._worker_operadores = None
+        if not operadores:
             print("No se pudo cargar la lista de operadores o está vacía.")
             return
-        
-        self.operator_combo.clear()
-        for index, row in df_ops.iterrows():
-            codigo = row['Codigo']
-            descripcion = row['descripcion']
-            # El segundo parámetro es 'userData', para obtenerlo con currentData().
-            self.operator_combo.addItem(descripcion, codigo)
+        if operadores != self._operadores:
+            self._mostrar_operadores(operadores)
+
+    def _mostrar_operadores(self, operadores):
+        """
+        Reemplaza los ítems del combo de una sola vez (un modelo nuevo en
+        lugar de un addItem por operador), conservando el operador elegido.
+        """
+        elegido = self.operator_combo.currentData()
+        modelo = QStandardItemModel(self.operator_combo)
+        # Mientras se cambia el modelo el combo pasa por otros operadores: sin avisar a nadie
+        # Primera opción: el informe de todos los operadores juntos, uno por hoja al exportar
+        todos = QStandardItem("Todos los operadores")
+        todos.setData(TODOS_LOS_OPERADORES, Qt.ItemDataRole.UserRole)
+        modelo.appendRow(todos)
+        for codigo, descripcion in operadores:
+            item = QStandardItem(descripcion)
+            # El código queda como 'userData', para obtenerlo con currentData()
+            item.setData(codigo, Qt.ItemDataRole.UserRole)
+            modelo.appendRow(item)
+        self.operator_combo.blockSignals(True)
+        try:
+            # El combo descarta solo el modelo anterior
+            self.operator_combo.setModel(modelo)
+            self._operadores = operadores
+            indice = self.operator_combo.findData(elegido) if elegido is not None else -1
+            # Sin elección previa, el primer operador (no "Todos", que lanza una consulta por operador)
+            self.operator_combo.setCurrentIndex(indice if indice >= 0 else min(1, modelo.rowCount() - 1))
+        finally:
+            self.operator_combo.blockSignals(False)
+        self.update_grafico_options()
+        self._parametros_cambiados()
+
+    def actualizar_informacion(self, al_terminar=None):
+        """
+        Actualiza los datos de la tabla y el gráfico en tiempo real (lo
+        llama el programador de refrescos). Los gráficos se redibujan cuando
+        llegan los datos nuevos. al_terminar(estado) se conecta a la señal
+        ended del Worker antes de arrancarlo. Devuelve el Worker del
+        refresco, o None si hay un informe generándose.
+        """
+        if self._worker is not None:
+            # Hay una consulta en curso: este refresco se saltea
+            return None
+        if self._refresco is not None and self._refresco.admite(self._parametros_actuales()):
+            # Mismo informe que el cargado: traer solo lo nuevo de hoy
+            return self._actualizar_incremental(al_terminar)
+        self._graficar_al_terminar = True
+        return self.generar_informe(al_terminar)
+
+    def _parametros_cambiados(self):
+        """
+        Cancela la consulta en curso si el formulario ya no pide lo mismo
+        (por ejemplo, si el usuario cambia las fechas mientras se genera).
+        """
+        if self._worker is None or self._parametros_en_curso == self._parametros_actuales():
+            return
+        print("Cambiaron los parámetros del informe: se cancela la consulta en curso.")
+        self.cancelar_informe()
+
+    def _parametros_actuales(self):
+        """
+        Parámetros del formulario: (informe_tipo, fecha_inicio, fecha_fin, codigo_operador, letra).
+        """
+        informe_tipo = self.informe_selector.currentText()
+        # Código y letra solo se usan en Informe de Operadores: en los demás
+        # van en None, así cambiar esos combos (ocultos) no cambia el informe
+        operadores = informe_tipo == "Informe de Operadores"
+        return (
+            informe_tipo,
+            self.fecha_inicio_input.date().toString('yyyy-MM-dd'),
+            self.fecha_fin_input.date().toString('yyyy-MM-dd'),
+            self.operator_combo.currentData() if operadores else None,
+            self.letra_combo.currentData() if operadores else None,
+        )
 
-    def actualizar_informacion(self):
+    def _actualizar_incremental(self, al_terminar=None):
+        """
+        Consulta desde el día de la marca de agua hasta hoy y agrega al
+        informe las filas posteriores a la marca. Devuelve el Worker, ya
+        arrancado.
+        """
+        informe_tipo, _, _, codigo_operador, letra = self._refresco.params
+        hoy = QDate.currentDate().toString('yyyy-MM-dd')
+        desde = self._refresco.desde(hoy)
+        corrida = trazas.Corrida('refresco', informe=informe_tipo, desde=desde, hasta=hoy)
+        with corrida.activa():
+            worker = Worker(self.obtener_datos, informe_tipo, desde, hoy, codigo_operador, letra, force_refresh=True)
+        worker.signals.finished.connect(lambda df, w=worker: self._novedades_listas(w, df))
+        worker.signals.error.connect(lambda msg, w=worker: self._informe_fallido(w, msg))
+        self._worker = worker
+        self._parametros_en_curso = self._refresco.params
+        self._corrida = corrida
+        self._filas_cargadas = 0
+        return self._arrancar(worker, al_terminar)
+
+    def _arrancar(self, worker, al_terminar=None):
+        """
+        Muestra el progreso y arranca worker. al_terminar(estado) se conecta
+        a su señal ended antes de arrancarlo, así no se pierde aunque el
+        trabajo termine enseguida.
+        """
+        if al_terminar is not None:
+            worker.signals.ended.connect(al_terminar)
+        self.progress_bar.show()
+        self.btn_cancelar.show()
+        QThreadPool.globalInstance().start(worker)
+        return worker
+
+    def _novedades_listas(self, worker, df_reciente):
         """
-        Actualiza los datos de la tabla y el gráfico en tiempo real.
+        Agrega las filas nuevas al informe, a la tabla y a los conteos,
+        y redibuja los gráficos solo si hubo novedades.
         """
-        self.generar_informe()
+        if worker is not self._worker:
+            return
+        corrida = self._corrida
+        self._terminar_trabajo()
+        if df_reciente is None or df_reciente.empty:
+            corrida.terminar(filas=0)
+            return
+        with corrida.activa():
+            with trazas.tramo('comparacion', filas=len(df_reciente)):
+                sin_cambios = self._refresco.sin_cambios(df_reciente)
+            if sin_cambios:
+                # Lo mismo que en el refresco anterior: no hay nada que tipar ni dibujar
+                corrida.terminar(filas=0, sin_cambios=True)
+                return
+            with trazas.tramo('tipado'):
+                nuevas = self._refresco.filas_nuevas(self.dataset.tipar(df_reciente))
+        if nuevas is None or nuevas.empty:
+            corrida.terminar(filas=0)
+            return
+        self._agregar_filas(corrida, nuevas)
+
+    def _agregar_filas(self, corrida, nuevas):
+        """
+        Agrega filas nuevas (con los tipos del informe) al informe, a la
+        tabla y a los conteos, y redibuja los gráficos.
+        """
+        with corrida.activa():
+            self.dataset = self.dataset.extender(nuevas)
+            self.df = self.dataset.df
+            with trazas.tramo('tabla', filas=len(nuevas)):
+                self._modelo_tabla().append_dataframe(nuevas)
+            with trazas.tramo('agregados'):
+                self._agregados = self._agregados.extender(self.dataset, nuevas)
+        corrida.terminar(filas=len(nuevas))
+        self.total_registros_label.setText(f"Total de registros: {len(self.df)}")
         self.mostrar_graficos()
 
-    def generar_informe(self):
+    # Consultas compartidas con el modo por línea de comandos (informes_cli.py)
+    obtener_datos = staticmethod(obtener_datos)
+    cargar_informe = staticmethod(cargar_informe)
+    cargar_cambios = staticmethod(cargar_cambios)
+
+    def generar_informe(self, al_terminar=None):
         """
         Genera el informe según el tipo seleccionado y las fechas ingresadas.
+        La consulta corre en un hilo aparte y las filas se agregan a la
+        tabla a medida que llegan los lotes. Devuelve el Worker, ya
+        arrancado (ver _arrancar para al_terminar).
+        """
+        parametros = self._parametros_actuales()
+        informe_tipo, fecha_inicio, fecha_fin, codigo_operador, letra = parametros
+
+        # Si había una consulta en curso, su resultado ya no interesa
+        if self._worker is not None:
+            self._worker.cancel()
+            self._corrida.terminar('reemplazado')
+
+        # Refresco en tiempo real del informe cargado: la tabla no se llena por
+        # lotes; el resultado se compara fila a fila y solo se muestra lo que cambió
+        comparar = self._graficar_al_terminar and parametros == self._parametros_cargados
+
+        corrida = trazas.Corrida('informe', informe=informe_tipo, desde=fecha_inicio, hasta=fecha_fin)
+        with corrida.activa():
+            if comparar:
+                worker = Worker(self.cargar_cambios, informe_tipo, fecha_inicio, fecha_fin, codigo_operador, letra,
+                                anterior=self.dataset, force_refresh=self.checkbox_forzar.isChecked())
+            else:
+                worker = Worker(self.cargar_informe, informe_tipo, fecha_inicio, fecha_fin, codigo_operador, letra,
+                                force_refresh=self.checkbox_forzar.isChecked())
+        if comparar:
+            worker.signals.finished.connect(lambda resultado, w=worker: self._cambios_listos(w, resultado))
+        else:
+            worker.kwargs['on_batch'] = worker.emit_batch
+            worker.signals.batch.connect(lambda lote, w=worker: self._lote_recibido(w, lote))
+            worker.signals.finished.connect(lambda dataset, w=worker: self._informe_listo(w, dataset))
+        worker.signals.error.connect(lambda msg, w=worker: self._informe_fallido(w, msg))
+        self._worker = worker
+        self._parametros_en_curso = parametros
+        self._corrida = corrida
+        self._filas_cargadas = 0
+        return self._arrancar(worker, al_terminar)
+
+    def cancelar_informe(self):
+        """
+        Cancela la generación en curso y deja la tabla como estaba.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            self._corrida.terminar('cancelado', filas=self._filas_cargadas)
+        self._terminar_trabajo()
+        self._graficar_al_terminar = False
+        self._restaurar_tabla()
+
+    def _restaurar_tabla(self):
+        """
+        Si se habían mostrado lotes parciales de una consulta que no llegó
+        a terminar, vuelve la tabla al informe anterior.
+        """
+        if self._filas_cargadas:
+            df_anterior = getattr(self, 'df', None)
+            self.table_model.set_dataframe(df_anterior)
+            total = 0 if df_anterior is None else len(df_anterior)
+            self.total_registros_label.setText(f"Total de registros: {total}")
+            self._filas_cargadas = 0
+
+    def _modelo_tabla(self):
         """
-        QApplication.setOverrideCursor(QCursor(Qt.CursorShape.WaitCursor))
+        Modelo de la tabla. Se crea al llegar el primer informe, así pandas
+        no se importa antes de mostrar la ventana.
+        """
+        if self.table_model is None:
+            from Modules.table_model import DataFrameModel
+            self.table_model = DataFrameModel(parent=self)
+            self.informe_table.setModel(self.table_model)
+        return self.table_model
+
+    def _terminar_trabajo(self):
+        self._worker = None
+        self._parametros_en_curso = None
+        self._corrida = None
+        self.progress_bar.hide()
+        self.btn_cancelar.hide()
+
+    def _informe_fallido(self, worker, mensaje):
+        if worker is not self._worker:
+            return
+        self._corrida.terminar('error', error=mensaje)
+        self._terminar_trabajo()
+        self._graficar_al_terminar = False
+        self._restaurar_tabla()
+        self.show_message_box("Error", f"Error al generar el informe: {mensaje}")
+
+    def _lote_recibido(self, worker, lote):
+        """
+        Agrega a la tabla un lote de filas recién leído y actualiza el contador.
+        """
+        if worker is not self._worker:
+            return
+        with self._corrida.activa(), trazas.tramo('tabla_lotes'):
+            if self._filas_cargadas == 0:
+                # Primer lote: reemplaza el informe anterior
+                self.informe_table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+                self._modelo_tabla().set_dataframe(lote)
+            else:
+                self._modelo_tabla().append_dataframe(lote)
+        self._filas_cargadas += len(lote)
+        self.total_registros_label.setText(f"Cargando... {self._filas_cargadas} registros")
+
+    def _informe_listo(self, worker, dataset):
+        """
+        Recibe el informe tipado en el hilo principal y llena la tabla.
+        """
+        if worker is not self._worker:
+            # Resultado de una consulta cancelada o reemplazada
+            return
+        corrida = self._corrida
+        self._terminar_trabajo()
+
+        graficar = self._graficar_al_terminar
+        self._graficar_al_terminar = False
 
-        fecha_inicio = self.fecha_inicio_input.date().toString('yyyy-MM-dd')
-        fecha_fin = self.fecha_fin_input.date().toString('yyyy-MM-dd')
-        informe_tipo = self.informe_selector.currentText()
-        
         try:
-            # Definimos la lógica para cada tipo de informe
-            if informe_tipo == "Informe de Altas":
-                procedure_name = "Will_ObtenerDatosParaInforme2024V3"
-                self.df = fetch_data_from_database(fecha_inicio, fecha_fin, procedure_name)
-
-            elif informe_tipo == "Informe por Categoria":
-                procedure_name = "Will_ObtenerDatosParaInforme2024V4"
-                self.df = fetch_data_from_database(fecha_inicio, fecha_fin, procedure_name)
-
-            elif informe_tipo == "Novedades de Beneficios":
-                procedure_name = "Will_novedades_altasv1"
-                self.df = fetch_data_from_database(fecha_inicio, fecha_fin, procedure_name)
-
-            elif informe_tipo == "Informe de Operadores":
-                # Tomamos el código y la letra seleccionada
-                codigo_operador = self.operator_combo.currentData()
-                letra = self.letra_combo.currentData()
-                # Llamamos al procedimiento para Informe de Operadores
-                self.df = fetch_data_operadores(fecha_inicio, fecha_fin, codigo_operador, letra)
-
-            QApplication.restoreOverrideCursor()
-
-            if self.df is None or self.df.empty:
-                self.show_message_box("Información", "No se encontraron datos para las fechas seleccionadas.")
+            self.dataset = dataset
+            self.df = dataset.df
+            self._parametros_cargados = None
+            if self.df.empty:
+                corrida.terminar(filas=0)
+                # La tabla no puede seguir mostrando el informe anterior (ni lotes sueltos)
+                if self.table_model is not None:
+                    self.table_model.set_dataframe(self.df)
+                self._filas_cargadas = 0
+                self._refresco = None
                 self.total_registros_label.setText("Total de registros: 0")
+                if not self._avisar_operadores_con_error(dialogo=not graficar) and not graficar:
+                    self.show_message_box("Información", "No se encontraron datos para las fechas seleccionadas.")
                 return
-            
-            # Limpiar tabla y recargar
-            self.informe_table.setRowCount(0)
-            self.informe_table.setColumnCount(0)
-
-            self.informe_table.setSortingEnabled(False)
-            self.informe_table.clearContents()
-            self.informe_table.setRowCount(len(self.df))
-            self.informe_table.setColumnCount(len(self.df.columns))
-            self.informe_table.setHorizontalHeaderLabels(self.df.columns)
-            
-            for i, row in self.df.iterrows():
-                for j, cell in enumerate(row):
-                    self.informe_table.setItem(i, j, QTableWidgetItem(str(cell)))
-
-            self.informe_table.setSortingEnabled(True)
+
+            # Las filas ya se mostraron por lotes: el modelo pasa a leer del DataFrame final
+            with corrida.activa(), trazas.tramo('tabla', filas=len(self.df)):
+                self._modelo_tabla().consolidate(self.df)
+
+            # Punto de partida para los refrescos incrementales
+            if self._refresco is None:
+                from Modules.incremental import RefrescoIncremental
+                self._refresco = RefrescoIncremental()
+            self._refresco.iniciar(tuple(worker.args), self.df)
+            from Modules.aggregations import AggregationCache
+            self._agregados = AggregationCache(self.dataset)
+            self._informe_cargado = worker.args[0]
+            self._parametros_cargados = tuple(worker.args)
 
             # Actualizar el total de registros
             self.total_registros_label.setText(f"Total de registros: {len(self.df)}")
+            corrida.terminar(filas=len(self.df))
+            self._avisar_operadores_con_error(dialogo=not graficar)
 
         except Exception as e:
-            QApplication.restoreOverrideCursor()
+            corrida.terminar('error', error=str(e))
             self.show_message_box("Error", f"Error al generar el informe: {str(e)}")
+            return
+
+        if graficar:
+            self.mostrar_graficos()
     
+    def _avisar_operadores_con_error(self, dialogo=True):
+        """
+        Avisa qué operadores faltan en el informe de todos los operadores
+        porque su consulta falló: en el total de registros y, con dialogo,
+        en una ventana. Devuelve True si hubo alguno.
+        """
+        con_error = operadores_con_error(self.df)
+        if not con_error:
+            return False
+        self.total_registros_label.setText(
+            f"Total de registros: {len(self.df)} ({len(con_error)} operadores con error)")
+        if not dialogo:
+            return True
+        detalle = "\n".join(f"{codigo} - {nombre}: {error}" for codigo, nombre, error in con_error[:20])
+        if len(con_error) > 20:
+            detalle += f"\n... y {len(con_error) - 20} más"
+        self.show_message_box(
+            "Advertencia",
+            f"No se pudieron obtener los datos de {len(con_error)} operadores; "
+            f"no están en el informe (al exportar a Excel se listan en una hoja aparte):\n{detalle}")
+        return True
+
+    def _cambios_listos(self, worker, resultado):
+        """
+        Recibe el informe refrescado ya comparado con el cargado: si no
+        cambió, no se toca nada; si solo tiene filas nuevas, se agregan;
+        si cambió otra cosa, se muestra entero.
+        """
+        if worker is not self._worker:
+            return
+        dataset, nuevas = resultado
+        if nuevas is None:
+            self._informe_listo(worker, dataset)
+            return
+        corrida = self._corrida
+        self._terminar_trabajo()
+        self._graficar_al_terminar = False
+        if nuevas.empty:
+            corrida.terminar(filas=0, sin_cambios=True)
+            return
+        self._agregar_filas(corrida, nuevas)
+        # Con las filas agregadas el informe tiene las mismas filas que la consulta
+        self.dataset.huella_cruda = dataset.huella_cruda
+
     def guardar_en_excel(self):
         """
-        Guarda el informe actual en un archivo Excel,
-        usando un nombre sugerido basado en el tipo de informe y rango de fechas.
+        Guarda el informe actual en Excel, CSV o Parquet, usando un nombre
+        sugerido basado en el tipo de informe y rango de fechas.
+        El archivo se escribe en segundo plano, sin bloquear la ventana.
         """
         if not hasattr(self, 'df') or self.df.empty:
             self.show_message_box("Error", "Primero debe generar un informe.")
             return
+        if self._worker_exportacion is not None:
+            self.show_message_box("Información", "Ya hay una exportación en curso.")
+            return
 
-        # Obtener el tipo de informe y formatear las fechas
-        informe_tipo = self.informe_selector.currentText().replace(' ', '_')  # opcional: reemplaza espacios
-        fecha_inicio_str = self.fecha_inicio_input.date().toString("yyyyMMdd")
-        fecha_fin_str = self.fecha_fin_input.date().toString("yyyyMMdd")
-
-        # Construir un nombre sugerido
-        proposed_filename = f"{informe_tipo}_{fecha_inicio_str}_al_{fecha_fin_str}.xlsx"
+        # Construir un nombre sugerido con el tipo de informe y las fechas
+        informe_tipo, fecha_inicio, fecha_fin, _, _ = self._parametros_actuales()
+        proposed_filename = nombre_sugerido(informe_tipo, fecha_inicio, fecha_fin) + ".xlsx"
 
         # Desplegar el cuadro de diálogo con el nombre sugerido
-        file_path, _ = QFileDialog.getSaveFileName(
+        file_path, filtro = QFileDialog.getSaveFileName(
             self,
-            "Guardar Informe en Excel",
+            "Guardar Informe",
             proposed_filename,   # Nombre sugerido
-            "Excel Files (*.xlsx);;All Files (*)"
+            ";;".join(FORMATOS.values())
         )
         if not file_path:  # El usuario canceló el diálogo
             return
+        if os.path.splitext(file_path)[1].lower() not in FORMATOS:
+            # Sin extensión conocida: se usa la del formato elegido en el diálogo
+            extension = next((ext for ext, nombre in FORMATOS.items() if nombre == filtro), '.xlsx')
+            file_path += extension
+
+        # El informe completo y, en Excel, una hoja por cada agregado ya calculado.
+        # El dataset no se modifica, así que se puede leer desde otro hilo.
+        corrida = trazas.Corrida('exportacion', informe=self._informe_cargado,
+                                 archivo=os.path.basename(file_path), filas=len(self.df))
+        with corrida.activa():
+            worker = Worker(exportar_informe, file_path, self.df, self._agregados, self._informe_cargado)
+        worker.kwargs['on_progress'] = worker.emit_progress
+        worker.signals.progress.connect(self._exportacion_avanzo)
+        worker.signals.finished.connect(self._exportacion_lista)
+        worker.signals.error.connect(self._exportacion_fallida)
+        self._worker_exportacion = worker
+        self._corrida_exportacion = corrida
+        self.progress_exportacion.setRange(0, len(self.df))
+        self.progress_exportacion.setValue(0)
+        self.progress_exportacion.show()
+        self.btn_guardar.setEnabled(False)
+        QThreadPool.globalInstance().start(worker)
+
+    def _exportacion_avanzo(self, hechas, total):
+        self.progress_exportacion.setMaximum(max(total, 1))
+        self.progress_exportacion.setValue(hechas)
+
+    def _terminar_exportacion(self):
+        self._worker_exportacion = None
+        self._corrida_exportacion = None
+        self.progress_exportacion.hide()
+        self.btn_guardar.setEnabled(True)
+
+    def _exportacion_lista(self, file_path):
+        self._corrida_exportacion.terminar()
+        self._terminar_exportacion()
+        self.show_message_box("Éxito", f"Informe guardado en: {file_path}")
+
+    def _exportacion_fallida(self, mensaje):
+        self._corrida_exportacion.terminar('error', error=mensaje)
+        self._terminar_exportacion()
+        self.show_message_box("Error", f"Error al guardar el informe: {mensaje}")
 
-        # Guardar en Excel
-        try:
-            self.df.to_excel(file_path, index=False)  # Requiere openpyxl instalado
-            self.show_message_box("Éxito", f"Informe guardado en: {file_path}")
-        except Exception as e:
-            self.show_message_box("Error", f"Error al guardar el informe: {str(e)}")
-
-    
     def mostrar_graficos(self):
         """
         Muestra gráficos según el tipo de informe y gráfico seleccionados.
@@ -330,313 +780,145 @@ class InformeApp(QWidget):
         if not hasattr(self, 'df') or self.df.empty:
             self.show_message_box("Error", "Primero debe generar un informe para mostrar gráficos.")
             return
-        
-        self.canvas.figure.clear()
-        # Dibujamos al final, después de crear las gráficas
-        tipo_grafico = self.combo_tipo_grafico.currentText()
-        informe_tipo = self.informe_selector.currentText()
-        
+
+        self._grafico_pedido = (self.informe_selector.currentText(), self.combo_tipo_grafico.currentText())
+        self._pedir_grafico()
+
+    def _pedir_grafico(self):
+        """
+        Muestra el gráfico pedido desde la caché o lo manda a dibujar en un
+        hilo del pool; la ventana sigue respondiendo mientras tanto.
+        """
+        informe_tipo, tipo_grafico = self._grafico_pedido
+
+        if self._graficos_version != self._agregados.version:
+            self._graficos.clear()
+            self._graficos_version = self._agregados.version
+        ancho, alto = self.visor_grafico.tamanio_fisico()
+        vista = self._vista_actual(informe_tipo, tipo_grafico)
+        clave = (self._agregados.version, informe_tipo, tipo_grafico, (ancho, alto), tuple(sorted(vista.items())))
+
+        # Si ya se dibujó este gráfico para estos datos y este tamaño, se muestra su imagen
+        guardado = self._graficos.get(clave)
+        if guardado is not None:
+            corrida = trazas.Corrida('grafico', informe=informe_tipo, grafico=tipo_grafico, desde_cache=True)
+            with corrida.activa(), trazas.tramo('mostrar'):
+                self._mostrar_grafico(clave, *guardado)
+            corrida.terminar()
+            return
+
+        # Mismo gráfico y tamaño con datos anteriores (refresco): se actualiza en el lugar
+        anterior = None
+        if self._clave_actual is not None and self._clave_actual[1:] == clave[1:]:
+            anterior = self._grafico_actual
+
+        if self._worker_grafico is not None:
+            self._worker_grafico.cancel()
+            self._corrida_grafico.terminar('reemplazado')
+        corrida = trazas.Corrida('grafico', informe=informe_tipo, grafico=tipo_grafico, desde_cache=False)
+        with corrida.activa():
+            worker = Worker(self.dibujar_grafico, informe_tipo, tipo_grafico, self._agregados,
+                            ancho, alto, self.visor_grafico.dpi(), anterior, vista)
+        worker.signals.finished.connect(lambda resultado, w=worker, c=clave: self._grafico_listo(w, c, resultado))
+        worker.signals.error.connect(lambda msg, w=worker: self._grafico_fallido(w, msg))
+        self._worker_grafico = worker
+        self._corrida_grafico = corrida
+        QThreadPool.globalInstance().start(worker)
+
+    @staticmethod
+    def dibujar_grafico(*args):
+        """
+        Arma y rasteriza el gráfico (en el hilo del pool). matplotlib se
+        importa aquí, con el primer gráfico, fuera del hilo de la interfaz.
+        """
+        from Modules.graficos import renderizar_grafico
+
         try:
-            if informe_tipo == "Informe de Altas" and tipo_grafico in [
-                "Gráfico de Expedientes", 
-                "Gráfico de Operadores", 
-                "Gráfico de Actividad", 
-                "Gráfico Actividad por Área",
-                "Mostrar Todos"
-            ]:
-                
-                def func(pct, allvalues):
-                    absolute = int(np.round(pct / 100. * np.sum(allvalues)))
-                    return "{:d}\n({:.1f}%)".format(absolute, pct)
-        
-                # Implementación de gráficos para "Informe de Altas"
-                if tipo_grafico == "Gráfico de Expedientes":
-                    ax = self.canvas.figure.add_subplot(111)
-                    letras_count = self.df['letra'].value_counts()
-                    colores = ['#ff9999', '#66b3ff', '#99ff99', '#ffcc99', '#c2c2f0']
-                    wedges, texts, autotexts = ax.pie(
-                        letras_count.values,
-                        labels=letras_count.index,
-                        autopct=lambda pct: func(pct, letras_count.values),
-                        startangle=90,
-                        colors=colores,
-                        wedgeprops={'linewidth':1, 'edgecolor': 'white'},
-                        textprops={'color':'black', 'fontsize':10}
-                    )
-                    ax.set_title('Distribución por Letra de Expediente',  fontsize= 12, fontweight='bold')
-                    for autotext in autotexts:
-                        autotext.set_color('black')
-                        autotext.set_fontsize(10)
-                        autotext.set_fontweight('bold')
-
-                    centro_circulo = plt.Circle((0,0),0.70, fc='white')
-                    ax.add_artist(centro_circulo)
-                    ax.axis('equal')
-                    self.canvas.figure.tight_layout()
-
-                elif tipo_grafico == "Gráfico de Operadores":
-                    ax = self.canvas.figure.add_subplot(111)
-                    self.df['Operador'] = self.df['Operador'].str.strip()
-                    operadores_count = self.df['Operador'].value_counts()
-                    cmap = plt.get_cmap('Pastel2')
-                    norm = plt.Normalize(operadores_count.min(), operadores_count.max())
-
-                    bars = []
-                    for i, (Operador, valor) in enumerate(operadores_count.items()):
-                        color = cmap(0.2 + 0.8 * norm(valor))
-                        bar = FancyBboxPatch(
-                            (i  - 0.4, 0), 0.8, valor,
-                            boxstyle="round, pad=0.3",
-                            linewidth=2,
-                            edgecolor='white',
-                            facecolor=color
-                        )
-                        ax.add_patch(bar)
-                        bars.append(bar)
-
-                    ax.set_facecolor('#f0f0f0')
-                    ax.set_xlim(-0.5, len(operadores_count) -0.5)
-                    ax.set_ylim(0, operadores_count.max() + 2)
-                    ax.set_title('Actuaciones por Operador', fontsize=12, fontweight='bold')
-                    ax.set_xlabel('Operador', fontsize=12)
-                    ax.set_ylabel('Cantidad de Actuaciones', fontsize=12)
-
-                    ax.set_xticks(range(len(operadores_count.index)))
-                    ax.set_xticklabels(operadores_count.index, rotation=45, ha='right', fontsize=8)
-
-                    for i, bar in enumerate(bars):
-                        yval = operadores_count.values[i]
-                        ax.text(i, yval + 0.3, int(yval), ha='center', fontsize=10)
-
-                    self.canvas.figure.tight_layout()
-                    self.canvas.draw()
-
-                elif tipo_grafico == "Gráfico de Actividad":
-                    ax = self.canvas.figure.add_subplot(111)
-                    self.df['fech_alta'] = pd.to_datetime(self.df['fech_alta'], format='%d-%m-%Y %H:%M', errors='coerce', dayfirst=True)
-                    self.df = self.df.dropna(subset=['fech_alta'])
-                    self.df['hora_alta'] = self.df['fech_alta'].dt.hour
-                    horas_count = self.df['hora_alta'].value_counts().sort_index()
-
-                    ax.plot(horas_count.index, horas_count.values, marker='o', linestyle='--', color='blue', markersize=8, markerfacecolor='red')
-                    ax.set_title('Actividad por Hora', fontsize=16, color='darkgreen')
-                    ax.set_xlabel('Hora del Día', fontsize=12, color='darkblue')
-                    ax.set_ylabel('Cantidad de Actuaciones', fontsize=12, color='darkblue')
-
-                    for x, y in zip(horas_count.index, horas_count.values):
-                        if y == horas_count.max():
-                            ax.text(x, y + 2, str(y), fontsize=10, color='black', ha='center', fontweight='bold')
-                        else:
-                            ax.text(x, y - 2, str(y), fontsize=10, color='black', ha='center', fontweight='bold')
-
-                    ax.set_xlim(horas_count.index.min() - 1, horas_count.index.max() + 1)
-                    ax.set_ylim(0, horas_count.values.max() + 5)
-                    ax.spines['top'].set_visible(False)
-                    ax.spines['right'].set_visible(False)
-                    ax.spines['bottom'].set_color('gray')
-                    ax.spines['left'].set_color('gray')
-                    ax.tick_params(axis='x', colors='purple', labelsize=10)
-                    ax.tick_params(axis='y', colors='purple', labelsize=10)
-                    self.canvas.draw()
-
-                elif tipo_grafico == "Gráfico Actividad por Área":
-                    ax = self.canvas.figure.add_subplot(111)
-                    descripcion_count = self.df['Descripcion'].value_counts()
-                    cmap = plt.get_cmap('viridis')
-                    norm = plt.Normalize(descripcion_count.min(), descripcion_count.max())
-
-                    bars = []
-                    for i, (descripcion, valor) in enumerate(descripcion_count.items()):
-                        color = cmap(0.2 + 0.8 * norm(valor))
-                        bar = FancyBboxPatch(
-                            (i - 0.4, 0), 0.8, valor,
-                            boxstyle="round,pad=0.3", linewidth=1, edgecolor='white', facecolor=color
-                        )
-                        ax.add_patch(bar)
-                        bars.append(bar)
-
-                    ax.set_facecolor('#f0f0f0')
-                    ax.set_xlim(-0.5, len(descripcion_count) - 0.5)
-                    ax.set_ylim(0, descripcion_count.max() + 2)
-                    ax.set_title('Distribución de Actividad por Descripción', fontsize=12, fontweight='bold')
-                    ax.set_xlabel('Descripción', fontsize=12)
-                    ax.set_ylabel('Cantidad', fontsize=12)
-                    ax.set_xticks(range(len(descripcion_count.index)))
-                    ax.set_xticklabels(descripcion_count.index, rotation=45, ha='right', fontsize=8)
-
-                    for i, bar in enumerate(bars):
-                        yval = descripcion_count.values[i]
-                        ax.text(i, yval + 0.3, int(yval), ha='center', fontsize=9)
-
-                    self.canvas.figure.tight_layout()
-                    self.canvas.draw()
-
-                elif tipo_grafico == "Mostrar Todos":
-                    self.canvas.figure.clear()
-                    axs = self.canvas.figure.subplots(2, 2)
-                    
-                    # Gráfico de Expedientes
-                    letras_count = self.df['letra'].value_counts()
-                    bars = axs[0, 0].bar(letras_count.index, letras_count.values)
-                    axs[0, 0].set_title('Distribución por Tipo de Letra')
-                    for bar in bars:
-                        yval = bar.get_height()
-                        axs[0, 0].text(bar.get_x() + bar.get_width()/2, yval + 1, int(yval), ha='center', fontsize=9)
-                    
-                    # Gráfico de Operadores
-                    operadores_count = self.df['Operador'].value_counts()
-                    bars = axs[0, 1].bar(operadores_count.index, operadores_count.values)
-                    axs[0, 1].set_title('Actuaciones por Operador')
-                    axs[0, 1].set_xlabel('Operador')
-                    axs[0, 1].set_ylabel('Cantidad de Actuaciones')
-                    axs[0, 1].tick_params(axis='x', rotation=45, labelsize=8)
-                    for bar in bars:
-                        yval = bar.get_height()
-                        axs[0, 1].text(bar.get_x() + bar.get_width()/2, yval + 1, int(yval), ha='center', fontsize=9)
-                    
-                    # Gráfico de Actividad por Hora
-                    self.df['hora_alta'] = pd.to_datetime(self.df['fech_alta'], errors='coerce', dayfirst=True).dt.hour
-                    horas_count = self.df['hora_alta'].value_counts().sort_index()
-                    axs[1, 0].plot(horas_count.index, horas_count.values, marker='o')
-                    axs[1, 0].set_title('Actividad por Hora')
-                    axs[1, 0].set_xlabel('Hora del Día')
-                    axs[1, 0].set_ylabel('Cantidad de Actuaciones')
-                    for x, y in zip(horas_count.index, horas_count.values):
-                        axs[1, 0].text(x, y, str(y), fontsize=9, ha='center')
-                    
-                    # Gráfico Actividad por Descripción
-                    descripcion_count = self.df['Descripcion'].value_counts()
-                    bars = axs[1, 1].bar(descripcion_count.index, descripcion_count.values)
-                    axs[1, 1].set_title('Distribución de Actividad por Descripción')
-                    axs[1, 1].set_xlabel('Descripción')
-                    axs[1, 1].set_ylabel('Cantidad')
-                    axs[1, 1].tick_params(axis='x', rotation=45, labelsize=8)
-                    for bar in bars:
-                        yval = bar.get_height()
-                        axs[1, 1].text(bar.get_x() + bar.get_width()/2, yval + 1, int(yval), ha='center', fontsize=9)
-                    
-                    self.canvas.figure.tight_layout()
-            
-            elif informe_tipo == "Informe por Categoria" and tipo_grafico in [
-                "Gráfico de Barras por Categoría",
-                "Gráfico Circular por Tipo",
-                "Mostrar Todos"
-            ]:
-                # Implementación de gráficos para "Informe por Categoria"
-                if tipo_grafico == "Gráfico de Barras por Categoría":
-                    ax = self.canvas.figure.add_subplot(111)
-                    self.df['Categoria'] = self.df['Categoria'].str.strip()
-                    categoria_count = self.df.groupby('Categoria')['Conteo'].sum().sort_values(ascending=False)
-
-                    cmap = plt.get_cmap('viridis')
-                    norm = plt.Normalize(categoria_count.min(), categoria_count.max())
-
-                    bars = []
-                    for i, (categoria, valor) in enumerate(categoria_count.items()):
-                        color = cmap(0.2 + 0.8 * norm(valor))
-                        bar = FancyBboxPatch(
-                            (i - 0.4, 0), 0.8, valor,
-                            boxstyle="round,pad=0.3", linewidth=1, edgecolor="white", facecolor= color
-                        )
-                        ax.add_patch(bar)
-                        bars.append(bar)
-
-                    ax.set_facecolor('#f0f0f0')
-                    ax.set_xlim(-0.5, len(categoria_count) - 0.5)
-                    ax.set_ylim(0, categoria_count.max() + 2)
-                    ax.set_title('Totales por Categoría', fontsize=16, fontweight='bold')
-                    ax.set_xlabel('Categoría', fontsize=12, labelpad=20)
-                    ax.set_ylabel('Cantidad total en el periodo', fontsize=12)
-
-                    ax.set_xticks(range(len(categoria_count.index)))
-                    ax.set_xticklabels(categoria_count.index, rotation=60, ha='right', fontsize=8, rotation_mode='anchor')
-
-                    for i, bar in enumerate(bars):
-                        yval = categoria_count.values[i]
-                        ax.text(i, yval + 0.5, int(yval), ha='center', fontsize=9)
-                        
-                    self.canvas.figure.tight_layout()
-                    plt.subplots_adjust(bottom=0.2)
-                    self.canvas.draw()
-                        
-                
-                elif tipo_grafico == "Gráfico Circular por Tipo":
-                    ax = self.canvas.figure.add_subplot(111)
-                    tipo_count = self.df['Tipo'].value_counts()
-                    ax.pie(tipo_count, labels=tipo_count.index, autopct='%1.1f%%')
-                    ax.set_title('Distribución por Tipo')
-                
-                elif tipo_grafico == "Mostrar Todos":
-                    self.canvas.figure.clear()
-                    axs = self.canvas.figure.subplots(1, 2)
-                    
-                    categoria_count = self.df.groupby('Categoria')['Conteo'].sum().sort_values(ascending=False)
-                    bars = axs[0].bar(categoria_count.index, categoria_count.values, width=0.6)
-                    axs[0].set_title('Totales por Categoría', fontsize=14)
-                    axs[0].set_xlabel('Categoría', fontsize=12)
-                    axs[0].set_ylabel('Cantidad total en el periodo', fontsize=12)
-                    axs[0].set_xticks(range(len(categoria_count.index)))
-                    axs[0].set_xticklabels(categoria_count.index, rotation=45, ha='right', fontsize=8)
-                    max_conteo = categoria_count.max()
-                    axs[0].yaxis.set_major_locator(MaxNLocator(integer=True, nbins=10))
-                    axs[0].set_ylim(0, max_conteo + 10)
-                    for bar in bars:
-                        yval = bar.get_height()
-                        axs[0].text(bar.get_x() + bar.get_width()/2, yval + 1, int(yval), ha='center', fontsize=9)
-
-                    tipo_count = self.df['Tipo'].value_counts()
-                    axs[1].pie(tipo_count, labels=tipo_count.index, autopct='%1.1f%%', startangle=90, labeldistance=1.1)
-                    axs[1].set_title('Distribución por Tipo')
-                    
-                    self.canvas.figure.tight_layout()
-
-            elif informe_tipo == "Novedades de Beneficios" and tipo_grafico == "Gráfico de Altas por Mes":
-                ax = self.canvas.figure.add_subplot(111)
-                altas_por_mes = self.df.groupby(['Anio', 'Mes']).size().reset_index(name='Cantidad')
-                altas_por_mes['Periodo'] = altas_por_mes['Anio'].astype(str) + '-' + altas_por_mes['Mes'].astype(str)
-
-                norm = plt.Normalize(altas_por_mes['Cantidad'].min(), altas_por_mes['Cantidad'].max())
-                cmap = plt.cm.plasma
-
-                bars = ax.bar(
-                    altas_por_mes['Periodo'], 
-                    altas_por_mes['Cantidad'], 
-                    color=cmap(norm(altas_por_mes['Cantidad'])), 
-                    edgecolor='black', 
-                    linewidth=1.2
-                )
-                ax.set_title('Cantidad de Altas por Mes', fontsize=16, weight='bold', family='Verdana', color='#333333')
-                ax.set_xlabel('Mes', fontsize=12, family='Verdana', color='#333333')
-                ax.set_ylabel('Cantidad de Altas', fontsize=12, family='Verdana', color='#333333')
-
-                for bar in bars:
-                     yval = bar.get_height()
-                     ax.text(bar.get_x() + bar.get_width()/2, yval + 1, int(yval), ha='center', fontsize=9)
-
-                sm = plt.cm.ScalarMappable(cmap=cmap, norm=norm)
-                sm.set_array([])
-                cbar = plt.colorbar(sm, ax=ax)
-                cbar.set_label('Cantidad', fontsize=12, family='Verdana')
-
-                self.canvas.figure.tight_layout()
-
-            # (Si algún día agregas gráficos a "Informe de Operadores", puedes ponerlos aquí)
-
-            self.canvas.draw()
-        
+            return renderizar_grafico(*args)
         except KeyError as e:
-            self.show_message_box("Error", f"Error al generar el gráfico: Columna no encontrada - {str(e)}")
-        except Exception as e:
-            self.show_message_box("Error", f"Error al generar el gráfico: {str(e)}")
+            raise ValueError(f"Columna no encontrada - {str(e)}") from e
+
+    def _grafico_listo(self, worker, clave, resultado):
+        if worker is not self._worker_grafico:
+            # Gráfico reemplazado por otro pedido
+            return
+        corrida = self._corrida_grafico
+        self._worker_grafico = None
+        self._corrida_grafico = None
+        if clave[0] == self._graficos_version:
+            self._graficos.put(clave, *resultado)
+        with corrida.activa(), trazas.tramo('mostrar'):
+            self._mostrar_grafico(clave, *resultado)
+        corrida.terminar()
+
+    def _grafico_fallido(self, worker, mensaje):
+        if worker is not self._worker_grafico:
+            return
+        self._corrida_grafico.terminar('error', error=mensaje)
+        self._worker_grafico = None
+        self._corrida_grafico = None
+        self.show_message_box("Error", f"Error al generar el gráfico: {mensaje}")
+
+    def _mostrar_grafico(self, clave, grafico, imagen):
+        self._grafico_actual = grafico
+        self._clave_actual = clave
+        self.visor_grafico.set_imagen(imagen)
+
+        # La barra de desplazamiento recorre las categorías que no entran en la página
+        paginado = self.checkbox_paginar.isChecked() and grafico.categorias is not None
+        if paginado and grafico.categorias > VENTANA_CATEGORIAS:
+            self.scroll_categorias.blockSignals(True)
+            self.scroll_categorias.setRange(0, grafico.categorias - VENTANA_CATEGORIAS)
+            self.scroll_categorias.setPageStep(VENTANA_CATEGORIAS)
+            self.scroll_categorias.blockSignals(False)
+            self.scroll_categorias.show()
+        else:
+            self.scroll_categorias.hide()
+
+    def _vista_actual(self, informe_tipo, tipo_grafico):
+        """
+        Top N y página de categorías que se aplican al gráfico (ver AggregationCache.vista).
+        """
+        if (informe_tipo, tipo_grafico) in GRAFICOS_POR_CATEGORIA:
+            vista = {'top_n': self.spin_top_n.value()}
+            if self.checkbox_paginar.isChecked():
+                vista.update(inicio=self.scroll_categorias.value(), ventana=VENTANA_CATEGORIAS)
+            return vista
+        if tipo_grafico == "Mostrar Todos":
+            return {'top_n': self.spin_top_n.value()}
+        return {}
+
+    def _vista_cambiada(self):
+        # Cambió el top N o el paginado: se vuelve a la primera página
+        self.scroll_categorias.blockSignals(True)
+        self.scroll_categorias.setValue(0)
+        self.scroll_categorias.blockSignals(False)
+        self._redibujar_grafico()
+
+    def _pagina_cambiada(self):
+        self._redibujar_grafico()
+
+    def _redibujar_grafico(self):
+        # Se vuelve a dibujar el último gráfico pedido (con otro tamaño o vista)
+        if self._grafico_pedido is not None and hasattr(self, 'df') and not self.df.empty:
+            self._pedir_grafico()
 
     def exportar_grafico(self):
         """
-        Exporta el gráfico actual a un archivo PNG.
+        Exporta el gráfico actual a PNG (en alta resolución), SVG o PDF.
         """
-        file_path, _ = QFileDialog.getSaveFileName(self, "Exportar Gráfico", "", "PNG Files (*.png);;All Files (*)")
+        if self._grafico_actual is None:
+            self.show_message_box("Error", "Primero debe generar un gráfico para exportarlo.")
+            return
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Exportar Gráfico", "",
+            "PNG Files (*.png);;SVG Files (*.svg);;PDF Files (*.pdf);;All Files (*)"
+        )
         if file_path:
             try:
-                self.canvas.figure.savefig(file_path)
+                # La figura ya está armada: solo se vuelve a dibujar en el formato pedido
+                with self._grafico_actual.lock:
+                    self._grafico_actual.figura.savefig(file_path, dpi=DPI_EXPORTACION)
                 self.show_message_box("Éxito", f"Gráfico exportado en: {file_path}")
             except Exception as e:
                 self.show_message_box("Error", f"Error al exportar el gráfico: {str(e)}")
@@ -645,10 +927,17 @@ class InformeApp(QWidget):
         """
         Activa o desactiva la actualización automática de datos y gráficos.
         """
-        if state == Qt.CheckState.Checked:
-            self.timer.start(60000)  # Actualiza cada 60 segundos (1 minuto)
+        # stateChanged entrega un int, que no es igual al enum de PyQt6
+        if Qt.CheckState(state) == Qt.CheckState.Checked:
+            self.programador.iniciar()
         else:
-            self.timer.stop()
+            self.programador.detener()
+
+    def _intervalo_refresco_cambiado(self, segundos):
+        lento = segundos > self.programador.intervalo
+        self.checkbox_actualizar.setToolTip(
+            f"El servidor está lento: se actualiza cada {segundos} s" if lento else ""
+        )
     
     def update_grafico_options(self):
         """
@@ -659,40 +948,50 @@ class InformeApp(QWidget):
         informe_tipo = self.informe_selector.currentText()
         self.combo_tipo_grafico.clear()
 
-        # Si es "Informe de Operadores", mostramos combos y agregamos una opción de gráfico (si quisieras)
-        if informe_tipo == "Informe de Operadores":
-            self.operator_label.show()
-            self.operator_combo.show()
-            self.letra_label.show()
-            self.letra_combo.show()
-            # Podrías añadir un gráfico para este informe, si lo deseas
-            # self.combo_tipo_grafico.addItem("Gráfico Operadores - Ejemplo")
-        else:
-            # En cualquier otro informe, ocultamos los combos
-            self.operator_label.hide()
-            self.operator_combo.hide()
-            self.letra_label.hide()
-            self.letra_combo.hide()
-
-            # Y cargamos las opciones de gráfico habituales
-            if informe_tipo == "Informe de Altas":
-                self.combo_tipo_grafico.addItems([
-                    "Gráfico de Expedientes", 
-                    "Gráfico de Operadores", 
-                    "Gráfico de Actividad", 
-                    "Gráfico Actividad por Área",
-                    "Mostrar Todos"
-                ])
-            elif informe_tipo == "Informe por Categoria":
-                self.combo_tipo_grafico.addItems([
-                    "Gráfico de Barras por Categoría",
-                    "Gráfico Circular por Tipo",
-                    "Mostrar Todos"
-                ])
-            elif informe_tipo == "Novedades de Beneficios":
-                self.combo_tipo_grafico.addItems([
-                    "Gráfico de Altas por Mes"
-                ])
+        # Si es "Informe de Operadores", mostramos los combos de operador y letra
+        visibles = informe_tipo == "Informe de Operadores"
+        for widget in (self.operator_label, self.operator_combo, self.letra_label, self.letra_combo):
+            widget.setVisible(visibles)
+
+        # Y cargamos las opciones de gráfico del informe
+        self.combo_tipo_grafico.addItems(graficos_disponibles(informe_tipo, self.operator_combo.currentData()))
+
+    def menu_desarrollo(self):
+        """
+        Menú oculto para perfilar una acción en el puesto del usuario,
+        sin instalar nada.
+        """
+        menu = QMenu(self)
+        menu.addAction("Perfilar la próxima acción (CPU y memoria)", self.perfilar_proxima_accion)
+        menu.addAction("Cancelar el perfilado pendiente", perfilado.cancelar)
+        menu.addAction("Abrir la carpeta de perfiles",
+                       lambda: QDesktopServices.openUrl(QUrl.fromLocalFile(perfilado.carpeta_perfiles())))
+        menu.exec(QCursor.pos())
+
+    def perfilar_proxima_accion(self):
+        """
+        La próxima acción (generar, graficar, exportar) se ejecuta con
+        cProfile y tracemalloc, y al terminar se guardan el .prof y un
+        resumen .json en la carpeta de perfiles.
+        """
+        perfilado.perfilar_proxima(resumen=self._resumen_perfil,
+                                   al_guardar=lambda prof, resumen: self.perfil_guardado.emit(prof, resumen))
+        print("Se perfilará la próxima acción")
+
+    def _resumen_perfil(self):
+        # Estado de la ventana que acompaña al perfil: memoria del informe, tabla y gráficos
+        return {
+            'informe': getattr(self, '_informe_cargado', None),
+            'dataframe': perfilado.resumen_dataframe(getattr(self, 'df', None)),
+            'filas_en_tabla': self.table_model.rowCount() if self.table_model is not None else 0,
+            'graficos_en_cache': len(self._graficos),
+            'bytes_graficos_en_cache': self._graficos.bytes,
+            **perfilado.resumen_qt(),
+        }
+
+    def _perfil_guardado(self, ruta_prof, ruta_json):
+        archivos = "\n".join(ruta for ruta in (ruta_prof, ruta_json) if ruta)
+        self.show_message_box("Perfil guardado", f"Archivos del perfil:\n{archivos}")
 
     def show_message_box(self, title, message):
         """
@@ -722,9 +1021,27 @@ class InformeApp(QWidget):
         """)
         msg_box.exec()
 
+def cerrar_conexiones():
+    """
+    Cierra las conexiones que quedaron abiertas en el pool. Si nunca se
+    consultó la base, el pool no se llegó a importar.
+    """
+    pool = sys.modules.get('Modules.connection_pool')
+    if pool is not None:
+        pool.get_pool().close_all()
+
 if __name__ == '__main__':    
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="Generador de Informes")
+    parser.add_argument('--perfilar', action='store_true',
+                        help="perfilar (CPU y memoria) la primera acción; ver también Ctrl+Shift+P")
+    # Los argumentos de Qt (-style, -platform...) quedan para QApplication
+    args, argumentos_qt = parser.parse_known_args()
+    app = QApplication(sys.argv[:1] + argumentos_qt)
     app.setWindowIcon(QIcon(get_resource_path('wolf.png')))
+    # Cerrar las conexiones que quedaron abiertas en el pool al salir
+    app.aboutToQuit.connect(cerrar_conexiones)
     ex = InformeApp()
+    if args.perfilar:
+        ex.perfilar_proxima_accion()
     ex.show()
     sys.exit(app.exec())
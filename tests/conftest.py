@@ -0,0 +1,83 @@
+"""
+Configuración común de las pruebas: las consultas van a la fuente falsa
+de benchmarks/fuente_falsa.py y la caché local a una carpeta temporal.
+"""
+import os
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, 'benchmarks'))
+os.environ['LOCALAPPDATA'] = tempfile.mkdtemp(prefix='informes_pruebas_')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import fuente_falsa  # noqa: E402
+
+# Antes de importar cualquier módulo que use pyodbc
+fuente_falsa.instalar(fuente_falsa.FuenteFalsa(0))
+
+import pytest  # noqa: E402
+
+
+class FuenteRegistrada(fuente_falsa.FuenteFalsa):
+    """
+    Fuente falsa que además anota cada procedimiento ejecutado y sus
+    parámetros, para contar las llamadas al "servidor".
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.llamadas = []
+
+    def consultar(self, query, params):
+        if query.lstrip().startswith('EXEC'):
+            with self._lock:
+                self.llamadas.append((query.split()[1], tuple(params)))
+        return super().consultar(query, params)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """
+    Caché de resultados nueva y vacía para la prueba.
+    """
+    from Modules import result_cache
+    nueva = result_cache.ResultCache(str(tmp_path / 'cache.sqlite3'))
+    monkeypatch.setattr(result_cache, '_cache', nueva)
+    return nueva
+
+
+@pytest.fixture
+def fuente(cache):
+    """
+    Instala una fuente falsa registrada con 3000 filas por tabla en 2024.
+    """
+    from Modules.connection_pool import get_pool
+    nueva = FuenteRegistrada(3000, operadores=20, areas=10)
+    fuente_falsa.instalar(nueva)
+    yield nueva
+    get_pool().close_all()
+    fuente_falsa.instalar(fuente_falsa.FuenteFalsa(0))
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    """
+    Aplicación Qt sin ventanas, para timers y señales entre hilos.
+    """
+    from PyQt6.QtCore import QCoreApplication
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def esperar(qapp, condicion, segundos=10):
+    """
+    Procesa eventos de Qt hasta que condicion() sea verdadera (o se agote el tiempo).
+    """
+    import time
+    limite = time.monotonic() + segundos
+    while not condicion() and time.monotonic() < limite:
+        qapp.processEvents()
+        time.sleep(0.005)
+    qapp.processEvents()
+    return condicion()
@@ -0,0 +1,84 @@
+import pandas as pd
+
+from Modules.aggregations import AggregationCache, calcular
+from Modules.dataset import ReportDataset
+from Modules.informes import obtener_datos
+
+
+def dataset_de(informe, desde='2024-01-01', hasta='2024-12-31'):
+    return ReportDataset(obtener_datos(informe, desde, hasta))
+
+
+def test_conteo_y_suma_coinciden_con_pandas(fuente):
+    altas = dataset_de("Informe de Altas")
+    conteo = AggregationCache(altas).conteo('Operador')
+    esperado = altas.df['Operador'].astype(str).value_counts()
+    assert conteo.to_dict() == esperado.to_dict()
+    assert conteo.is_monotonic_decreasing
+
+    categorias = dataset_de("Informe por Categoria")
+    suma = AggregationCache(categorias).suma_por('Categoria', 'Conteo')
+    esperado = categorias.df.groupby('Categoria', observed=True)['Conteo'].sum()
+    assert suma.to_dict() == esperado.to_dict()
+
+
+def test_los_agregados_se_calculan_una_vez_por_version(fuente, monkeypatch):
+    agregados = AggregationCache(dataset_de("Informe de Altas"))
+    calculados = []
+    original = calcular
+
+    def contar(df, clave, horas=None):
+        calculados.append(clave)
+        return original(df, clave, horas)
+    monkeypatch.setattr('Modules.aggregations.calcular', contar)
+    agregados.precalcular("Informe de Altas")
+    agregados.conteo('Operador')
+    agregados.resumenes("Informe de Altas")
+    agregados.vista(('conteo', 'Operador'), top_n=5)
+    assert sorted(calculados) == sorted([('conteo', 'letra'), ('conteo', 'Operador'), ('horas',),
+                                         ('conteo', 'Descripcion')])
+
+
+def test_extender_da_lo_mismo_que_recalcular(fuente):
+    anterior = dataset_de("Informe de Altas", hasta='2024-06-30')
+    nuevas = dataset_de("Informe de Altas", desde='2024-07-01').df
+    agregados = AggregationCache(anterior)
+    agregados.precalcular("Informe de Altas")
+
+    completo = anterior.extender(nuevas)
+    extendidos = agregados.extender(completo, nuevas)
+    recalculados = AggregationCache(completo)
+    for clave in [('conteo', 'letra'), ('conteo', 'Operador'), ('horas',), ('conteo', 'Descripcion')]:
+        a, b = extendidos._get(clave), recalculados._get(clave)
+        assert a.to_dict() == b.to_dict(), clave
+
+
+def test_resumenes_tiene_una_hoja_por_agregado(fuente):
+    hojas = AggregationCache(dataset_de("Informe de Altas")).resumenes("Informe de Altas")
+    assert list(hojas) == ['Por letra', 'Por operador', 'Por hora', 'Por área']
+    assert all(isinstance(hoja, pd.DataFrame) for hoja in hojas.values())
+
+
+def test_vista_top_n_junta_el_resto_en_otros():
+    df = pd.DataFrame({'Operador': pd.Categorical(list('AAAABBBCCD') + ['E'] * 5)})
+    agregados = AggregationCache(ReportDataset(df))
+    clave = ('conteo', 'Operador')
+
+    vista = agregados.vista(clave, top_n=2)
+    assert vista.to_dict() == {'E': 5, 'A': 4, 'Otros': 6}
+    assert vista.sum() == len(df)
+    assert agregados.cantidad(clave, top_n=2) == 3
+
+    # Con top_n mayor o igual a las categorías no hay 'Otros'
+    assert 'Otros' not in agregados.vista(clave, top_n=5).index
+    assert agregados.cantidad(clave, top_n=5) == 5
+
+
+def test_vista_con_ventana_pagina_las_categorias():
+    df = pd.DataFrame({'Categoria': pd.Categorical([f"C{i:02d}" for i in range(10) for _ in range(10 - i)]),
+                       'Conteo': 1})
+    agregados = AggregationCache(ReportDataset(df))
+    clave = ('suma', 'Categoria', 'Conteo')
+    assert list(agregados.vista(clave, inicio=3, ventana=4).index) == ['C03', 'C04', 'C05', 'C06']
+    # La ventana se aplica después del top N
+    assert list(agregados.vista(clave, top_n=4, inicio=2, ventana=10).index) == ['C02', 'C03', 'Otros']
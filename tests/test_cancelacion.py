@@ -0,0 +1,67 @@
+import time
+
+import pytest
+from PyQt6.QtCore import QThreadPool
+
+from conftest import esperar
+from Modules import database_utils
+from Modules.cancelacion import ConsultaCancelada, TiempoAgotado
+from Modules.database_utils import fetch_data_from_database
+from Modules.parallel import con_reintentos
+from Modules.workers import Worker
+
+NOVEDADES = 'Will_novedades_altasv1'
+
+
+def test_con_reintentos_no_repite_cancelaciones_ni_tiempos_agotados():
+    for error in (ConsultaCancelada, TiempoAgotado):
+        intentos = []
+
+        def tarea():
+            intentos.append(1)
+            raise error()
+        with pytest.raises(error):
+            con_reintentos(tarea, reintentos=3, espera=0)
+        assert len(intentos) == 1
+
+
+def test_cancelar_el_worker_corta_la_sentencia_en_el_servidor(qapp, fuente):
+    fuente.latencia = 5
+    worker = Worker(fetch_data_from_database, '2024-01-01', '2024-12-31', NOVEDADES, particion=None)
+    recibido = []
+    worker.signals.finished.connect(lambda df: recibido.append('finished'))
+    worker.signals.error.connect(lambda mensaje: recibido.append('error'))
+    worker.signals.ended.connect(recibido.append)
+    QThreadPool.globalInstance().start(worker)
+    assert esperar(qapp, lambda: fuente.llamadas)
+
+    inicio = time.monotonic()
+    worker.cancel()
+    assert esperar(qapp, lambda: recibido, segundos=3)
+    assert time.monotonic() - inicio < 2
+    assert recibido == ['cancelado']
+
+
+def test_tiempo_agotado_se_lanza_sin_reintentar(fuente, monkeypatch):
+    fuente.latencia = 2
+    monkeypatch.setitem(database_utils.TIEMPOS_LIMITE, NOVEDADES, 0.2)
+    with pytest.raises(TiempoAgotado):
+        fetch_data_from_database('2024-01-01', '2024-03-31', NOVEDADES, max_workers=3)
+    # Las tres partes se intentaron una sola vez cada una
+    assert len(fuente.llamadas) == 3
+
+
+def test_una_consulta_cancelada_no_queda_en_cache(qapp, fuente):
+    fuente.latencia = 5
+    worker = Worker(fetch_data_from_database, '2024-01-01', '2024-01-31', NOVEDADES)
+    terminado = []
+    worker.signals.ended.connect(terminado.append)
+    QThreadPool.globalInstance().start(worker)
+    assert esperar(qapp, lambda: fuente.llamadas)
+    worker.cancel()
+    assert esperar(qapp, lambda: terminado) and terminado == ['cancelado']
+
+    fuente.latencia = 0
+    fuente.llamadas.clear()
+    fetch_data_from_database('2024-01-01', '2024-01-31', NOVEDADES)
+    assert len(fuente.llamadas) == 1
@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+import fuente_falsa
+from Modules.database_utils import fetch_data_from_database, fetch_data_operadores
+
+V3 = 'Will_ObtenerDatosParaInforme2024V3'
+
+
+def fallar_desde(fuente, monkeypatch, fecha):
+    """
+    Hace que fallen las consultas cuyo rango empieza en fecha o después.
+    """
+    original = fuente.consultar
+
+    def consultar(query, params):
+        if params and str(params[0]) >= fecha:
+            raise fuente_falsa.Error('08S01', "Se perdió la conexión")
+        return original(query, params)
+    monkeypatch.setattr(fuente, 'consultar', consultar)
+
+
+def test_error_sin_lotes_entregados_devuelve_vacio(fuente, monkeypatch):
+    fallar_desde(fuente, monkeypatch, '2024-01-01')
+    lotes = []
+    df = fetch_data_from_database('2024-01-01', '2024-03-31', V3, on_batch=lotes.append)
+    assert df.empty and lotes == []
+
+
+def test_error_despues_de_entregar_lotes_se_lanza(fuente, monkeypatch):
+    fallar_desde(fuente, monkeypatch, '2024-03-01')
+    lotes = []
+    with pytest.raises(fuente_falsa.Error):
+        fetch_data_from_database('2024-01-01', '2024-03-31', V3, on_batch=lotes.append)
+    # Enero y febrero ya se habían entregado
+    assert sum(len(lote) for lote in lotes) > 0
+
+
+def test_error_despues_de_lotes_de_la_cache_se_lanza(fuente, monkeypatch):
+    fetch_data_from_database('2024-01-01', '2024-01-31', V3)
+    fallar_desde(fuente, monkeypatch, '2024-02-01')
+    lotes = []
+    with pytest.raises(fuente_falsa.Error):
+        fetch_data_from_database('2024-01-01', '2024-02-29', V3, on_batch=lotes.append)
+    assert len(pd.concat(lotes)) > 0
+
+
+def test_error_de_operador_sin_lotes_devuelve_vacio(fuente, monkeypatch):
+    fallar_desde(fuente, monkeypatch, '2024-01-01')
+    df = fetch_data_operadores('2024-01-01', '2024-01-31', 1000, 'A', on_batch=lambda lote: None)
+    assert df.empty
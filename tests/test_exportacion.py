@@ -0,0 +1,68 @@
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Modules.exportacion import _valores, exportar, nombre_de_hoja
+
+
+def informe():
+    return pd.DataFrame({
+        'entero': pd.Series([1, 2, 3], dtype='int16'),
+        'decimal': [1.5, np.nan, 3.25],
+        'texto': pd.Categorical(['A', None, 'C']),
+        'fecha': pd.to_datetime(['2024-01-02 10:30', None, '2024-03-04 00:00']),
+    })
+
+
+def test_valores_son_objetos_de_python_con_none():
+    df = informe()
+    enteros = _valores(df['entero'])
+    assert enteros == [1, 2, 3] and all(type(v) is int for v in enteros)
+    assert _valores(df['decimal']) == [1.5, None, 3.25]
+    assert _valores(df['texto']) == ['A', None, 'C']
+    fechas = _valores(df['fecha'])
+    assert fechas[1] is None
+    assert isinstance(fechas[0], datetime.datetime) and fechas[0] == datetime.datetime(2024, 1, 2, 10, 30)
+
+
+def test_excel_con_celdas_tipadas(tmp_path):
+    from openpyxl import load_workbook
+
+    ruta = str(tmp_path / 'informe.xlsx')
+    exportar(ruta, informe(), {'Resumen': pd.DataFrame({'clave': ['x'], 'total': [7]})})
+    libro = load_workbook(ruta)
+    assert libro.sheetnames == ['Informe', 'Resumen']
+    filas = list(libro['Informe'].iter_rows(values_only=True))
+    assert filas[0] == ('entero', 'decimal', 'texto', 'fecha')
+    assert filas[1] == (1, 1.5, 'A', datetime.datetime(2024, 1, 2, 10, 30))
+    assert filas[2] == (2, None, None, None)
+    assert list(libro['Resumen'].iter_rows(values_only=True)) == [('clave', 'total'), ('x', 7)]
+
+
+def test_csv_con_fechas_iso(tmp_path):
+    ruta = str(tmp_path / 'informe.csv')
+    exportar(ruta, informe())
+    leido = pd.read_csv(ruta)
+    assert list(leido['fecha'])[0] == '2024-01-02 10:30:00'
+    assert list(leido['entero']) == [1, 2, 3]
+
+
+def test_una_exportacion_interrumpida_no_deja_archivo(tmp_path):
+    ruta = str(tmp_path / 'informe.csv')
+
+    def cancelar(escritas, total):
+        raise RuntimeError("cancelado")
+    with pytest.raises(RuntimeError):
+        exportar(ruta, informe(), on_progress=cancelar)
+    assert os.listdir(tmp_path) == []
+
+
+def test_nombre_de_hoja():
+    usados = set()
+    assert nombre_de_hoja("1000 PEREZ/JUAN: [A]", usados) == "1000 PEREZ JUAN   A"
+    assert nombre_de_hoja("x" * 40, usados) == "x" * 31
+    # Sin distinguir mayúsculas: "XXX..." ya está usado como "xxx..."
+    assert nombre_de_hoja("X" * 40, usados) == "X" * 27 + " (2)"
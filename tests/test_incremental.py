@@ -0,0 +1,39 @@
+import pandas as pd
+
+from Modules.incremental import RefrescoIncremental
+
+PARAMS = ("Informe de Altas", '2024-03-01', '2024-03-31', None, None)
+
+
+def altas(*fechas):
+    return pd.DataFrame({
+        'letra': ['A'] * len(fechas),
+        'Operador': [f"OPERADOR {i}" for i in range(len(fechas))],
+        'fech_alta': list(fechas),
+        'Descripcion': ['AREA'] * len(fechas),
+        'expediente': list(range(len(fechas))),
+    })
+
+
+def test_el_refresco_consulta_desde_el_dia_de_la_marca():
+    refresco = RefrescoIncremental()
+    refresco.iniciar(PARAMS, altas('09-03-2024 10:00', '09-03-2024 23:40'))
+    assert refresco.desde('2024-03-10') == '2024-03-09'
+    assert refresco.desde('2024-03-09') == '2024-03-09'
+
+
+def test_sin_marca_o_con_marca_futura_consulta_hoy():
+    refresco = RefrescoIncremental()
+    assert refresco.desde('2024-03-10') == '2024-03-10'
+    refresco.iniciar(PARAMS, altas('12-03-2024 08:00'))
+    assert refresco.desde('2024-03-10') == '2024-03-10'
+
+
+def test_una_fila_de_ayer_que_llega_tarde_es_nueva():
+    refresco = RefrescoIncremental()
+    refresco.iniciar(PARAMS, altas('09-03-2024 10:00', '09-03-2024 23:40'))
+    # Después de medianoche llega una fila de las 23:55 de ayer
+    reciente = altas('09-03-2024 10:00', '09-03-2024 23:40', '09-03-2024 23:55', '10-03-2024 00:10')
+    nuevas = refresco.filas_nuevas(reciente)
+    assert list(nuevas['fech_alta']) == ['09-03-2024 23:55', '10-03-2024 00:10']
+    assert refresco.desde('2024-03-10') == '2024-03-10'
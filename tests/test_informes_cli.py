@@ -0,0 +1,64 @@
+import datetime
+import json
+
+import pytest
+
+import informes_cli
+from informes_cli import ejecutar_lote, leer_trabajos
+from Modules.informes import TODOS_LOS_OPERADORES
+
+
+def archivo(tmp_path, contenido):
+    ruta = tmp_path / 'trabajos.json'
+    ruta.write_text(json.dumps(contenido), encoding='utf-8')
+    return str(ruta)
+
+
+def test_leer_trabajos_normaliza_fechas_operador_y_letra(tmp_path):
+    trabajos, paralelo = leer_trabajos(archivo(tmp_path, {
+        'salida': 'informes',
+        'paralelo': 3,
+        'trabajos': [
+            {'informe': "Informe de Altas", 'desde': 'ayer'},
+            {'informe': "Informe de Operadores", 'desde': '2024-01-01', 'hasta': '2024-01-31',
+             'operador': '123', 'letra': 'e', 'salida': 'operadores'},
+            {'informe': "Informe de Operadores", 'desde': 'hoy-7', 'operador': 'Todos'},
+        ],
+    }))
+    ayer = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+    assert paralelo == 3
+    assert (trabajos[0]['desde'], trabajos[0]['hasta'], trabajos[0]['letra']) == (ayer, ayer, 'T')
+    assert (trabajos[1]['operador'], trabajos[1]['letra']) == (123, 'E')
+    assert trabajos[1]['salida'] == str(tmp_path / 'informes' / 'operadores')
+    assert trabajos[2]['operador'] == TODOS_LOS_OPERADORES
+
+
+@pytest.mark.parametrize('trabajo, mensaje', [
+    ({'informe': "Informe de Altas", 'desde': '2024-13-01'}, 'Fecha no válida'),
+    ({'informe': "Informe de Operadores", 'desde': 'ayer', 'operador': 'abc'}, 'Operador no válido'),
+    ({'informe': "Informe de Operadores", 'desde': 'ayer', 'operador': 1, 'letra': 'X'}, 'Letra no válida'),
+    ({'informe': "Informe de Operadores", 'desde': 'ayer'}, 'necesita un operador'),
+    ({'informe': "Informe de Nada", 'desde': 'ayer'}, 'Informe desconocido'),
+])
+def test_un_trabajo_invalido_falla_al_leer_el_archivo(tmp_path, trabajo, mensaje):
+    with pytest.raises(ValueError, match=f"Trabajo 2: .*{mensaje}"):
+        leer_trabajos(archivo(tmp_path, [{'informe': "Informe de Altas", 'desde': 'ayer'}, trabajo]))
+
+
+def test_ejecutar_lote_sigue_aunque_falle_un_trabajo(tmp_path, monkeypatch):
+    llamadas = []
+
+    def generar(informe, desde, hasta, salida, **kwargs):
+        llamadas.append((informe, kwargs['operador'], kwargs['letra']))
+        if informe == "Informe por Categoria":
+            raise RuntimeError("servidor caído")
+        return []
+    monkeypatch.setattr(informes_cli, 'generar', generar)
+    trabajos, _ = leer_trabajos(archivo(tmp_path, [
+        {'informe': "Informe de Altas", 'desde': 'ayer'},
+        {'informe': "Informe por Categoria", 'desde': 'ayer'},
+        {'informe': "Informe de Operadores", 'desde': 'ayer', 'operador': '7'},
+    ]))
+    assert ejecutar_lote(trabajos, paralelo=2) == 1
+    assert sorted(llamadas) == [("Informe de Altas", None, 'T'), ("Informe de Operadores", 7, 'T'),
+                                ("Informe por Categoria", None, 'T')]
@@ -0,0 +1,57 @@
+from PyQt6.QtCore import QThreadPool
+
+from conftest import esperar
+from Modules.programador import ProgramadorRefresco
+from Modules.workers import Worker
+
+
+def arrancar(fn):
+    """
+    refrescar() que arranca un Worker con fn, conectando al_terminar antes.
+    """
+    def refrescar(al_terminar):
+        worker = Worker(fn)
+        worker.signals.ended.connect(al_terminar)
+        QThreadPool.globalInstance().start(worker)
+        return worker
+    return refrescar
+
+
+def refrescar_una_vez(qapp, programador):
+    programador.activo = True
+    programador._refrescar()
+    assert esperar(qapp, lambda: not programador.en_curso)
+
+
+def test_un_refresco_que_termina_enseguida_programa_el_siguiente(qapp):
+    programador = ProgramadorRefresco(arrancar(lambda: None), intervalo=60)
+    for _ in range(20):
+        refrescar_una_vez(qapp, programador)
+        assert programador._timer.isActive()
+    programador.detener()
+
+
+def test_un_refresco_fallido_espacia_los_siguientes(qapp):
+    def fallar():
+        raise RuntimeError("servidor caído")
+    programador = ProgramadorRefresco(arrancar(fallar), intervalo=60, maximo=200)
+    cambios = []
+    programador.intervalo_cambiado.connect(cambios.append)
+    for _ in range(3):
+        refrescar_una_vez(qapp, programador)
+    assert cambios == [120, 200]
+    assert programador.intervalo_actual == 200
+
+    programador.refrescar = arrancar(lambda: None)
+    refrescar_una_vez(qapp, programador)
+    assert programador.intervalo_actual == 100
+    programador.detener()
+
+
+def test_sin_refresco_se_prueba_en_el_proximo_intervalo(qapp):
+    programador = ProgramadorRefresco(lambda al_terminar: None, intervalo=60)
+    programador.activo = True
+    programador._refrescar()
+    assert not programador.en_curso
+    assert programador._timer.isActive()
+    programador.detener()
@@ -0,0 +1,94 @@
+import datetime
+
+import pandas as pd
+
+from Modules.database_utils import _ejecutar_consulta, fetch_data_from_database
+from Modules.range_cache import particionar_tramo, tramos_contiguos
+
+V3 = 'Will_ObtenerDatosParaInforme2024V3'
+V4 = 'Will_ObtenerDatosParaInforme2024V4'
+NOVEDADES = 'Will_novedades_altasv1'
+
+
+def consulta_unica(procedimiento, inicio, fin):
+    return _ejecutar_consulta(f"EXEC {procedimiento} @FechaInicio = ?, @FechaFin = ?", (inicio, fin))
+
+
+def iguales(a, b):
+    pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True))
+
+
+def test_particionar_tramo_por_meses():
+    partes = particionar_tramo(datetime.date(2024, 1, 15), datetime.date(2024, 3, 10), 'month')
+    assert partes == [
+        (datetime.date(2024, 1, 15), datetime.date(2024, 1, 31)),
+        (datetime.date(2024, 2, 1), datetime.date(2024, 2, 29)),
+        (datetime.date(2024, 3, 1), datetime.date(2024, 3, 10)),
+    ]
+
+
+def test_tramos_contiguos():
+    dias = [datetime.date(2024, 1, d) for d in (1, 2, 3, 7, 9, 10)]
+    assert tramos_contiguos(dias) == [
+        (datetime.date(2024, 1, 1), datetime.date(2024, 1, 3)),
+        (datetime.date(2024, 1, 7), datetime.date(2024, 1, 7)),
+        (datetime.date(2024, 1, 9), datetime.date(2024, 1, 10)),
+    ]
+
+
+def test_v4_un_mes_es_una_sola_llamada_igual_a_la_consulta_directa(fuente):
+    df = fetch_data_from_database('2024-03-01', '2024-03-31', V4)
+    assert fuente.llamadas == [(V4, ('2024-03-01', '2024-03-31'))]
+    iguales(df, consulta_unica(V4, '2024-03-01', '2024-03-31'))
+
+    fuente.llamadas.clear()
+    iguales(fetch_data_from_database('2024-03-01', '2024-03-31', V4), df)
+    assert fuente.llamadas == []
+
+
+def test_v3_consulta_solo_los_dias_faltantes(fuente):
+    fetch_data_from_database('2024-01-10', '2024-01-20', V3)
+    fuente.llamadas.clear()
+
+    lotes = []
+    df = fetch_data_from_database('2024-01-01', '2024-01-31', V3, on_batch=lotes.append)
+    assert fuente.llamadas == [
+        (V3, ('2024-01-01', '2024-01-09')), (V3, ('2024-01-21', '2024-01-31'))
+    ]
+    directo = consulta_unica(V3, '2024-01-01', '2024-01-31')
+    iguales(df, directo)
+    # Los lotes llegan en orden cronológico y suman el resultado completo
+    iguales(pd.concat(lotes), directo)
+
+
+def test_force_refresh_vuelve_a_consultar(fuente):
+    fetch_data_from_database('2024-01-01', '2024-02-29', NOVEDADES)
+    fuente.llamadas.clear()
+    fetch_data_from_database('2024-01-01', '2024-02-29', NOVEDADES, force_refresh=True)
+    assert len(fuente.llamadas) == 2
+
+
+def test_novedades_un_anio_son_doce_llamadas_mensuales(fuente):
+    df = fetch_data_from_database('2024-01-01', '2024-12-31', NOVEDADES, max_workers=4)
+    assert len(fuente.llamadas) == 12
+    assert sorted(p for _, p in fuente.llamadas)[1] == ('2024-02-01', '2024-02-29')
+    iguales(df, consulta_unica(NOVEDADES, '2024-01-01', '2024-12-31'))
+
+
+def test_novedades_reutiliza_los_meses_guardados(fuente):
+    fetch_data_from_database('2024-01-01', '2024-06-30', NOVEDADES)
+    fuente.llamadas.clear()
+
+    df = fetch_data_from_database('2024-03-01', '2024-08-31', NOVEDADES)
+    # Marzo a junio salen de la caché; solo julio y agosto van al servidor
+    assert sorted(p for _, p in fuente.llamadas) == [
+        ('2024-07-01', '2024-07-31'), ('2024-08-01', '2024-08-31')
+    ]
+    iguales(df, consulta_unica(NOVEDADES, '2024-03-01', '2024-08-31'))
+
+
+def test_novedades_sin_particion_es_una_sola_llamada(fuente):
+    fetch_data_from_database('2024-01-01', '2024-12-31', NOVEDADES, particion=None)
+    assert fuente.llamadas == [(NOVEDADES, ('2024-01-01', '2024-12-31'))]
+
+
@@ -0,0 +1,46 @@
+import numpy as np
+
+from Modules.aggregations import AggregationCache
+from Modules.dataset import ReportDataset
+from Modules.graficos import BYTES_POR_ARTISTA, renderizar_grafico
+from Modules.informes import obtener_datos
+from Modules.render_cache import RenderCache
+
+
+class Grafico:
+    def __init__(self, bytes_figura):
+        self.bytes_figura = bytes_figura
+
+    def bytes_estimados(self):
+        return self.bytes_figura
+
+
+def imagen(bytes_imagen):
+    return np.zeros(bytes_imagen, dtype=np.uint8)
+
+
+def test_el_limite_cuenta_la_figura_ademas_de_la_imagen():
+    cache = RenderCache(max_bytes=1000)
+    cache.put('a', Grafico(300), imagen(100))
+    cache.put('b', Grafico(300), imagen(100))
+    assert cache.bytes == 800
+    # La tercera entrada supera el límite: se descarta la menos usada
+    cache.get('a')
+    cache.put('c', Grafico(300), imagen(100))
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    assert cache.bytes == 800
+
+
+def test_una_entrada_mas_grande_que_el_limite_no_se_guarda():
+    cache = RenderCache(max_bytes=1000)
+    cache.put('a', Grafico(950), imagen(100))
+    assert len(cache) == 0 and cache.bytes == 0
+
+
+def test_la_figura_estimada_incluye_bufers_y_artistas(fuente):
+    dataset = ReportDataset(obtener_datos("Informe de Altas", '2024-01-01', '2024-12-31'))
+    grafico, rgba = renderizar_grafico("Informe de Altas", "Gráfico de Operadores",
+                                       AggregationCache(dataset), 400, 300)
+    artistas = len(grafico.figura.findobj())
+    # Búfer de Agg y fondo guardado, más los artistas
+    assert grafico.bytes_estimados() == 2 * rgba.nbytes + artistas * BYTES_POR_ARTISTA
@@ -0,0 +1,81 @@
+import datetime
+import time
+
+import pandas as pd
+
+from Modules import result_cache
+from Modules.result_cache import ResultCache, cached_call, ttl_para
+
+AYER = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+HOY = datetime.date.today().isoformat()
+
+
+def tabla(filas):
+    return pd.DataFrame({'a': range(filas), 'b': ['x' * 50] * filas})
+
+
+class Reloj:
+    """
+    Reemplazo de time.time() que avanza solo cuando se le pide. Parte de
+    la hora real: date.today() también la usa.
+    """
+
+    def __init__(self):
+        self.ahora = time.time()
+
+    def __call__(self):
+        return self.ahora
+
+
+def test_ttl_para():
+    assert ttl_para(AYER) is None
+    assert ttl_para(HOY, ttl_actual=30) == 30
+    assert ttl_para('no es una fecha', ttl_actual=30) == 30
+
+
+def test_un_rango_pasado_no_vence_y_uno_actual_si(tmp_path, monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(result_cache.time, 'time', reloj)
+    cache = ResultCache(str(tmp_path / 'c.sqlite3'), ttl_actual=30)
+    cache.put('P', ('2024-01-01', AYER), tabla(3), AYER)
+    cache.put('P', ('2024-01-01', HOY), tabla(4), HOY)
+
+    reloj.ahora += 29
+    assert len(cache.get('P', ('2024-01-01', HOY))) == 4
+    reloj.ahora += 2
+    assert cache.get('P', ('2024-01-01', HOY)) is None
+    assert cache.get_many('P', [('2024-01-01', HOY)]) == {}
+    reloj.ahora += 3600
+    assert len(cache.get('P', ('2024-01-01', AYER))) == 3
+
+
+def test_al_superar_el_tamanio_se_descarta_lo_menos_usado(tmp_path, monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(result_cache.time, 'time', reloj)
+    cache = ResultCache(str(tmp_path / 'c.sqlite3'))
+    for i in range(3):
+        reloj.ahora += 1
+        cache.put('P', (str(i),), tabla(200), AYER)
+    with cache._connect() as db:
+        tamanio = db.execute("SELECT MAX(tamanio) FROM resultados").fetchone()[0]
+    # Caben dos entradas; la 0 se usó hace poco, así que se descarta la 1
+    cache.max_bytes = 2 * tamanio
+    reloj.ahora += 1
+    assert cache.get('P', ('0',)) is not None
+    reloj.ahora += 1
+    cache.put('P', ('3',), tabla(200), AYER)
+    assert set(cache.get_many('P', [(str(i),) for i in range(4)])) == {('0',), ('3',)}
+
+
+def test_cached_call_consulta_una_vez_y_force_refresh_vuelve_a_consultar(cache):
+    llamadas = []
+
+    def consultar():
+        llamadas.append(1)
+        return tabla(2)
+
+    assert cached_call('P', ('x',), AYER, consultar)[1] is False
+    df, desde_cache = cached_call('P', ('x',), AYER, consultar)
+    assert desde_cache is True and len(df) == 2 and len(llamadas) == 1
+    assert cached_call('P', ('x',), AYER, consultar, force_refresh=True)[1] is False
+    assert len(llamadas) == 2
@@ -0,0 +1,30 @@
+import pandas as pd
+from PyQt6.QtCore import Qt
+
+from Modules.dataset import ReportDataset
+from Modules.table_model import DataFrameModel
+
+
+def texto(modelo, fila, columna):
+    return modelo.data(modelo.index(fila, columna), Qt.ItemDataRole.DisplayRole)
+
+
+def test_fechas_tipadas_se_muestran_como_en_el_servidor(qapp):
+    dataset = ReportDataset(pd.DataFrame({
+        'letra': ['A', 'B'],
+        'fech_alta': ['05-01-2024 10:30', None],
+        'expediente': [1, 2],
+    }))
+    assert pd.api.types.is_datetime64_any_dtype(dataset.df['fech_alta'])
+    modelo = DataFrameModel(dataset.df)
+    assert texto(modelo, 0, 1) == '05-01-2024 10:30'
+    assert texto(modelo, 1, 1) == ''
+    assert texto(modelo, 0, 0) == 'A' and texto(modelo, 1, 2) == '2'
+
+
+def test_fechas_ordenadas_y_lotes_agregados(qapp):
+    df = ReportDataset(pd.DataFrame({'fech_alta': ['05-01-2024 10:30', '04-01-2024 08:00']})).df
+    modelo = DataFrameModel(df)
+    modelo.append_dataframe(df.iloc[:1])
+    modelo.sort(0, Qt.SortOrder.AscendingOrder)
+    assert [texto(modelo, i, 0) for i in range(3)] == ['04-01-2024 08:00', '05-01-2024 10:30', '05-01-2024 10:30']
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+import fuente_falsa
+from Modules import connection_pool
+from Modules.cancelacion import Cancelacion, ConsultaCancelada, establecer
+from Modules.informes import (
+    COLUMNA_CODIGO_OPERADOR, OPERADORES_CON_ERROR, hojas_por_operador, obtener_todos_los_operadores,
+    operadores_con_error
+)
+from Modules.dataset import ReportDataset
+
+OPERADORES = [(1000, 'GOMEZ MARIA 000'), (1001, 'FERNANDEZ MARIA 001'), (1002, 'GONZALEZ MARIA 002')]
+
+
+def fallar_operador(fuente, monkeypatch, codigo, veces=None):
+    """
+    Hace fallar las consultas del operador codigo (las primeras `veces`, o todas).
+    """
+    original = fuente.consultar
+    fallas = []
+
+    def consultar(query, params):
+        if len(params) == 4 and params[2] == codigo and (veces is None or len(fallas) < veces):
+            fallas.append(params)
+            raise fuente_falsa.Error('08S01', "Se perdió la conexión")
+        return original(query, params)
+    monkeypatch.setattr(fuente, 'consultar', consultar)
+    return fallas
+
+
+def test_todos_los_operadores_sin_errores(fuente):
+    df = obtener_todos_los_operadores('2024-01-01', '2024-01-31', operadores=OPERADORES, max_workers=2)
+    assert list(df[COLUMNA_CODIGO_OPERADOR].unique()) == [1000, 1001, 1002]
+    assert operadores_con_error(df) == []
+
+
+def test_el_pool_se_amplia_al_ancho_pedido(fuente, monkeypatch):
+    monkeypatch.setattr(connection_pool, '_pool', connection_pool.ConnectionPool(max_size=4))
+    original = fuente.consultar
+    lock = threading.Lock()
+    a_la_vez = [0, 0]   # actuales, máximo
+
+    def consultar(query, params):
+        with lock:
+            a_la_vez[0] += 1
+            a_la_vez[1] = max(a_la_vez)
+        time.sleep(0.05)
+        try:
+            return original(query, params)
+        finally:
+            with lock:
+                a_la_vez[0] -= 1
+    monkeypatch.setattr(fuente, 'consultar', consultar)
+
+    operadores = [(1000 + i, f"OPERADOR {i}") for i in range(8)]
+    df = obtener_todos_los_operadores('2024-01-01', '2024-01-31', operadores=operadores, max_workers=8)
+    assert df[COLUMNA_CODIGO_OPERADOR].nunique() == 8
+    assert connection_pool.get_pool().max_size == 8
+    assert a_la_vez[1] == 8
+
+    # Un ancho menor no achica el pool
+    connection_pool.get_pool(2)
+    assert connection_pool.get_pool().max_size == 8
+
+
+def test_un_error_pasajero_se_reintenta(fuente, monkeypatch):
+    monkeypatch.setattr('Modules.parallel.time.sleep', lambda segundos: None)
+    fallas = fallar_operador(fuente, monkeypatch, 1001, veces=1)
+    df = obtener_todos_los_operadores('2024-01-01', '2024-01-31', operadores=OPERADORES, max_workers=2)
+    assert len(fallas) == 1
+    assert 1001 in set(df[COLUMNA_CODIGO_OPERADOR])
+    assert operadores_con_error(df) == []
+
+
+def test_el_operador_que_sigue_fallando_se_informa(fuente, monkeypatch):
+    monkeypatch.setattr('Modules.parallel.time.sleep', lambda segundos: None)
+    fallas = fallar_operador(fuente, monkeypatch, 1001)
+    df = obtener_todos_los_operadores('2024-01-01', '2024-01-31', operadores=OPERADORES,
+                                      max_workers=2, reintentos=2)
+    assert len(fallas) == 3
+    assert set(df[COLUMNA_CODIGO_OPERADOR]) == {1000, 1002}
+    [(codigo, nombre, error)] = df.attrs[OPERADORES_CON_ERROR]
+    assert (codigo, nombre) == (1001, 'FERNANDEZ MARIA 001') and '08S01' in error
+
+    # La lista sigue con el informe tipado y sale como hoja del Excel
+    dataset = ReportDataset(df)
+    assert operadores_con_error(dataset.df) == df.attrs[OPERADORES_CON_ERROR]
+    hojas = dict(hojas_por_operador(dataset.df, dataset.df.iloc[:0]))
+    assert list(hojas['Operadores con error']['Codigo']) == [1001]
+
+
+def test_la_cancelacion_no_se_toma_como_error_de_operador(fuente):
+    cancelacion = Cancelacion()
+    cancelacion.cancelar()
+    establecer(cancelacion)
+    try:
+        with pytest.raises(ConsultaCancelada):
+            obtener_todos_los_operadores('2024-01-01', '2024-01-31', operadores=OPERADORES, max_workers=2)
+    finally:
+        establecer(None)